@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+余额本地持久化缓存
+功能：使用SQLite按地址缓存余额（wei）、区块高度和查询时间，重复扫描时只查询过期的地址；
+快照余额按 (地址, 区块) 缓存，固定区块的状态不会改变，因此永不过期
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class BalanceCache:
+    def __init__(self, path: str = os.path.join('.irys_cache', 'balances.sqlite3'),
+                 ttl: Optional[float] = 300, max_block_age: Optional[int] = None):
+        """
+        Args:
+            path: SQLite数据库文件路径
+            ttl: 缓存有效期（秒），None表示不按时间过期
+            max_block_age: 缓存允许落后当前区块的最大区块数，None表示不按区块过期
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_block_age = max_block_age
+        self.hits = 0
+        self.misses = 0
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS balances ("
+            "address TEXT PRIMARY KEY, "
+            "balance_wei TEXT NOT NULL, "
+            "block_number INTEGER, "
+            "fetched_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshot_balances ("
+            "address TEXT NOT NULL, "
+            "block_number INTEGER NOT NULL, "
+            "balance_wei TEXT NOT NULL, "
+            "PRIMARY KEY (address, block_number))"
+        )
+        self._conn.commit()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, block_number: Optional[int], fetched_at: float, current_block: Optional[int], now: float) -> bool:
+        if self.ttl is not None and now - fetched_at > self.ttl:
+            return False
+        if self.max_block_age is not None:
+            if current_block is None or block_number is None:
+                return False
+            if current_block - block_number > self.max_block_age:
+                return False
+        return True
+
+    def get_many(self, addresses: Iterable[str], current_block: Optional[int] = None) -> Dict[str, Tuple[int, Optional[int]]]:
+        """
+        批量读取未过期的缓存
+
+        Args:
+            addresses: 地址列表
+            current_block: 当前区块高度，用于按区块判断是否过期
+
+        Returns:
+            {小写地址: (余额wei, 区块高度)}，只包含未过期的条目
+        """
+        keys = list(dict.fromkeys(address.lower() for address in addresses))
+        now = time.time()
+        found = {}
+
+        with self._lock:
+            # SQLite 单条语句的参数数量有限，分批查询
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT address, balance_wei, block_number, fetched_at FROM balances WHERE address IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for address, balance_wei, block_number, fetched_at in rows:
+                    if self._is_fresh(block_number, fetched_at, current_block, now):
+                        found[address] = (int(balance_wei), block_number)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: List[Tuple[str, int, Optional[int]]]):
+        """
+        批量写入缓存
+
+        Args:
+            entries: (地址, 余额wei, 区块高度) 列表
+        """
+        now = time.time()
+        rows = [(address.lower(), str(balance_wei), block_number, now) for address, balance_wei, block_number in entries]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO balances VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def get_snapshot_many(self, addresses: Iterable[str], block_number: int) -> Dict[str, int]:
+        """
+        批量读取指定区块的快照余额
+
+        Args:
+            addresses: 地址列表
+            block_number: 快照区块高度
+
+        Returns:
+            {小写地址: 余额wei}
+        """
+        keys = list(dict.fromkeys(address.lower() for address in addresses))
+        found = {}
+
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT address, balance_wei FROM snapshot_balances "
+                    f"WHERE block_number = ? AND address IN ({placeholders})",
+                    [block_number] + chunk
+                ).fetchall()
+                for address, balance_wei in rows:
+                    found[address] = int(balance_wei)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_snapshot_many(self, entries: List[Tuple[str, int]], block_number: int):
+        """
+        批量写入快照余额
+
+        Args:
+            entries: (地址, 余额wei) 列表
+            block_number: 快照区块高度
+        """
+        rows = [(address.lower(), block_number, str(balance_wei)) for address, balance_wei in entries]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO snapshot_balances VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""基准测试脚本和本地模拟节点（测试中通过 benchmarks.mock_rpc 导入模拟节点）"""
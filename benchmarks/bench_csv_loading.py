@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV加载校验基准测试
+功能：对比逐行 iterrows 校验与按列向量化校验的吞吐量（行/秒），并核对两者结果一致
+
+用法: python benchmarks/bench_csv_loading.py [行数]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+import pandas as pd
+from web3 import Web3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wallet_loader import find_column_mapping, validate_wallet_frame
+
+
+def generate_csv(path: str, rows: int, invalid_ratio: float = 0.01, seed: int = 42):
+    """生成测试用钱包CSV，按比例混入空行、错误地址和错误私钥"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('index,address,privateKey\n')
+        for i in range(1, rows + 1):
+            address = f"0x{rng.getrandbits(160):040x}"
+            private_key = f"0x{rng.getrandbits(256):064x}"
+            if rng.random() < invalid_ratio:
+                kind = rng.randrange(4)
+                if kind == 0:
+                    address = ''
+                elif kind == 1:
+                    address = address[:-2]
+                elif kind == 2:
+                    private_key = private_key[:20]
+                else:
+                    address = Web3.to_checksum_address(address).swapcase()
+            f.write(f"{i},{address},{private_key}\n")
+
+
+def legacy_validate(df: pd.DataFrame, column_mapping: dict, w3: Web3):
+    """原逐行校验实现（仅用于对比）"""
+    wallets = []
+    issues = []
+    for idx, row in df.iterrows():
+        try:
+            index_val = row[column_mapping['index']]
+            address_val = str(row[column_mapping['address']]).strip()
+            private_key_val = str(row[column_mapping['privateKey']]).strip()
+
+            if pd.isna(index_val) or not address_val or not private_key_val or address_val == 'nan' or private_key_val == 'nan':
+                issues.append(f"跳过空行 {idx+1}")
+                continue
+
+            wallet_info = {
+                'index': int(float(index_val)) if not pd.isna(index_val) else idx + 1,
+                'address': address_val,
+                'private_key': private_key_val,
+                'balance': None
+            }
+
+            if not w3.is_address(wallet_info['address']):
+                issues.append(f"地址格式不正确 (行{idx+1}): {wallet_info['address']}")
+                continue
+
+            if not (wallet_info['private_key'].startswith('0x') and len(wallet_info['private_key']) == 66):
+                issues.append(f"私钥格式可能不正确 (行{idx+1}): {wallet_info['private_key'][:10]}...")
+                continue
+
+            wallets.append(wallet_info)
+        except Exception as e:
+            issues.append(f"处理行{idx+1}时出错: {str(e)}")
+    return wallets, issues
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'wallets.csv')
+        generate_csv(path, rows)
+        df = pd.read_csv(path, encoding='utf-8')
+        column_mapping, _ = find_column_mapping(df.columns)
+
+        start = time.perf_counter()
+        legacy_wallets, legacy_issues = legacy_validate(df, column_mapping, Web3())
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        wallets, issues = validate_wallet_frame(df, column_mapping, strict_address=True)
+        vectorized_time = time.perf_counter() - start
+
+    print(f"行数: {rows}")
+    print(f"逐行 iterrows:  {legacy_time:8.3f}s  {rows / legacy_time:12,.0f} 行/秒")
+    print(f"向量化校验:     {vectorized_time:8.3f}s  {rows / vectorized_time:12,.0f} 行/秒")
+    print(f"加速比: {legacy_time / vectorized_time:.1f}x")
+    print(f"有效钱包: {len(wallets)}, 无效行: {len(issues)}")
+
+    # 列式存储中的地址统一以 checksum 形式读出
+    for wallet in legacy_wallets:
+        wallet['address'] = Web3.to_checksum_address(wallet['address'])
+    wallets = [{key: wallet[key] for key in ('index', 'address', 'private_key', 'balance')} for wallet in wallets]
+    if wallets != legacy_wallets or issues != legacy_issues:
+        print("❌ 向量化结果与逐行校验结果不一致")
+        sys.exit(1)
+    print("✅ 结果一致")
+
+
+if __name__ == "__main__":
+    main()
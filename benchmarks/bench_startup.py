@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动基准测试
+功能：测量交互菜单从启动到出现第一个输入提示的时间，以及命令行 scan 从启动到输出第一条结果的时间；
+每次都启动新的 Python 进程（冷启动），超过预算时以非0退出码结束，可作为回归检查
+
+用法: python benchmarks/bench_startup.py [--runs 5] [--wallets 100] [--budget-prompt 0.5] [--budget-headless 3]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_rpc import MockRPCServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENU_PROMPT = '请输入选择'.encode('utf-8')
+
+
+def generate_csv(path: str, rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('index,address,privateKey\n')
+        for i in range(1, rows + 1):
+            f.write(f"{i},0x{rng.getrandbits(160):040x},0x{rng.getrandbits(256):064x}\n")
+
+
+def time_to_output(command, marker: bytes, stdin_data: bytes = b'', timeout: float = 60) -> float:
+    """启动进程，返回 stdout 中第一次出现 marker 的耗时（秒），然后等待进程结束；超时则结束进程"""
+    env = dict(os.environ, PYTHONUNBUFFERED='1', TERM=os.environ.get('TERM', 'dumb'))
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    # 启动时卡在网络连接或输入提示上也不会让基准测试一直挂起
+    watchdog = threading.Timer(timeout, process.kill)
+    watchdog.start()
+    elapsed = None
+    output = b''
+    while True:
+        chunk = os.read(process.stdout.fileno(), 65536)
+        if not chunk:
+            break
+        output += chunk
+        if elapsed is None and marker in output:
+            elapsed = time.perf_counter() - start
+            if stdin_data:
+                process.stdin.write(stdin_data)
+                process.stdin.flush()
+    process.stdin.close()
+    process.wait()
+    watchdog.cancel()
+    if elapsed is None:
+        raise RuntimeError(f"未找到输出 {marker!r}: {' '.join(command)} (退出码 {process.returncode})")
+    return elapsed
+
+
+def report(name: str, samples, budget: float) -> bool:
+    median = statistics.median(samples)
+    ok = median <= budget
+    print(f"{name}: 中位数 {median * 1000:7.0f}ms  最快 {min(samples) * 1000:7.0f}ms  "
+          f"预算 {budget * 1000:.0f}ms  {'✅' if ok else '❌ 超出预算'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动基准测试')
+    parser.add_argument('--runs', type=int, default=5, help='每项测量的次数')
+    parser.add_argument('--wallets', type=int, default=100, help='命令行 scan 使用的钱包数')
+    parser.add_argument('--budget-prompt', type=float, default=0.5, help='到第一个菜单提示的预算（秒）')
+    parser.add_argument('--budget-headless', type=float, default=3.0, help='到第一条命令行结果的预算（秒）')
+    args = parser.parse_args()
+
+    server = MockRPCServer().start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'wallets.csv')
+            generate_csv(csv_path, args.wallets)
+
+            # 菜单最后一项为退出
+            prompt_samples = [
+                time_to_output([sys.executable, 'irys_checker.py'], MENU_PROMPT, stdin_data=b'11\n')
+                for _ in range(args.runs)
+            ]
+            headless_command = [sys.executable, 'cli.py', 'scan', csv_path, '--rpc', server.url,
+                                '--format', 'jsonl', '--no-cache', '--no-journal']
+            headless_samples = [time_to_output(headless_command, b'\n') for _ in range(args.runs)]
+    finally:
+        server.stop()
+
+    print(f"运行次数: {args.runs}, 命令行 scan 钱包数: {args.wallets}")
+    ok = report('启动到菜单提示    ', prompt_samples, args.budget_prompt)
+    ok = report('启动到第一条scan结果', headless_samples, args.budget_headless) and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线基准测试套件
+功能：启动本地模拟 JSON-RPC 节点（可配置延迟、错误率、限流），在不同钱包规模下依次运行
+CSV加载、check_all_balances、CSVFilter.filter_and_export、多对一归集和一对多转账，
+报告每个阶段的吞吐量和峰值内存；每组测量在独立的子进程中运行，互不影响内存统计
+
+用法: python benchmarks/bench_suite.py [--sizes 1000,100000,1000000] [--profile testnet]
+                                      [--stages load,scan,filter,sweep,disperse] [--transfer-limit 2000]
+                                      [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from decimal import Decimal
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_rpc import add_profile_arguments, server_from_args
+
+ALL_STAGES = ('load', 'scan', 'filter', 'sweep', 'disperse')
+SWEEP_TARGET = '0x000000000000000000000000000000000000dEaD'
+
+
+def generate_csv(path: str, rows: int, seed: int = 42):
+    """生成测试用钱包CSV（私钥与地址不对应，模拟节点不校验签名者）"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('index,address,privateKey\n')
+        for i in range(1, rows + 1):
+            f.write(f"{i},0x{rng.getrandbits(160):040x},0x{rng.getrandbits(255) + 1:064x}\n")
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值常驻内存（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def create_checker(rpc_url: str, options: Dict):
+    from irys_checker import IrysChecker
+    from concurrency import RateLimiter
+
+    checker = IrysChecker(rpc_urls=[rpc_url], interactive=False)
+    checker.balance_cache = None  # 每次都真正查询模拟节点
+    checker.journal_enabled = False
+    checker.verify_keys = False  # 测试CSV的私钥与地址不对应
+    checker.scan_mode = options['scan_mode']
+    checker.batch_size = options['batch_size']
+    checker.tx_rate_limiter = RateLimiter(rate=options['tx_rate'])
+    checker.receipt_timeout = options['receipt_timeout']
+    return checker
+
+
+def timed(stage: str, items: int, func) -> Dict:
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    return {'stage': stage, 'items': items, 'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}
+
+
+def run_scan_pipeline(rpc_url: str, options: Dict, csv_path: str, stages: List[str]) -> List[Dict]:
+    """加载 -> 余额查询 -> 过滤导出，在同一进程中依次进行（后一阶段依赖前一阶段的结果）"""
+    import wallet_loader  # noqa: F401  预先导入，加载吞吐量不包含 pandas/web3 的导入时间（见 bench_startup.py）
+
+    checker = create_checker(rpc_url, options)
+    results = [timed('load', 0, lambda: checker.load_wallets_from_csv(csv_path))]
+    results[0]['items'] = len(checker.wallets)
+
+    if 'scan' in stages or 'filter' in stages:
+        scan = checker._scan_balances if options['no_render'] else checker.check_all_balances
+        results.append(timed('scan', len(checker.wallets), scan))
+    if 'filter' in stages:
+        output_path = csv_path + '.filtered.csv'
+        results.append(timed('filter', len(checker.wallets),
+                             lambda: checker.csv_filter.filter_and_export(checker.wallets, output_path, Decimal('0'))))
+        if os.path.exists(output_path):
+            os.remove(output_path)
+    return [r for r in results if r['stage'] in stages]
+
+
+def run_transfer(rpc_url: str, options: Dict, stage: str, csv_path: str) -> List[Dict]:
+    """多对一归集或一对多转账"""
+    checker = create_checker(rpc_url, options)
+    checker.load_wallets_from_csv(csv_path)
+    count = len(checker.wallets)
+    if stage == 'sweep':
+        result = timed('sweep', count,
+                       lambda: checker._sweep_wallets(SWEEP_TARGET, Decimal('0'), options['sweep_concurrency']))
+    else:
+        sender = checker.wallets[0]
+        result = timed('disperse', count - 1, lambda: checker._disperse(sender, Decimal('0.0001')))
+    return [result]
+
+
+def _child(queue, func, args):
+    # 被测代码的输出很多，丢弃以免影响计时
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        queue.put(('ok', func(*args)))
+    except BaseException as e:
+        queue.put(('error', f"{type(e).__name__}: {e}"))
+
+
+def run_isolated(func, *args) -> List[Dict]:
+    """在独立子进程中运行一组测量，返回结果列表"""
+    method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(method)
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(queue, func, args))
+    process.start()
+    status, payload = queue.get()
+    process.join()
+    if status != 'ok':
+        raise RuntimeError(payload)
+    return payload
+
+
+def format_rate(items: int, seconds: float) -> str:
+    return f"{items / seconds:,.0f}" if seconds > 0 else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线基准测试套件')
+    parser.add_argument('--sizes', default='1000,100000,1000000', help='钱包规模，逗号分隔 (默认: 1000,100000,1000000)')
+    parser.add_argument('--stages', default=','.join(ALL_STAGES), help=f"要运行的阶段 (默认: {','.join(ALL_STAGES)})")
+    parser.add_argument('--transfer-limit', type=int, default=2000,
+                        help='转账阶段最多使用的钱包数（每笔都要签名，规模过大时按该值截取）(默认: 2000)')
+    parser.add_argument('--scan-mode', choices=['batch', 'async', 'thread'], default='batch', help='余额查询模式')
+    parser.add_argument('--batch-size', type=int, default=100, help='每个JSON-RPC batch的调用数')
+    parser.add_argument('--sweep-concurrency', type=int, default=16, help='同时归集的钱包数')
+    parser.add_argument('--tx-rate', type=float, default=0, help='每秒最多发送的交易数，0表示不限速')
+    parser.add_argument('--receipt-timeout', type=float, default=30, help='等待交易上链的最长时间（秒）')
+    parser.add_argument('--no-render', action='store_true', help='余额查询后不渲染结果表格（只测查询）')
+    parser.add_argument('--output', help='把结果保存为JSON文件')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = set(stages) - set(ALL_STAGES)
+    if unknown:
+        parser.error(f"未知阶段: {', '.join(sorted(unknown))}")
+
+    options = {
+        'scan_mode': args.scan_mode,
+        'batch_size': args.batch_size,
+        'sweep_concurrency': args.sweep_concurrency,
+        'tx_rate': args.tx_rate or None,
+        'receipt_timeout': args.receipt_timeout,
+        'no_render': args.no_render
+    }
+
+    server = server_from_args(args).start()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in sizes:
+                csv_path = os.path.join(tmp, f'wallets_{size}.csv')
+                generate_csv(csv_path, size)
+
+                runs = []
+                pipeline_stages = [stage for stage in stages if stage in ('load', 'scan', 'filter')]
+                if pipeline_stages:
+                    runs.append((run_scan_pipeline, csv_path, pipeline_stages))
+
+                transfer_stages = [stage for stage in stages if stage in ('sweep', 'disperse')]
+                if transfer_stages:
+                    transfer_path = csv_path
+                    if size > args.transfer_limit:
+                        transfer_path = os.path.join(tmp, f'wallets_{size}_transfer.csv')
+                        generate_csv(transfer_path, args.transfer_limit)
+                    for stage in transfer_stages:
+                        runs.append((run_transfer, stage, transfer_path))
+
+                for func, *func_args in runs:
+                    server.reset_stats()
+                    stage_results = run_isolated(func, server.url, options, *func_args)
+                    # 一组测量中的RPC调用都记在发起调用的阶段（加载和导出不访问节点）
+                    rpc_stats = server.stats()
+                    for result in stage_results:
+                        result['size'] = size
+                        result['rpc'] = rpc_stats if result['stage'] in ('scan', 'sweep', 'disperse') else None
+                        results.append(result)
+                        print(f"规模 {size:>9,}  {result['stage']:<9} {result['items']:>9,} 项  "
+                              f"{result['seconds']:8.2f}s  {format_rate(result['items'], result['seconds']):>10} 项/秒  "
+                              f"峰值内存 {result['peak_rss_mb']:8.1f} MB", flush=True)
+    finally:
+        server.stop()
+
+    from tabulate import tabulate
+
+    table = []
+    for result in results:
+        rpc = result['rpc']
+        table.append([
+            f"{result['size']:,}", result['stage'], f"{result['items']:,}", f"{result['seconds']:.2f}",
+            format_rate(result['items'], result['seconds']), f"{result['peak_rss_mb']:.1f}",
+            '-' if rpc is None else f"{rpc['http_requests']:,}/{rpc['calls']:,}",
+            '-' if rpc is None else f"{rpc['injected_errors']}/{rpc['throttled']}"
+        ])
+    print(f"\n节点状况: {args.profile}  查询模式: {args.scan_mode}  转账钱包上限: {args.transfer_limit}")
+    print(tabulate(table, headers=['规模', '阶段', '数量', '耗时(秒)', '吞吐量(项/秒)', '峰值内存(MB)',
+                                   'HTTP请求/RPC调用', '注入错误/限流'], tablefmt='grid'))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'profile': args.profile, 'options': options, 'results': results}, f, indent=2)
+        print(f"结果已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
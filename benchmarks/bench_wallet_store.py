@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+钱包存储内存基准测试
+功能：对比钱包字典列表与列式 WalletStore 每个钱包占用的内存
+
+用法: python benchmarks/bench_wallet_store.py [钱包数]
+"""
+
+import os
+import sys
+import random
+import tracemalloc
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wallet_store import WalletStore
+
+
+def make_wallets(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        yield {
+            'index': i,
+            'address': f"0x{rng.getrandbits(160):040x}",
+            'private_key': f"0x{rng.getrandbits(256):064x}",
+            'balance': Decimal(rng.randrange(10 ** 20)) / Decimal(10 ** 18),
+            'source_file': f"wallets_{i % 10}.csv"
+        }
+
+
+def measure(build) -> int:
+    """返回构建结果保留的内存字节数"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    dict_bytes = measure(lambda: list(make_wallets(count)))
+    store_bytes = measure(lambda: WalletStore.from_wallets(make_wallets(count)))
+
+    print(f"钱包数: {count}")
+    print(f"字典列表:    {dict_bytes / count:8.1f} 字节/钱包  (共 {dict_bytes / 1024 / 1024:.1f} MB)")
+    print(f"WalletStore: {store_bytes / count:8.1f} 字节/钱包  (共 {store_bytes / 1024 / 1024:.1f} MB)")
+    print(f"节省: {(1 - store_bytes / dict_bytes) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地模拟 JSON-RPC 节点（仅用于基准测试）
+功能：在本机端口上响应余额查询和转账相关的RPC方法，支持单个请求和 batch 请求；
+余额由地址确定性生成，发送的交易立即"上链"；可配置延迟、错误率和限流，模拟不同的节点状况
+
+支持的方法: eth_chainId / eth_blockNumber / eth_getBalance / eth_gasPrice / eth_getTransactionCount /
+           eth_sendRawTransaction / eth_getTransactionReceipt / eth_getTransactionByHash
+
+用法: python benchmarks/mock_rpc.py [--port 8545] [--profile testnet] [--latency 50] [--error-rate 0.01] [--rate-limit 100]
+"""
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+CHAIN_ID = 1270
+GAS_PRICE = 10 ** 9
+
+# 预设的节点状况：latency/jitter 为每个HTTP请求的延迟（毫秒），error_rate 为单个调用返回错误的比例，
+# rate_limit 为每秒允许的HTTP请求数（超出返回 429），None表示不限
+PROFILES: Dict[str, Dict] = {
+    'fast': {'latency': 0, 'jitter': 0, 'error_rate': 0.0, 'rate_limit': None},
+    'testnet': {'latency': 80, 'jitter': 30, 'error_rate': 0.002, 'rate_limit': 200},
+    'flaky': {'latency': 30, 'jitter': 20, 'error_rate': 0.05, 'rate_limit': None},
+    'throttled': {'latency': 20, 'jitter': 10, 'error_rate': 0.0, 'rate_limit': 30},
+}
+
+
+def balance_of(address: str) -> int:
+    """按地址生成确定的余额（wei），约 1/4 的地址余额为0"""
+    digest = hashlib.sha256(address.lower().encode('utf-8')).digest()
+    if digest[0] < 64:
+        return 0
+    return int.from_bytes(digest[:8], 'big') % (10 * 10 ** 18)
+
+
+class MockRPCServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, chain_id: int = CHAIN_ID, block_number: int = 1000,
+                 latency: float = 0, jitter: float = 0, error_rate: float = 0.0, rate_limit: Optional[float] = None,
+                 seed: int = 42):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            chain_id: eth_chainId 返回的链ID
+            block_number: 初始区块高度（每收到一笔交易加1）
+            latency: 每个HTTP请求的固定延迟（毫秒）
+            jitter: 延迟的随机波动范围（毫秒）
+            error_rate: 单个调用返回 JSON-RPC 错误的比例
+            rate_limit: 每秒允许的HTTP请求数，超出返回 HTTP 429，None表示不限
+            seed: 随机数种子（错误注入和延迟波动）
+        """
+        self.chain_id = chain_id
+        self.block_number = block_number
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+
+        self.counts: Dict[str, int] = {}  # 方法 -> 调用次数
+        self.http_requests = 0
+        self.injected_errors = 0
+        self.throttled = 0
+        self._transactions: Dict[str, int] = {}  # 交易哈希 -> 所在区块
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @classmethod
+    def from_profile(cls, profile: str, **overrides) -> 'MockRPCServer':
+        """按预设名称创建，overrides 中不为None的参数覆盖预设"""
+        options = dict(PROFILES[profile])
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**options)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockRPCServer':
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-rpc', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict:
+        """调用统计"""
+        with self._lock:
+            return {
+                'http_requests': self.http_requests,
+                'calls': sum(self.counts.values()),
+                'injected_errors': self.injected_errors,
+                'throttled': self.throttled,
+                'methods': dict(self.counts)
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.counts = {}
+            self.http_requests = 0
+            self.injected_errors = 0
+            self.throttled = 0
+
+    def _admit(self) -> bool:
+        """按1秒窗口计数，超过 rate_limit 的请求被限流"""
+        with self._lock:
+            self.http_requests += 1
+            if not self.rate_limit:
+                return True
+            now = time.monotonic()
+            if now - self._window_start >= 1:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            if self._window_count > self.rate_limit:
+                self.throttled += 1
+                return False
+            return True
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                wobble = self._random.uniform(-self.jitter, self.jitter)
+            time.sleep(max(0.0, self.latency + wobble) / 1000)
+
+    def handle_call(self, call: dict) -> dict:
+        """处理单个 JSON-RPC 调用"""
+        method = call.get('method')
+        params = call.get('params') or []
+        rid = call.get('id')
+
+        with self._lock:
+            self.counts[method] = self.counts.get(method, 0) + 1
+            inject_error = self.error_rate and self._random.random() < self.error_rate
+            if inject_error:
+                self.injected_errors += 1
+        if inject_error and method not in ('eth_chainId', 'eth_blockNumber'):
+            return {'jsonrpc': '2.0', 'id': rid, 'error': {'code': -32000, 'message': 'internal error (injected)'}}
+
+        if method == 'eth_chainId':
+            result = hex(self.chain_id)
+        elif method == 'eth_blockNumber':
+            result = hex(self.block_number)
+        elif method == 'eth_getBalance':
+            result = hex(balance_of(params[0]))
+        elif method == 'eth_gasPrice':
+            result = hex(GAS_PRICE)
+        elif method == 'eth_getTransactionCount':
+            # 模拟节点不校验nonce，客户端在本地连续分配
+            result = hex(0)
+        elif method == 'eth_sendRawTransaction':
+            result = self._send_raw_transaction(params[0])
+        elif method == 'eth_getTransactionReceipt':
+            result = self._receipt(params[0])
+        elif method == 'eth_getTransactionByHash':
+            block = self._transactions.get(params[0])
+            result = None if block is None else {'hash': params[0], 'blockNumber': hex(block)}
+        else:
+            return {'jsonrpc': '2.0', 'id': rid, 'error': {'code': -32601, 'message': f'method not found: {method}'}}
+        return {'jsonrpc': '2.0', 'id': rid, 'result': result}
+
+    def _send_raw_transaction(self, raw: str) -> str:
+        from eth_utils import keccak
+
+        data = bytes.fromhex(raw[2:] if raw.startswith('0x') else raw)
+        tx_hash = '0x' + keccak(data).hex()
+        with self._lock:
+            # 每笔交易在下一个区块上链
+            self.block_number += 1
+            self._transactions[tx_hash] = self.block_number
+        return tx_hash
+
+    def _receipt(self, tx_hash: str) -> Optional[Dict]:
+        block = self._transactions.get(tx_hash)
+        if block is None:
+            return None
+        return {
+            'transactionHash': tx_hash,
+            'blockNumber': hex(block),
+            'blockHash': '0x' + hashlib.sha256(str(block).encode()).hexdigest(),
+            'transactionIndex': '0x0',
+            'status': '0x1',
+            'gasUsed': hex(21000),
+            'cumulativeGasUsed': hex(21000),
+            'logs': [],
+            'logsBloom': '0x' + '00' * 256,
+            'from': None,
+            'to': None,
+            'contractAddress': None,
+            'effectiveGasPrice': hex(GAS_PRICE),
+            'type': '0x2'
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # 保持连接，客户端的会话可以复用TCP连接；响应头和正文分两次写出，
+            # 需要关闭 Nagle 算法，否则每个请求都要等待对端的延迟确认
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                server._delay()
+                if not server._admit():
+                    self._reply(429, b'Too Many Requests', 'text/plain')
+                    return
+
+                request = json.loads(body)
+                if isinstance(request, list):
+                    response = [server.handle_call(call) for call in request]
+                else:
+                    response = server.handle_call(request)
+                self._reply(200, json.dumps(response).encode('utf-8'), 'application/json')
+
+            def _reply(self, status: int, data: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """添加节点状况相关的命令行参数（基准测试脚本共用）"""
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='fast', help='预设的节点状况 (默认: fast)')
+    parser.add_argument('--latency', type=float, help='每个HTTP请求的延迟（毫秒），覆盖预设')
+    parser.add_argument('--jitter', type=float, help='延迟的随机波动（毫秒），覆盖预设')
+    parser.add_argument('--error-rate', type=float, help='单个调用返回错误的比例，覆盖预设')
+    parser.add_argument('--rate-limit', type=float, help='每秒允许的HTTP请求数，覆盖预设')
+
+
+def server_from_args(args, port: int = 0) -> MockRPCServer:
+    return MockRPCServer.from_profile(args.profile, port=port, latency=args.latency, jitter=args.jitter,
+                                      error_rate=args.error_rate, rate_limit=args.rate_limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟 JSON-RPC 节点')
+    parser.add_argument('--port', type=int, default=8545, help='监听端口 (默认: 8545)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, port=args.port)
+    print(f"模拟节点已启动: {server.url} (状况: {args.profile})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
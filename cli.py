@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Irys 钱包工具命令行批处理入口
+功能：不经过交互菜单，用子命令 scan / filter / sweep / disperse 完成余额查询、过滤导出和批量转账，
+适合在 cron 或流水线中运行；进度信息输出到 stderr，结果以 JSON / CSV 输出到 stdout 或文件，
+并用退出码表示执行结果
+
+用法示例:
+    python cli.py scan wallets/ --snapshot --format jsonl > balances.jsonl
+    python cli.py filter a.csv b.csv --min-balance 0.1 --output rich.csv
+    python cli.py sweep wallets/ --to 0x... --reserve 0.01 --concurrency 32 --yes
+    python cli.py disperse wallets.csv --from-index 1 --amount 0.05 --rate 20 --yes
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+import traceback
+import contextlib
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+
+from colorama import AnsiToWin32, Fore, Style
+
+from concurrency import AdaptiveLimiter, RateLimiter
+from profiling import ActionProfiler, stage, staged
+
+# 退出码
+EXIT_OK = 0           # 全部成功
+EXIT_PARTIAL = 1      # 部分钱包查询失败或交易失败/未上链
+EXIT_USAGE = 2        # 参数或输入文件错误（与 argparse 的参数错误一致）
+EXIT_CONNECTION = 3   # 无法连接RPC端点
+EXIT_ERROR = 4        # 未预期的错误（程序异常，区别于部分成功）
+EXIT_INTERRUPTED = 130
+
+
+class CLIError(Exception):
+    """参数或输入错误，对应退出码 EXIT_USAGE"""
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description='Irys Network Testnet 钱包批处理工具（非交互）'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('inputs', nargs='+', help='钱包CSV文件或目录（目录下的CSV会递归加载）')
+    common.add_argument('--rpc', action='append', metavar='URL', help='RPC端点，可重复指定多个')
+    common.add_argument('--no-journal', action='store_true', help='不记录任务日志（中断后不可恢复）')
+    common.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='在本机该端口提供 Prometheus 格式的RPC指标（/metrics），运行结束后关闭')
+    common.add_argument('--profile', action='store_true',
+                        help='对本次运行做性能分析（cProfile 和各阶段耗时），报告输出到 stderr')
+    common.add_argument('--profile-dir', default=os.path.join('.irys_cache', 'profiles'),
+                        help='性能分析结果目录 (默认: .irys_cache/profiles)')
+
+    scan_options = argparse.ArgumentParser(add_help=False)
+    scan_options.add_argument('--mode', choices=['batch', 'async', 'thread'], default='batch',
+                              help='余额查询模式 (默认: batch)')
+    scan_options.add_argument('--batch-size', type=int, default=100, help='每个JSON-RPC batch的调用数 (默认: 100)')
+    scan_options.add_argument('--concurrency', type=int, help='同时在途的最大请求/批次数')
+    scan_options.add_argument('--snapshot', action='store_true', help='所有余额固定在扫描开始时的区块查询')
+    scan_options.add_argument('--block', type=int, help='在指定区块查询（隐含 --snapshot）')
+    scan_options.add_argument('--no-cache', action='store_true', help='不使用本地余额缓存')
+    scan_options.add_argument('--cache-ttl', type=float, metavar='SECONDS',
+                              help='余额缓存有效期（秒），0表示不按时间过期 (默认: 300)')
+    scan_options.add_argument('--cache-max-block-age', type=int, metavar='BLOCKS',
+                              help='余额缓存最多落后当前区块的区块数 (默认: 不限制)')
+
+    transfer_options = argparse.ArgumentParser(add_help=False)
+    transfer_options.add_argument('--rate', type=float, help='每秒最多发送的交易数，0表示不限速 (默认: 10)')
+    transfer_options.add_argument('--receipt-timeout', type=float, help='等待交易上链的最长时间（秒）')
+    transfer_options.add_argument('--yes', action='store_true', help='确认发送交易（批量转账不可撤销，必须指定）')
+    transfer_options.add_argument('--no-verify-keys', action='store_true',
+                                  help='转账前不校验私钥与地址是否对应（默认校验，结果按文件缓存）')
+
+    scan = subparsers.add_parser('scan', parents=[common, scan_options], help='查询所有钱包余额')
+    scan.add_argument('--format', choices=['json', 'jsonl', 'csv'], default='json', help='输出格式 (默认: json)')
+    scan.add_argument('--output', '-o', help='输出文件，默认输出到 stdout')
+
+    filter_parser = subparsers.add_parser('filter', parents=[common, scan_options],
+                                          help='查询余额并导出余额大于阈值的钱包CSV')
+    filter_parser.add_argument('--min-balance', default='0', help='最小余额阈值 (默认: 0)')
+    filter_parser.add_argument('--output', '-o', help='输出CSV文件（以 .gz 结尾时压缩），默认自动生成文件名')
+
+    sweep = subparsers.add_parser('sweep', parents=[common, transfer_options], help='多对一归集到目标地址')
+    sweep.add_argument('--to', required=True, dest='target', help='归集目标地址')
+    sweep.add_argument('--reserve', default='0.01', help='每个钱包保留的余额 (默认: 0.01)')
+    sweep.add_argument('--concurrency', type=int, help='同时归集的钱包数 (默认: 16)')
+
+    disperse = subparsers.add_parser('disperse', parents=[common, transfer_options],
+                                     help='一对多，从发送方向其余所有钱包转账')
+    sender = disperse.add_mutually_exclusive_group(required=True)
+    sender.add_argument('--from', dest='sender', help='发送方地址（必须在已加载的钱包中）')
+    sender.add_argument('--from-index', type=int, help='发送方在已加载钱包中的序号（从1开始）')
+    disperse.add_argument('--amount', required=True, help='单笔转账金额')
+
+    return parser
+
+
+def parse_decimal(value: str, name: str) -> Decimal:
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise CLIError(f"{name} 格式不正确: {value}")
+
+
+def resolve_inputs(checker, inputs: List[str]) -> List[str]:
+    """把文件和目录参数展开为CSV文件列表（保持参数顺序，去重）"""
+    file_paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            file_paths.extend(checker.scan_directory_for_csv(path))
+        elif os.path.isfile(path):
+            file_paths.append(path)
+        else:
+            raise CLIError(f"文件或目录不存在: {path}")
+    file_paths = list(dict.fromkeys(file_paths))
+    if not file_paths:
+        raise CLIError("没有找到可加载的CSV文件")
+    return file_paths
+
+
+def create_checker(args):
+    """创建非交互模式的 IrysChecker 并加载输入文件"""
+    from irys_checker import IrysChecker
+
+    # 先检查输入路径，避免参数错误时还要等待连接节点
+    for path in args.inputs:
+        if not os.path.exists(path):
+            raise CLIError(f"文件或目录不存在: {path}")
+
+    checker = IrysChecker(rpc_urls=args.rpc, interactive=False)
+    if args.no_journal:
+        checker.journal_enabled = False
+    if args.metrics_port is not None:
+        try:
+            checker.start_metrics_server(args.metrics_port)
+        except OSError as e:
+            raise CLIError(f"无法监听指标端口 {args.metrics_port}: {e}")
+
+    if not checker.load_multiple_csv_files(resolve_inputs(checker, args.inputs)):
+        raise CLIError("钱包文件加载失败")
+    return checker
+
+
+def configure_scan(checker, args):
+    """把余额查询相关参数应用到 checker"""
+    checker.scan_mode = args.mode
+    checker.batch_size = max(1, args.batch_size)
+    if args.concurrency:
+        limit = max(1, args.concurrency)
+        checker.scan_limiter = AdaptiveLimiter(initial=min(8, limit), min_limit=min(2, limit), max_limit=limit)
+        checker.async_concurrency = limit
+    if args.no_cache:
+        checker.balance_cache = None
+    if args.cache_ttl is not None:
+        if args.cache_ttl < 0:
+            raise CLIError("--cache-ttl 不能为负数")
+        checker.cache_ttl = args.cache_ttl or None
+    if args.cache_max_block_age is not None:
+        if args.cache_max_block_age < 0:
+            raise CLIError("--cache-max-block-age 不能为负数")
+        checker.cache_max_block_age = args.cache_max_block_age
+
+
+def configure_transfer(checker, args):
+    """把转账相关参数应用到 checker，未确认发送时报错"""
+    if not args.yes:
+        raise CLIError("批量转账不可撤销，请确认参数后加上 --yes 运行")
+    if args.rate is not None:
+        checker.tx_rate_limiter = RateLimiter(rate=args.rate or None)
+    if args.receipt_timeout is not None:
+        checker.receipt_timeout = args.receipt_timeout
+    if args.no_verify_keys:
+        checker.verify_keys = False
+
+
+def run_balance_scan(checker, args) -> bool:
+    """按参数查询余额，返回是否完成"""
+    if not checker.w3 or not hasattr(checker.w3.eth, 'get_balance'):
+        raise ConnectionError("离线模式，无法获取余额")
+    snapshot = args.snapshot or args.block is not None
+    return checker._scan_balances(snapshot, args.block)
+
+
+def format_balance(balance: Optional[Decimal]) -> Optional[str]:
+    return None if balance is None else str(balance)
+
+
+def wallet_records(checker):
+    """逐个生成钱包余额记录（不包含私钥）"""
+    for wallet in checker.wallets:
+        yield {
+            'index': wallet['index'],
+            'address': wallet['address'],
+            'balance': format_balance(wallet['balance']),
+            'source_file': wallet.get('source_file'),
+            'block_number': wallet.get('block_number')
+        }
+
+
+def scan_summary(checker) -> Dict:
+    """余额查询的统计信息"""
+    balances = [wallet['balance'] for wallet in checker.wallets]
+    failed = sum(1 for balance in balances if balance is None)
+    return {
+        'wallets': len(balances),
+        'failed': failed,
+        'total_balance': str(sum((b for b in balances if b is not None), Decimal('0'))),
+        'symbol': checker.symbol,
+        'block_number': checker.last_scan_block,
+        'duplicates': checker.wallets.duplicate_count,
+        'stats': checker.last_scan_stats
+    }
+
+
+@staged('export')
+def write_scan_output(checker, output_format: str, stream):
+    """按格式写出余额查询结果，逐行写出，不在内存中构建整份输出"""
+    if output_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=['index', 'address', 'balance', 'source_file', 'block_number'])
+        writer.writeheader()
+        for record in wallet_records(checker):
+            writer.writerow(record)
+    elif output_format == 'jsonl':
+        for record in wallet_records(checker):
+            stream.write(json.dumps(record) + '\n')
+    else:
+        summary = scan_summary(checker)
+        stream.write('{"summary": ' + json.dumps(summary, default=str) + ', "wallets": [')
+        for i, record in enumerate(wallet_records(checker)):
+            stream.write((',\n' if i else '\n') + json.dumps(record))
+        stream.write('\n]}\n')
+
+
+def command_scan(checker, args, stdout) -> Tuple[int, Optional[Dict]]:
+    configure_scan(checker, args)
+    if not run_balance_scan(checker, args):
+        return EXIT_PARTIAL, {'error': '余额查询未完成'}
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline='') as f:
+            write_scan_output(checker, args.format, f)
+        summary = scan_summary(checker)
+        summary['output'] = args.output
+        result = summary
+    else:
+        write_scan_output(checker, args.format, stdout)
+        result = None
+
+    failed = sum(1 for wallet in checker.wallets if wallet['balance'] is None)
+    return (EXIT_PARTIAL if failed else EXIT_OK), result
+
+
+def command_filter(checker, args, stdout) -> Tuple[int, Optional[Dict]]:
+    min_balance = parse_decimal(args.min_balance, '--min-balance')
+    configure_scan(checker, args)
+    if not run_balance_scan(checker, args):
+        return EXIT_PARTIAL, {'error': '余额查询未完成'}
+
+    from csv_filter import CSVExportWriter, has_block_numbers
+
+    # 边过滤边写入（.gz 结尾时压缩），没有符合条件的钱包时不创建文件
+    output_path = args.output or checker.csv_filter.generate_output_filename()
+    writer = CSVExportWriter(output_path, include_block=has_block_numbers(checker.wallets))
+    completed = False
+    try:
+        with stage('export'), writer:
+            for wallet in checker.csv_filter.iter_wallets_with_balance(checker.wallets, min_balance):
+                writer.write(wallet)
+        completed = True
+    except OSError as e:
+        return EXIT_PARTIAL, {'error': f'导出失败: {output_path}: {e}'}
+    finally:
+        # 中途失败或中断时不留下只有部分结果的导出文件
+        if not completed:
+            writer.discard()
+
+    summary = scan_summary(checker)
+    summary.update({
+        'min_balance': str(min_balance),
+        'matched': writer.count,
+        'output': output_path if writer.count else None
+    })
+    return (EXIT_PARTIAL if summary['failed'] else EXIT_OK), summary
+
+
+def transfer_record(result: Dict, target_key: str) -> Dict:
+    record = {
+        target_key: result[target_key],
+        'status': {'已提交': 'submitted', '跳过': 'skipped', '失败': 'failed'}.get(result['status'], result['status']),
+        'tx_hash': result.get('tx_hash'),
+        'receipt': result.get('receipt_status')
+    }
+    for field in ('balance', 'amount'):
+        if field in result:
+            record[field] = format_balance(result[field])
+    if result.get('error'):
+        record['error'] = result['error']
+    return record
+
+
+def transfer_exit_code(records: List[Dict]) -> int:
+    """有失败、回滚、丢弃或未确认的交易时返回 EXIT_PARTIAL"""
+    for record in records:
+        if record['status'] == 'failed':
+            return EXIT_PARTIAL
+        if record['status'] == 'submitted' and record['receipt'] != 'mined':
+            return EXIT_PARTIAL
+    return EXIT_OK
+
+
+def command_sweep(checker, args, stdout) -> Tuple[int, Optional[Dict]]:
+    from web3 import Web3
+
+    reserve = parse_decimal(args.reserve, '--reserve')
+    if not Web3.is_address(args.target):
+        raise CLIError(f"目标地址格式不正确: {args.target}")
+    configure_transfer(checker, args)
+    if not hasattr(checker.w3.eth, 'send_raw_transaction'):
+        raise ConnectionError("离线模式，无法发送交易")
+
+    concurrency = max(1, args.concurrency or checker.sweep_concurrency)
+    results = checker._sweep_wallets(args.target, reserve, concurrency)
+    records = [transfer_record(result, 'address') for result in results]
+    summary = {
+        'target': args.target,
+        'reserve': str(reserve),
+        'wallets': len(records),
+        'submitted': sum(1 for r in records if r['status'] == 'submitted'),
+        'skipped': sum(1 for r in records if r['status'] == 'skipped'),
+        'failed': sum(1 for r in records if r['status'] == 'failed'),
+        'total_amount': str(sum((r['amount'] for r in results if r['status'] == '已提交'), Decimal('0'))),
+        'transfers': records
+    }
+    return transfer_exit_code(records), summary
+
+
+def command_disperse(checker, args, stdout) -> Tuple[int, Optional[Dict]]:
+    amount = parse_decimal(args.amount, '--amount')
+    if amount <= 0:
+        raise CLIError("--amount 必须大于0")
+
+    if args.from_index is not None:
+        if not 1 <= args.from_index <= len(checker.wallets):
+            raise CLIError(f"--from-index 超出范围 (1-{len(checker.wallets)})")
+        sender_wallet = checker.wallets[args.from_index - 1]
+    else:
+        matches = [wallet for wallet in checker.wallets if wallet['address'].lower() == args.sender.lower()]
+        if not matches:
+            raise CLIError(f"发送方地址不在已加载的钱包中: {args.sender}")
+        sender_wallet = matches[0]
+
+    configure_transfer(checker, args)
+    error = checker.sender_key_error(sender_wallet)
+    if error:
+        raise CLIError(error)
+    if not hasattr(checker.w3.eth, 'send_raw_transaction'):
+        raise ConnectionError("离线模式，无法发送交易")
+
+    outcome = checker._disperse(sender_wallet, amount)
+    records = [transfer_record(result, 'to') for result in outcome['results']]
+    summary = {
+        'sender': sender_wallet['address'],
+        'amount': str(amount),
+        'receivers': len(records),
+        'submitted': outcome['submitted'],
+        'failed': outcome['failed'],
+        'elapsed': round(outcome['elapsed'], 3),
+        'transfers': records
+    }
+    return transfer_exit_code(records), summary
+
+
+def rpc_summary(checker) -> List[Dict]:
+    """本次运行的RPC调用统计（耗时单位为毫秒）"""
+    records = []
+    for row in checker.rpc_metrics.summary():
+        record = {key: row[key] for key in ('endpoint', 'method', 'calls', 'requests', 'errors')}
+        for key in ('avg', 'p50', 'p90', 'p99'):
+            record[f'{key}_ms'] = None if row[key] is None else round(row[key] * 1000, 1)
+        records.append(record)
+    return records
+
+
+COMMANDS = {
+    'scan': command_scan,
+    'filter': command_filter,
+    'sweep': command_sweep,
+    'disperse': command_disperse,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Args:
+        argv: 命令行参数，默认使用 sys.argv
+
+    Returns:
+        退出码
+    """
+    args = build_parser().parse_args(argv)
+    stdout = sys.stdout
+    # 进度和提示信息全部输出到 stderr（非终端时去掉颜色），stdout 只输出结果
+    log_stream = AnsiToWin32(sys.stderr).stream
+
+    code, result = EXIT_OK, None
+    try:
+        with contextlib.redirect_stdout(log_stream):
+            # 分析范围包括加载钱包文件和执行子命令
+            profiler = ActionProfiler(output_dir=args.profile_dir, enabled=args.profile)
+            with profiler.profile(args.command):
+                checker = create_checker(args)
+                code, result = COMMANDS[args.command](checker, args, stdout)
+            checker.show_rpc_summary()
+            if result is not None:
+                result['rpc'] = rpc_summary(checker)
+    except BrokenPipeError:
+        # 下游（例如 head）提前关闭了管道，不再输出（BrokenPipeError 是 ConnectionError 的子类，需先处理）
+        sys.stdout = open(os.devnull, 'w')
+        return EXIT_OK
+    except CLIError as e:
+        code, result = EXIT_USAGE, {'error': str(e)}
+    except ConnectionError as e:
+        code, result = EXIT_CONNECTION, {'error': str(e)}
+    except KeyboardInterrupt:
+        code, result = EXIT_INTERRUPTED, {'error': 'interrupted'}
+    except Exception as e:
+        # 其他异常（例如写输出文件失败）同样以JSON报告，退出码不能与 EXIT_PARTIAL 混淆
+        traceback.print_exc(file=log_stream)
+        code, result = EXIT_ERROR, {'error': f"{type(e).__name__}: {e}"}
+
+    if result is not None:
+        result['exit_code'] = code
+        stdout.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+        stdout.flush()
+    if code not in (EXIT_OK, EXIT_PARTIAL) and result is not None:
+        print(f"{Fore.RED}❌ {result['error']}{Style.RESET_ALL}", file=log_stream)
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应并发控制工具
+功能：根据请求延迟（p95）和错误率动态调整并发数，遇到超时/限流/服务端错误时快速回退；
+令牌桶限速器限制每秒发出的请求数
+"""
+
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+
+# 触发快速回退的错误类型
+BACKOFF_ERRORS = ('timeout', 'throttle', 'server')
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    将异常归类
+
+    Args:
+        error: 请求过程中抛出的异常
+
+    Returns:
+        'timeout' / 'throttle'（HTTP 429） / 'server'（HTTP 5xx） / 'error'（其他错误）
+    """
+    import requests  # 只在出错时需要，避免导入本模块时加载 requests
+
+    # 包装过的异常（raise ... from e）按原始异常判断超时
+    cause = error.__cause__
+    if isinstance(error, (requests.Timeout, TimeoutError)) or isinstance(cause, (requests.Timeout, TimeoutError)):
+        return 'timeout'
+
+    status = getattr(error, 'status', None)
+    response = getattr(error, 'response', None)
+    if status is None and response is not None:
+        status = getattr(response, 'status_code', None)
+
+    if status is None:
+        # web3 会把 HTTPError 转成字符串信息，只能从文本中识别
+        message = str(error).lower()
+        if 'timed out' in message or 'timeout' in message:
+            return 'timeout'
+        if '429' in message or 'too many requests' in message:
+            return 'throttle'
+        for code in ('500', '502', '503', '504'):
+            if code in message:
+                return 'server'
+        return 'error'
+
+    if status == 429:
+        return 'throttle'
+    if status >= 500:
+        return 'server'
+    return 'error'
+
+
+class _Slot:
+    """单个并发槽位，用于在请求结束时上报结果"""
+
+    def __init__(self):
+        self.error_kind: Optional[str] = None
+
+    def fail(self, error: BaseException):
+        """标记本次请求失败"""
+        self.error_kind = classify_error(error)
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 64,
+                 window: int = 50, latency_tolerance: float = 1.5, error_threshold: float = 0.05):
+        """
+        Args:
+            initial: 初始并发数
+            min_limit: 最小并发数
+            max_limit: 最大并发数
+            window: 每次调整前需要收集的样本数
+            latency_tolerance: p95延迟超过基线的倍数后停止增长
+            error_threshold: 错误率超过该值后停止增长
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self.error_threshold = error_threshold
+
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._samples = 0
+        self._errors = 0
+        self._baseline_p95: Optional[float] = None
+        self._last_backoff = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """当前在途请求数"""
+        return self._in_flight
+
+    def acquire(self):
+        """获取一个并发槽位，超过当前上限时阻塞等待"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, error_kind: Optional[str] = None):
+        """
+        释放槽位并记录本次请求结果
+
+        Args:
+            latency: 请求耗时（秒）
+            error_kind: 错误类型，成功时为None
+        """
+        with self._condition:
+            self._in_flight -= 1
+
+            if error_kind in BACKOFF_ERRORS:
+                self._backoff()
+            else:
+                self._samples += 1
+                if error_kind is None:
+                    self._latencies.append(latency)
+                else:
+                    self._errors += 1
+
+                if self._samples >= self.window:
+                    self._adjust()
+
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """
+        以上下文管理器方式占用一个槽位
+
+        用法:
+            with limiter.slot() as slot:
+                try:
+                    ...
+                except Exception as e:
+                    slot.fail(e)
+        """
+        self.acquire()
+        slot = _Slot()
+        start = time.monotonic()
+        try:
+            yield slot
+        except BaseException as e:
+            if slot.error_kind is None:
+                slot.fail(e)
+            raise
+        finally:
+            self.release(time.monotonic() - start, slot.error_kind)
+
+    def _backoff(self):
+        """乘性回退；同一时刻大量失败只回退一次"""
+        now = time.monotonic()
+        if now - self._last_backoff < 1.0:
+            return
+        self._last_backoff = now
+        self._limit = max(self.min_limit, self._limit / 2)
+        self._reset_window()
+
+    def _adjust(self):
+        """在一个采样窗口结束时根据p95和错误率调整并发数"""
+        error_rate = self._errors / self._samples
+        p95 = None
+        if self._latencies:
+            ordered = sorted(self._latencies)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+        if p95 is not None and (self._baseline_p95 is None or p95 < self._baseline_p95):
+            self._baseline_p95 = p95
+
+        latency_flat = p95 is not None and p95 <= self._baseline_p95 * self.latency_tolerance
+        if latency_flat and error_rate <= self.error_threshold:
+            # 延迟和错误率平稳，加性增长
+            self._limit = min(self.max_limit, self._limit + max(1.0, self._limit * 0.1))
+        elif not latency_flat:
+            # 延迟上升，说明节点开始排队，缓慢回落
+            self._limit = max(self.min_limit, self._limit - 1)
+
+        self._reset_window()
+
+    def _reset_window(self):
+        self._latencies.clear()
+        self._samples = 0
+        self._errors = 0
+
+
+class RateLimiter:
+    def __init__(self, rate: Optional[float] = 10, burst: int = 1):
+        """
+        Args:
+            rate: 每秒允许的请求数，None或0表示不限速
+            burst: 允许的突发请求数
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """等待直到可以发出下一个请求"""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 令牌不足时预占一个令牌，按欠下的数量计算等待时间
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
@@ -2,23 +2,187 @@
 # -*- coding: utf-8 -*-
 """
 CSV文件过滤工具
-功能：过滤出余额大于0的钱包地址，生成新的CSV文件
+功能：过滤出余额大于0的钱包地址，生成新的CSV文件；
+导出时边过滤边写入（带缓冲，支持 gzip 压缩和追加），内存占用与钱包数无关
 """
 
+import io
 import os
-import pandas as pd
+import csv
+import gzip
 from decimal import Decimal
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from colorama import init, Fore, Style
 from datetime import datetime
 
+from profiling import stage, staged
+
 # 初始化colorama
 init()
 
+EXPORT_COLUMNS = ['index', 'address', 'privateKey', 'balance', 'source_file']
+EXPORT_BUFFER_SIZE = 1 << 20
+
+
+def is_gzip_path(path: str) -> bool:
+    return path.lower().endswith('.gz')
+
+
+def has_block_numbers(wallets) -> bool:
+    """钱包中是否有余额对应的区块高度（快照查询的结果），决定是否导出 block_number 列"""
+    if hasattr(wallets, 'has_block_numbers'):
+        return wallets.has_block_numbers()
+    if isinstance(wallets, list):
+        return any(wallet.get('block_number') is not None for wallet in wallets)
+    return False
+
+
+class CSVExportWriter:
+    """
+    流式写入导出CSV：第一次写入时才创建文件（没有数据时不产生空文件），每行直接写入缓冲区
+    
+    用法:
+        with CSVExportWriter(path) as writer:
+            for wallet in wallets:
+                writer.write(wallet)
+    
+    写入中途出错时调用 discard() 撤销本次写入的内容
+    """
+    
+    def __init__(self, output_path: str, append: bool = False, start_index: Optional[int] = None,
+                 include_block: bool = False, compress: Optional[bool] = None):
+        """
+        Args:
+            output_path: 输出文件路径
+            append: 是否追加到已有文件（已有内容时不再写表头，列与已有表头一致）
+            start_index: 导出序号的起始值，None表示从1开始（追加时接着已有文件最后一行的序号）
+            include_block: 是否导出余额对应的区块高度列
+            compress: 是否 gzip 压缩，None表示按扩展名 .gz 判断
+        """
+        self.output_path = output_path
+        self.append = append
+        self.compress = is_gzip_path(output_path) if compress is None else compress
+        self.include_block = include_block
+        self.count = 0
+        self._next_index = start_index
+        self._file = None
+        self._writer = None
+        self._opened = False
+        self._original_size: Optional[int] = None  # 追加前已有文件的大小，None表示文件由本次写入创建
+    
+    def _existing_rows(self) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+        """追加模式下已有文件的 (表头, 最后一行)，文件不存在或为空时返回 (None, None)"""
+        if not os.path.exists(self.output_path) or os.path.getsize(self.output_path) == 0:
+            return None, None
+        opener = gzip.open if self.compress else open
+        header = last_row = None
+        with opener(self.output_path, 'rt', encoding='utf-8', newline='') as f:
+            for row in csv.reader(f):
+                if header is None:
+                    header = row
+                elif row:
+                    last_row = row
+        return header, last_row
+    
+    @staticmethod
+    def _last_index(header: Optional[List[str]], last_row: Optional[List[str]]) -> int:
+        """已有文件最后一行的序号，没有数据行或序号无法解析时返回0"""
+        if header is None or last_row is None or 'index' not in header:
+            return 0
+        try:
+            return int(last_row[header.index('index')])
+        except (ValueError, IndexError):
+            return 0
+    
+    def _open(self):
+        header, last_row = self._existing_rows() if self.append else (None, None)
+        if header is not None:
+            self.include_block = 'block_number' in header
+            self._original_size = os.path.getsize(self.output_path)
+        if self._next_index is None:
+            self._next_index = self._last_index(header, last_row) + 1
+        
+        # 确保输出目录存在
+        output_dir = os.path.dirname(self.output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        
+        self._opened = True
+        mode = 'ab' if self.append else 'wb'
+        if self.compress:
+            # 追加时写入新的 gzip 成员，gzip 和 pandas 都能连续读取
+            raw = io.BufferedWriter(gzip.GzipFile(self.output_path, mode), EXPORT_BUFFER_SIZE)
+        else:
+            raw = open(self.output_path, mode, buffering=EXPORT_BUFFER_SIZE)
+        self._file = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file, lineterminator='\n')
+        if header is None:
+            self._writer.writerow(EXPORT_COLUMNS + (['block_number'] if self.include_block else []))
+    
+    def write(self, wallet):
+        """写入一个钱包"""
+        if self._writer is None:
+            self._open()
+        row = [self._next_index, wallet['address'], wallet['private_key'], f"{wallet['balance']:.6f}",
+               wallet.get('source_file', '未知')]
+        if self.include_block:
+            row.append(wallet.get('block_number'))
+        self._writer.writerow(row)
+        self._next_index += 1
+        self.count += 1
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+    
+    def discard(self) -> bool:
+        """
+        撤销本次写入：关闭文件，删除本次创建的文件，追加时截回追加前的大小
+        
+        Returns:
+            是否有内容被撤销
+        """
+        try:
+            self.close()
+        except OSError:
+            pass
+        if not self._opened or not os.path.exists(self.output_path):
+            return False
+        if self._original_size is None:
+            os.remove(self.output_path)
+        else:
+            os.truncate(self.output_path, self._original_size)
+        self._opened = False
+        self.count = 0
+        return True
+    
+    def __enter__(self) -> 'CSVExportWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 class CSVFilter:
     def __init__(self):
         self.symbol = "IRYS"
     
+    def iter_wallets_with_balance(self, wallets: Iterable[Dict], min_balance: Decimal = Decimal('0')) -> Iterator[Dict]:
+        """
+        逐个产出余额大于指定数值的钱包（不生成中间列表）
+        
+        Args:
+            wallets: 钱包列表，每个钱包包含地址、私钥、余额等信息
+            min_balance: 最小余额阈值，默认为0
+        """
+        for wallet in wallets:
+            balance = wallet.get('balance')
+            
+            # 跳过没有余额信息的钱包，只保留余额大于阈值的
+            if balance is not None and balance > min_balance:
+                yield wallet
+    
     def filter_wallets_with_balance(self, wallets: List[Dict], min_balance: Decimal = Decimal('0')) -> List[Dict]:
         """
         过滤出余额大于指定数值的钱包
@@ -30,66 +194,53 @@ class CSVFilter:
         Returns:
             过滤后的钱包列表
         """
-        filtered_wallets = []
-        
-        for wallet in wallets:
-            balance = wallet.get('balance')
-            
-            # 跳过没有余额信息的钱包
-            if balance is None:
-                continue
-            
-            # 检查余额是否大于阈值
-            if balance > min_balance:
-                filtered_wallets.append(wallet)
-        
-        return filtered_wallets
+        return list(self.iter_wallets_with_balance(wallets, min_balance))
     
-    def export_filtered_wallets_to_csv(self, filtered_wallets: List[Dict], output_path: str) -> bool:
+    @staged('export')
+    def export_filtered_wallets_to_csv(self, filtered_wallets: Iterable[Dict], output_path: str,
+                                       append: bool = False, start_index: Optional[int] = None,
+                                       compress: Optional[bool] = None) -> bool:
         """
-        将过滤后的钱包数据导出为CSV文件
+        将过滤后的钱包数据流式导出为CSV文件
         
         Args:
-            filtered_wallets: 过滤后的钱包列表
+            filtered_wallets: 过滤后的钱包（列表、钱包存储或迭代器）
             output_path: 输出文件路径
+            append: 是否追加到已有文件（已有内容时不再写表头）
+            start_index: 导出序号的起始值，None表示从1开始（追加时接着已有文件的序号）
+            compress: 是否 gzip 压缩，None表示按扩展名 .gz 判断
             
         Returns:
             是否成功导出
         """
+        # 快照查询的结果额外导出余额对应的区块高度
+        writer = CSVExportWriter(output_path, append, start_index, has_block_numbers(filtered_wallets), compress)
         try:
-            if not filtered_wallets:
+            with writer:
+                for wallet in filtered_wallets:
+                    writer.write(wallet)
+            
+            if writer.count == 0:
                 print(f"{Fore.YELLOW}⚠️  没有符合条件的钱包数据{Style.RESET_ALL}")
                 return False
             
-            # 准备CSV数据
-            csv_data = []
-            for i, wallet in enumerate(filtered_wallets, 1):
-                csv_data.append({
-                    'index': i,
-                    'address': wallet['address'],
-                    'privateKey': wallet['private_key'],
-                    'balance': f"{wallet['balance']:.6f}",
-                    'source_file': wallet.get('source_file', '未知')
-                })
-            
-            # 创建DataFrame
-            df = pd.DataFrame(csv_data)
-            
-            # 确保输出目录存在
-            output_dir = os.path.dirname(output_path)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            
-            # 导出为CSV文件
-            df.to_csv(output_path, index=False, encoding='utf-8')
-            
-            print(f"{Fore.GREEN}✅ 成功导出 {len(filtered_wallets)} 个钱包到 {output_path}{Style.RESET_ALL}")
+            print(f"{Fore.GREEN}✅ 成功导出 {writer.count} 个钱包到 {output_path}{Style.RESET_ALL}")
             return True
             
         except Exception as e:
             print(f"{Fore.RED}❌ 导出CSV文件时出错: {str(e)}{Style.RESET_ALL}")
+            self._discard_partial(writer)
             return False
     
+    @staticmethod
+    def _discard_partial(writer: CSVExportWriter):
+        """导出失败时撤销已写入的部分，不留下只有部分结果的文件"""
+        try:
+            if writer.discard():
+                print(f"{Fore.YELLOW}🗑️  已撤销未完成的导出: {writer.output_path}{Style.RESET_ALL}")
+        except OSError as e:
+            print(f"{Fore.YELLOW}⚠️  无法清理未完成的导出文件 {writer.output_path}: {str(e)}{Style.RESET_ALL}")
+    
     def generate_output_filename(self, base_name: str = "filtered_wallets") -> str:
         """
         生成输出文件名，包含时间戳
@@ -103,6 +254,7 @@ class CSVFilter:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         return f"{base_name}_{timestamp}.csv"
     
+    @staged('render')
     def show_filter_summary(self, original_count: int, filtered_count: int, zero_balance_count: int, failed_count: int):
         """
         显示过滤结果摘要
@@ -153,37 +305,46 @@ class CSVFilter:
         zero_balance_count = 0
         failed_count = 0
         
-        # 过滤钱包
-        filtered_wallets = []
-        for wallet in wallets:
-            balance = wallet.get('balance')
-            
-            if balance is None:
-                failed_count += 1
-                continue
-            
-            if balance <= min_balance:
-                zero_balance_count += 1
-                continue
-            
-            filtered_wallets.append(wallet)
+        # 生成输出文件路径
+        if output_path is None:
+            output_path = self.generate_output_filename()
         
-        filtered_count = len(filtered_wallets)
+        # 边过滤边写入，不保存过滤结果；没有符合条件的钱包时不会创建文件
+        writer = CSVExportWriter(output_path, include_block=has_block_numbers(wallets))
+        completed = False
+        try:
+            with stage('export'), writer:
+                for wallet in wallets:
+                    balance = wallet.get('balance')
+                    
+                    if balance is None:
+                        failed_count += 1
+                        continue
+                    
+                    if balance <= min_balance:
+                        zero_balance_count += 1
+                        continue
+                    
+                    writer.write(wallet)
+            completed = True
+        except Exception as e:
+            print(f"{Fore.RED}❌ 导出CSV文件时出错: {str(e)}{Style.RESET_ALL}")
+            return False
+        finally:
+            # 中途失败或中断时不留下只有部分结果的导出文件
+            if not completed:
+                self._discard_partial(writer)
         
         # 显示过滤摘要
-        self.show_filter_summary(original_count, filtered_count, zero_balance_count, failed_count)
+        self.show_filter_summary(original_count, writer.count, zero_balance_count, failed_count)
         
         # 如果没有符合条件的钱包，直接返回
-        if filtered_count == 0:
+        if writer.count == 0:
             print(f"{Fore.YELLOW}⚠️  没有找到余额大于 {min_balance} {self.symbol} 的钱包{Style.RESET_ALL}")
             return False
         
-        # 生成输出文件路径
-        if output_path is None:
-            output_path = self.generate_output_filename()
-        
-        # 导出过滤后的数据
-        return self.export_filtered_wallets_to_csv(filtered_wallets, output_path)
+        print(f"{Fore.GREEN}✅ 成功导出 {writer.count} 个钱包到 {output_path}{Style.RESET_ALL}")
+        return True
     
     def interactive_filter(self, wallets: List[Dict]) -> bool:
         """
@@ -218,8 +379,8 @@ class CSVFilter:
         if not output_path:
             output_path = self.generate_output_filename()
         
-        # 确保文件扩展名为.csv
-        if not output_path.lower().endswith('.csv'):
+        # 确保文件扩展名为.csv（.csv.gz 为压缩导出）
+        if not output_path.lower().endswith(('.csv', '.csv.gz')):
             output_path += '.csv'
         
         print(f"{Fore.GREEN}📁 输出文件: {output_path}{Style.RESET_ALL}")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享的gas价格预言机
+功能：按 eth_feeHistory 计算 EIP-1559 的 maxFeePerGas / maxPriorityFeePerGas，
+节点不支持时退回 eth_gasPrice；结果在多个线程间共享，按有效期和区块刷新
+"""
+
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+GWEI = 10 ** 9
+
+
+class GasOracle:
+    def __init__(self, call_rpc: Callable, ttl: float = 6, fee_history_blocks: int = 5,
+                 reward_percentile: float = 50, base_fee_multiplier: float = 2,
+                 min_priority_fee: int = 0, default_gas_price: int = 20 * GWEI):
+        """
+        Args:
+            call_rpc: 执行RPC调用的函数，参数为 func(w3)
+            ttl: 缓存有效期（秒），约为一个出块间隔
+            fee_history_blocks: 计算小费时参考的最近区块数
+            reward_percentile: 小费取每个区块交易小费的百分位
+            base_fee_multiplier: maxFeePerGas 相对下一区块基础费用的倍数（留出基础费用上涨的空间）
+            min_priority_fee: 小费下限（wei）
+            default_gas_price: 无法获取gas价格时使用的默认值（wei）
+        """
+        self.call_rpc = call_rpc
+        self.ttl = ttl
+        self.fee_history_blocks = fee_history_blocks
+        self.reward_percentile = reward_percentile
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_priority_fee = min_priority_fee
+        self.default_gas_price = default_gas_price
+
+        self.block_number: Optional[int] = None  # 当前费用对应的区块
+        self._fees: Optional[Dict[str, int]] = None
+        self._updated = 0.0
+        self._lock = threading.Lock()
+
+    def get_fees(self) -> Dict[str, int]:
+        """
+        获取交易费用字段，可直接合并到交易字典中
+
+        Returns:
+            EIP-1559: {'maxFeePerGas': ..., 'maxPriorityFeePerGas': ...}
+            传统交易: {'gasPrice': ...}
+        """
+        with self._lock:
+            if self._fees is None or time.monotonic() - self._updated > self.ttl:
+                self._fees = self._fetch_fees()
+                self._updated = time.monotonic()
+            return dict(self._fees)
+
+    def max_gas_price(self) -> int:
+        """每单位gas最多支付的价格（wei），用于计算转账需要预留的gas费用"""
+        return self.max_price_of(self.get_fees())
+
+    @staticmethod
+    def max_price_of(fees: Dict[str, int]) -> int:
+        """费用字段中每单位gas最多支付的价格"""
+        return fees.get('maxFeePerGas', fees.get('gasPrice', 0))
+
+    def update_block(self, block_number: int):
+        """已知区块前进时让缓存失效，下次获取时刷新"""
+        with self._lock:
+            if self.block_number is not None and block_number > self.block_number:
+                self._fees = None
+
+    def invalidate(self):
+        """强制下次获取时刷新"""
+        with self._lock:
+            self._fees = None
+
+    def _fetch_fees(self) -> Dict[str, int]:
+        try:
+            history = self.call_rpc(
+                lambda w3: w3.eth.fee_history(self.fee_history_blocks, 'latest', [self.reward_percentile])
+            )
+            fees = self._fees_from_history(history)
+            if fees is not None:
+                return fees
+        except Exception:
+            pass
+
+        # 节点不支持 EIP-1559，使用传统gas价格
+        try:
+            return {'gasPrice': self.call_rpc(lambda w3: w3.eth.gas_price)}
+        except Exception:
+            return {'gasPrice': self.default_gas_price}
+
+    def _fees_from_history(self, history) -> Optional[Dict[str, int]]:
+        base_fees: List[int] = list(history.get('baseFeePerGas') or [])
+        if not base_fees or not any(base_fees):
+            return None
+
+        # baseFeePerGas 的最后一项是下一个区块的基础费用
+        next_base_fee = base_fees[-1]
+        rewards = sorted(block_rewards[0] for block_rewards in (history.get('reward') or []) if block_rewards)
+        priority_fee = rewards[len(rewards) // 2] if rewards else 0
+        priority_fee = max(priority_fee, self.min_priority_fee)
+
+        oldest_block = history.get('oldestBlock')
+        if oldest_block is not None:
+            self.block_number = oldest_block + len(base_fees) - 2
+
+        return {
+            'maxFeePerGas': int(next_base_fee * self.base_fee_multiplier) + priority_fee,
+            'maxPriorityFeePerGas': priority_fee
+        }
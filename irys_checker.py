@@ -9,43 +9,80 @@ import os
 import sys
 import json
 import time
-import pandas as pd
 import glob
 from pathlib import Path
 from decimal import Decimal
-from typing import List, Dict, Optional, Tuple
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
-import requests
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Tuple, Union
 from colorama import init, Fore, Style
-from tabulate import tabulate
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import itertools
 import threading
+import asyncio
 from csv_filter import CSVFilter
+from concurrency import AdaptiveLimiter, RateLimiter
+from nonce_manager import NonceManager, classify_nonce_error
+from gas_oracle import GasOracle
+from job_journal import JobJournal, job_fingerprint
+from profiling import ActionProfiler, stage, staged
+from rpc_metrics import RPCMetrics
+from wallet_store import WalletRow, WalletStore, normalize_address
+
+# web3 / pandas / tabulate 等较重的模块在用到的功能中才导入，启动时只加载菜单需要的模块
+if TYPE_CHECKING:
+    from web3 import Web3
+    from balance_cache import BalanceCache
+    from rpc_pool import RPCPool
+    from receipt_tracker import ReceiptTracker
 # 使用标准输入处理用户交互
 
 # 初始化colorama
 init()
 
 class IrysChecker:
-    def __init__(self):
+    # 菜单选项 -> 性能分析报告中的操作名
+    MENU_ACTIONS = {
+        0: 'load', 1: 'load_dir', 2: 'scan', 3: 'filter', 4: 'sweep',
+        5: 'disperse', 6: 'stream_scan', 7: 'presign', 8: 'broadcast'
+    }
+    
+    def __init__(self, rpc_urls: Optional[List[str]] = None, interactive: bool = True):
+        """
+        Args:
+            rpc_urls: RPC端点列表，默认使用 Irys Testnet 官方端点
+            interactive: 是否交互模式；非交互模式（命令行批处理）下连接失败直接抛出异常，不询问用户
+        """
+        self.interactive = interactive
+        
         # Irys Testnet 配置
         self.rpc_url = "https://testnet-rpc.irys.xyz/v1/execution-rpc"
         self.chain_id = 1270
         self.symbol = "IRYS"
         self.explorer = "https://testnet-explorer.irys.xyz"
         
-        # RPC URL（根据测试只保留有效的端点）
+        # RPC URL（可配置多个端点，请求按延迟加权分配，故障端点自动剔除）
         self.rpc_urls = [
             "https://testnet-rpc.irys.xyz/v1/execution-rpc"
         ]
+        if rpc_urls:
+            self.rpc_urls = list(rpc_urls)
+            self.rpc_url = self.rpc_urls[0]
+        
+        # Web3连接在第一次用到时才建立（见 w3 / rpc_pool 属性）
+        self._w3 = None
+        self._rpc_pool = None  # RPC端点池，离线模式下为None
+        self._connected = False
+        self._connect_lock = threading.Lock()
+        
+        # RPC调用指标：按端点和方法记录调用次数、错误和耗时，每个操作结束时汇总显示，
+        # 调用 start_metrics_server 后可供 Prometheus 抓取
+        self.rpc_metrics = RPCMetrics()
+        self.metrics_server = None
         
-        # 初始化Web3连接
-        self.w3 = None
-        self._init_web3_connection()
+        # 性能分析（默认关闭）：开启后每个菜单操作生成 cProfile 结果和各阶段耗时报告
+        self.profiler = ActionProfiler(output_dir=os.path.join('.irys_cache', 'profiles'))
         
         # 钱包数据
-        self.wallets = []
+        self.wallets = WalletStore()  # 列式存储，按行访问时与钱包字典用法相同
         self.loaded_files = []  # 记录已加载的文件信息
         
         # CSV过滤器
@@ -54,13 +91,97 @@ class IrysChecker:
         # 线程锁
         self.balance_lock = threading.Lock()
         
+        # 余额查询模式: 'batch' 使用JSON-RPC批量请求, 'async' 异步并发查询, 'thread' 逐个地址多线程查询
+        self.scan_mode = 'batch'
+        self.batch_size = 100  # 每个JSON-RPC batch包含的eth_getBalance调用数
+        self.async_concurrency = 500  # 异步模式下同时在途的最大请求数
+        
+        # 余额本地缓存（SQLite），按时间/区块判断过期，第一次查询时才打开（见 balance_cache 属性）；设为None可关闭
+        self.cache_ttl = 300  # 缓存有效期（秒），None表示不按时间过期
+        self.cache_max_block_age = None  # 缓存最多落后的区块数，None表示不限制
+        self.cache_path = os.path.join('.irys_cache', 'balances.sqlite3')
+        self.cache_enabled = True
+        self._balance_cache: Optional['BalanceCache'] = None
+        self.last_scan_stats = {}  # 最近一次余额查询的统计信息
+        
+        # 区块快照模式：扫描开始时确定区块，所有余额在同一区块查询，结果可复现
+        self.snapshot_mode = False
+        self.last_scan_block = None  # 最近一次快照查询的区块高度
+        
+        # 自适应并发控制器：余额查询和转账各自独立调整
+        self.scan_limiter = AdaptiveLimiter(initial=8, min_limit=2, max_limit=64)
+        self.tx_limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=16)
+        
+        # 转账限速（rate 为每秒最多发送的交易数，None表示不限速）和本地nonce分配
+        self.tx_rate_limiter = RateLimiter(rate=10)
+        self.sweep_concurrency = 16  # 归集时同时处理的钱包数
+        
+        # gas价格预言机：所有线程共享，优先使用 EIP-1559 费用，按有效期/区块刷新
+        self.gas_oracle = GasOracle(self._call_rpc)
+        
+        # 交易提交后在后台批量查询回执，超过该时间（秒）仍未上链视为丢弃
+        self.receipt_timeout = 120
+        
+        # 任务日志：余额查询和批量转账中断后，用相同输入重新运行时从日志恢复
+        self.journal_enabled = True
+        self.journal_dir = os.path.join('.irys_cache', 'jobs')
+        self._journal: Optional[JobJournal] = None  # 当前余额查询使用的日志
+        
+        # 转账前校验私钥与地址是否对应（在进程池中推导地址），结果按文件指纹缓存
+        self.verify_keys = True
+        self.key_check_dir = os.path.join('.irys_cache', 'keys')
+        self._key_mismatches: Optional[Tuple[int, int, Dict[int, str]]] = None  # (存储id, 钱包数, {行号: 推导出的地址})
+        self.nonce_manager = NonceManager(
+            lambda address: self._call_rpc(lambda w3: w3.eth.get_transaction_count(address, 'pending'))
+        )
+        
+    @property
+    def w3(self) -> Optional['Web3']:
+        """Web3实例，第一次访问时连接网络"""
+        self._ensure_connection()
+        return self._w3
+    
+    @property
+    def rpc_pool(self) -> Optional['RPCPool']:
+        """RPC端点池，第一次访问时连接网络；离线模式下为None"""
+        self._ensure_connection()
+        return self._rpc_pool
+    
+    @property
+    def balance_cache(self) -> Optional['BalanceCache']:
+        """余额缓存，第一次访问时打开数据库；关闭缓存时为None"""
+        if not self.cache_enabled:
+            return None
+        if self._balance_cache is None:
+            from balance_cache import BalanceCache
+            self._balance_cache = BalanceCache(self.cache_path, ttl=self.cache_ttl,
+                                               max_block_age=self.cache_max_block_age)
+        return self._balance_cache
+    
+    @balance_cache.setter
+    def balance_cache(self, cache: Optional['BalanceCache']):
+        self._balance_cache = cache
+        self.cache_enabled = cache is not None
+    
+    def _ensure_connection(self):
+        """还没有连接时建立连接，多个线程同时访问时只连接一次"""
+        if self._connected:
+            return
+        with self._connect_lock:
+            if not self._connected:
+                self._init_web3_connection()
+                self._connected = True
+    
     def _init_web3_connection(self):
-        """初始化Web3连接"""
+        """初始化Web3连接（对所有RPC端点做健康检查，组成端点池）"""
+        from web3 import Web3
+        from rpc_pool import RPCPool
+        
         print(f"{Fore.CYAN}正在连接到Irys Network Testnet...{Style.RESET_ALL}")
         
-        rpc_url = self.rpc_urls[0]  # 只使用有效的RPC端点
         try:
-            print(f"连接到: {rpc_url}")
+            for rpc_url in self.rpc_urls:
+                print(f"连接到: {rpc_url}")
             
             # 创建Web3连接，增加超时设置
             request_kwargs = {
@@ -71,28 +192,26 @@ class IrysChecker:
                 }
             }
             
-            provider = Web3.HTTPProvider(rpc_url, request_kwargs=request_kwargs)
-            w3_test = Web3(provider)
-            
-            # 添加PoA中间件（如果需要）
-            w3_test.middleware_onion.inject(geth_poa_middleware, layer=0)
+            pool = RPCPool(self.rpc_urls, self.chain_id, request_kwargs=request_kwargs, metrics=self.rpc_metrics)
+            healthy = pool.health_check()
             
-            # 测试连接
-            latest_block = w3_test.eth.block_number
-            print(f"{Fore.GREEN}✅ 连接成功! 最新区块: {latest_block}{Style.RESET_ALL}")
-            
-            # 验证chain ID
-            actual_chain_id = w3_test.eth.chain_id
-            print(f"{Fore.GREEN}🔗 Chain ID: {actual_chain_id}{Style.RESET_ALL}")
+            for endpoint in pool.endpoints:
+                if endpoint.healthy:
+                    print(f"{Fore.GREEN}✅ 连接成功! {endpoint.url} 最新区块: {endpoint.block_number} "
+                          f"延迟: {endpoint.latency * 1000:.0f}ms{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.YELLOW}⚠️  端点不可用: {endpoint.url} ({endpoint.last_error}){Style.RESET_ALL}")
             
-            if actual_chain_id == self.chain_id:
-                self.w3 = w3_test
-                self.rpc_url = rpc_url
-                print(f"{Fore.GREEN}✅ 成功连接到Irys Testnet{Style.RESET_ALL}")
+            if healthy:
+                primary = pool.primary()
+                self._rpc_pool = pool
+                self._w3 = primary.w3
+                self.rpc_url = primary.url
+                print(f"{Fore.GREEN}🔗 Chain ID: {primary.chain_id}{Style.RESET_ALL}")
+                print(f"{Fore.GREEN}✅ 成功连接到Irys Testnet (可用端点: {len(healthy)}/{len(pool.endpoints)}){Style.RESET_ALL}")
                 return
             else:
-                print(f"{Fore.YELLOW}⚠️  Chain ID不匹配: 期望 {self.chain_id}, 实际 {actual_chain_id}{Style.RESET_ALL}")
-                raise Exception(f"Chain ID不匹配")
+                raise Exception("没有可用的RPC端点")
                 
         except Exception as e:
             print(f"{Fore.RED}❌ 连接失败: {str(e)}{Style.RESET_ALL}")
@@ -105,123 +224,85 @@ class IrysChecker:
             print(f"  2. 稍后重试")
             print(f"  3. 查看Irys官方状态: https://docs.irys.xyz")
             
+            if not self.interactive:
+                raise ConnectionError(f"无法连接到RPC端点: {str(e)}") from e
+            
             # 询问用户是否继续（离线模式）
             print(f"\n{Fore.CYAN}是否以离线模式继续？(y/n): {Style.RESET_ALL}", end='')
             choice = input().strip().lower()
             if choice == 'y' or choice == 'yes':
                 print(f"{Fore.YELLOW}⚠️  进入离线模式，某些功能将不可用{Style.RESET_ALL}")
                 # 创建一个虚拟的Web3连接用于地址验证
-                self.w3 = Web3()
+                self._w3 = Web3()
             else:
                 sys.exit(1)
         
     def load_wallets_from_csv(self, file_path: str) -> bool:
         """从CSV文件加载钱包信息"""
-        try:
-            if not os.path.exists(file_path):
-                print(f"{Fore.RED}❌ CSV文件不存在: {file_path}{Style.RESET_ALL}")
-                return False
-                
-            # 读取CSV文件，支持不同的编码格式
-            try:
-                df = pd.read_csv(file_path, encoding='utf-8')
-            except UnicodeDecodeError:
-                try:
-                    df = pd.read_csv(file_path, encoding='gbk')
-                except UnicodeDecodeError:
-                    df = pd.read_csv(file_path, encoding='latin-1')
-            
-            if df.empty:
+        from wallet_loader import load_wallet_file
+        
+        result = load_wallet_file(file_path)
+        if result['wallets'] is not None:
+            self.wallets = result['wallets']
+        
+        if self._report_load_result(result):
+            self.csv_file_path = file_path
+            self._report_wallet_memory()
+        return bool(result['wallets'])
+    
+    def _report_wallet_memory(self):
+        """显示钱包存储的内存占用和重复地址数量"""
+        if not self.wallets:
+            return
+        total_bytes = self.wallets.memory_usage()
+        print(f"{Fore.CYAN}💾 钱包存储占用: {total_bytes / 1024:.1f} KB "
+              f"(平均 {total_bytes / len(self.wallets):.0f} 字节/钱包){Style.RESET_ALL}")
+        if self.wallets.duplicate_count:
+            print(f"{Fore.YELLOW}🔁 发现 {self.wallets.duplicate_count} 个重复钱包 "
+                  f"(涉及 {self.wallets.duplicate_address_count} 个地址)，查询余额时每个地址只查询一次{Style.RESET_ALL}")
+    
+    def _report_load_result(self, result: Dict) -> bool:
+        """
+        打印 load_wallet_file 的加载结果
+        
+        Returns:
+            是否完成了校验（不代表存在有效钱包）
+        """
+        if not result['exists']:
+            print(f"{Fore.RED}❌ CSV文件不存在: {result['path']}{Style.RESET_ALL}")
+            return False
+        
+        if result['row_count'] is not None:
+            if result['row_count'] == 0:
                 print(f"{Fore.RED}❌ CSV文件为空{Style.RESET_ALL}")
                 return False
             
-            print(f"{Fore.CYAN}📄 CSV文件包含 {len(df)} 行数据{Style.RESET_ALL}")
-            print(f"{Fore.CYAN}📋 CSV文件列名: {list(df.columns)}{Style.RESET_ALL}")
-            
-            # 检查必要的列（支持不同的列名格式）
-            possible_columns = {
-                'index': ['index', 'id', 'no', 'num', '序号', '编号'],
-                'address': ['address', 'addr', 'wallet', 'publickey', 'public_key', '地址', '钱包地址'],
-                'privateKey': ['privateKey', 'private_key', 'privkey', 'key', 'secret', '私钥']
-            }
-            
-            column_mapping = {}
-            for required, possible in possible_columns.items():
-                found = False
-                for col in df.columns:
-                    if col.lower().strip() in [p.lower() for p in possible]:
-                        column_mapping[required] = col
-                        found = True
-                        break
-                if not found:
-                    print(f"{Fore.RED}❌ 未找到必要的列: {required}，可能的列名: {possible}{Style.RESET_ALL}")
-                    print(f"{Fore.YELLOW}📋 当前文件列名: {list(df.columns)}{Style.RESET_ALL}")
-                    return False
-            
-            print(f"{Fore.GREEN}✅ 列映射: {column_mapping}{Style.RESET_ALL}")
-            
-            self.wallets = []
-            valid_count = 0
-            invalid_count = 0
-            
-            for idx, row in df.iterrows():
-                try:
-                    # 提取数据，处理可能的空值
-                    index_val = row[column_mapping['index']]
-                    address_val = str(row[column_mapping['address']]).strip()
-                    private_key_val = str(row[column_mapping['privateKey']]).strip()
-                    
-                    # 跳过空行
-                    if pd.isna(index_val) or not address_val or not private_key_val or address_val == 'nan' or private_key_val == 'nan':
-                        print(f"{Fore.YELLOW}⚠️  跳过空行 {idx+1}{Style.RESET_ALL}")
-                        invalid_count += 1
-                        continue
-                    
-                    wallet_info = {
-                        'index': int(float(index_val)) if not pd.isna(index_val) else idx + 1,
-                        'address': address_val,
-                        'private_key': private_key_val,
-                        'balance': None
-                    }
-                    
-                    # 验证地址格式（如果连接到网络）
-                    if self.w3 and hasattr(self.w3, 'is_address'):
-                        if not self.w3.is_address(wallet_info['address']):
-                            print(f"{Fore.YELLOW}⚠️  地址格式不正确 (行{idx+1}): {wallet_info['address']}{Style.RESET_ALL}")
-                            invalid_count += 1
-                            continue
-                    else:
-                        # 简单的以太坊地址格式检查
-                        if not (wallet_info['address'].startswith('0x') and len(wallet_info['address']) == 42):
-                            print(f"{Fore.YELLOW}⚠️  地址格式可能不正确 (行{idx+1}): {wallet_info['address']}{Style.RESET_ALL}")
-                            invalid_count += 1
-                            continue
-                    
-                    # 验证私钥格式
-                    if not (wallet_info['private_key'].startswith('0x') and len(wallet_info['private_key']) == 66):
-                        print(f"{Fore.YELLOW}⚠️  私钥格式可能不正确 (行{idx+1}): {wallet_info['private_key'][:10]}...{Style.RESET_ALL}")
-                        invalid_count += 1
-                        continue
-                    
-                    self.wallets.append(wallet_info)
-                    valid_count += 1
-                    
-                except Exception as e:
-                    print(f"{Fore.YELLOW}⚠️  处理行{idx+1}时出错: {str(e)}{Style.RESET_ALL}")
-                    invalid_count += 1
-                    continue
-            
-            self.csv_file_path = file_path
-            print(f"\n{Fore.GREEN}✅ 成功加载 {valid_count} 个有效钱包{Style.RESET_ALL}")
-            if invalid_count > 0:
-                print(f"{Fore.YELLOW}⚠️  跳过 {invalid_count} 个无效行{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}📄 CSV文件包含 {result['row_count']} 行数据{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}📋 CSV文件列名: {result['columns']}{Style.RESET_ALL}")
             
-            return valid_count > 0
+            missing = result['missing']
+            if missing:
+                from wallet_loader import POSSIBLE_COLUMNS
+                print(f"{Fore.RED}❌ 未找到必要的列: {missing}，可能的列名: {POSSIBLE_COLUMNS[missing]}{Style.RESET_ALL}")
+                print(f"{Fore.YELLOW}📋 当前文件列名: {result['columns']}{Style.RESET_ALL}")
+                return False
             
-        except Exception as e:
-            print(f"{Fore.RED}❌ 加载CSV文件时出错: {str(e)}{Style.RESET_ALL}")
+            if result['column_mapping']:
+                print(f"{Fore.GREEN}✅ 列映射: {result['column_mapping']}{Style.RESET_ALL}")
+        
+        if result['error'] is not None:
+            print(f"{Fore.RED}❌ 加载CSV文件时出错: {result['error']}{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}请检查文件格式和内容{Style.RESET_ALL}")
             return False
+        
+        for message in result['issues']:
+            print(f"{Fore.YELLOW}⚠️  {message}{Style.RESET_ALL}")
+        
+        invalid_count = len(result['issues'])
+        print(f"\n{Fore.GREEN}✅ 成功加载 {len(result['wallets'])} 个有效钱包{Style.RESET_ALL}")
+        if invalid_count > 0:
+            print(f"{Fore.YELLOW}⚠️  跳过 {invalid_count} 个无效行{Style.RESET_ALL}")
+        return True
     
     def scan_directory_for_csv(self, directory_path: str) -> List[str]:
         """扫描目录下的所有CSV文件"""
@@ -337,36 +418,47 @@ class IrysChecker:
         
         print(f"\n{Fore.CYAN}📂 开始批量加载 {len(file_paths)} 个CSV文件...{Style.RESET_ALL}")
         
-        all_wallets = []
+        all_wallets = WalletStore()
         successful_files = []
         failed_files = []
         
-        for i, file_path in enumerate(file_paths, 1):
+        from wallet_loader import load_wallet_file
+        
+        # 多个文件在进程池中并行解析和校验，按输入顺序合并结果，保证输出确定
+        if len(file_paths) > 1:
+            max_workers = min(len(file_paths), os.cpu_count() or 1)
+            print(f"{Fore.GREEN}⚡ 使用 {max_workers} 个进程并行解析{Style.RESET_ALL}")
+            # 子进程中的解析和校验不单独计时，整体计入 parse 阶段
+            with ProcessPoolExecutor(max_workers=max_workers) as executor, stage('parse'):
+                results = executor.map(load_wallet_file, file_paths)
+                results = list(results)
+        else:
+            results = [load_wallet_file(file_paths[0])]
+        
+        for i, (file_path, result) in enumerate(zip(file_paths, results), 1):
             print(f"\n{Fore.CYAN}正在处理文件 {i}/{len(file_paths)}: {os.path.basename(file_path)}{Style.RESET_ALL}")
             
-            # 临时保存当前钱包数据
-            temp_wallets = self.wallets.copy()
-            temp_files = self.loaded_files.copy()
-            
-            # 清空当前数据来加载单个文件
-            self.wallets = []
+            self._report_load_result(result)
+            wallets = result['wallets']
             
-            if self._load_single_csv_file(file_path):
+            if wallets:
                 # 为每个钱包添加来源文件信息
-                for wallet in self.wallets:
-                    wallet['source_file'] = os.path.basename(file_path)
+                wallets.set_source_file(os.path.basename(file_path))
                 
-                all_wallets.extend(self.wallets)
+                all_wallets.extend(wallets)
                 successful_files.append({
                     'path': file_path,
                     'name': os.path.basename(file_path),
-                    'count': len(self.wallets)
+                    'count': len(wallets)
                 })
-                print(f"{Fore.GREEN}✅ 成功加载 {len(self.wallets)} 个钱包{Style.RESET_ALL}")
+                print(f"{Fore.GREEN}✅ 成功加载 {len(wallets)} 个钱包{Style.RESET_ALL}")
             else:
                 failed_files.append(file_path)
                 print(f"{Fore.RED}❌ 加载失败{Style.RESET_ALL}")
         
+        # 合并后重建地址去重索引，跨文件的重复地址只查询一次
+        all_wallets.build_address_index()
+        
         # 恢复所有成功加载的钱包数据
         self.wallets = all_wallets
         self.loaded_files = successful_files
@@ -387,12 +479,59 @@ class IrysChecker:
                 print(f"   📄 {os.path.basename(file_path)}")
         
         print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
+        self._report_wallet_memory()
         
         return len(successful_files) > 0
     
-    def _load_single_csv_file(self, file_path: str) -> bool:
-        """加载单个CSV文件（内部使用）"""
-        return self.load_wallets_from_csv(file_path)
+    def _call_rpc(self, func):
+        """
+        在端点池中选择一个端点执行RPC调用，并上报延迟和错误
+        
+        Args:
+            func: 接收Web3实例并返回结果的函数
+            
+        Returns:
+            func的返回值
+        """
+        if self.rpc_pool is None:
+            with stage('rpc'):
+                return func(self.w3)
+        
+        endpoint = self.rpc_pool.pick()
+        start = time.monotonic()
+        try:
+            with stage('rpc'):
+                result = func(endpoint.w3)
+        except Exception as e:
+            self.rpc_pool.report(endpoint, time.monotonic() - start, e)
+            raise
+        self.rpc_pool.report(endpoint, time.monotonic() - start)
+        return result
+    
+    @staticmethod
+    def _checksum(address: Union[str, Dict, WalletRow]) -> str:
+        """
+        转换为checksum地址
+        
+        Args:
+            address: 地址字符串，或钱包行视图（直接使用加载时计算好的checksum地址）/钱包字典
+        """
+        if isinstance(address, WalletRow):
+            return address.checksum_address
+        if not isinstance(address, str):
+            address = address['address']
+        # 归集目标、发送方等反复出现的地址经过有界缓存，不重复计算keccak
+        return normalize_address(address)
+    
+    def _fetch_balance_wei(self, address: Union[str, WalletRow], block_identifier='latest') -> int:
+        """获取指定地址（或钱包行视图）在指定区块的余额（wei），失败时抛出异常"""
+        checksum_address = self._checksum(address)
+        return self._call_rpc(lambda w3: w3.eth.get_balance(checksum_address, block_identifier))
+    
+    def _report_balance_error(self, address: str, error: Exception):
+        """打印余额查询失败信息"""
+        with self.balance_lock:
+            print(f"\r{Fore.RED}❌ 获取余额失败 {address[:10]}...: {str(error)}{Style.RESET_ALL}")
     
     def get_balance(self, address: str) -> Optional[Decimal]:
         """获取指定地址的余额"""
@@ -400,32 +539,46 @@ class IrysChecker:
             return None
             
         try:
-            # 转换为checksum地址
-            checksum_address = self.w3.to_checksum_address(address)
-            balance_wei = self.w3.eth.get_balance(checksum_address)
+            balance_wei = self._fetch_balance_wei(address)
             balance_ether = self.w3.from_wei(balance_wei, 'ether')
             return Decimal(str(balance_ether))
         except Exception as e:
-            with self.balance_lock:
-                print(f"\r{Fore.RED}❌ 获取余额失败 {address[:10]}...: {str(e)}{Style.RESET_ALL}")
+            self._report_balance_error(address, e)
             return None
     
-    def get_balance_for_wallet(self, wallet_data: Tuple[int, Dict]) -> Tuple[int, Optional[Decimal]]:
+    def get_balance_for_wallet(self, wallet_data: Tuple[int, Dict], block_identifier='latest') -> Tuple[int, Optional[Decimal]]:
         """
         为单个钱包获取余额（多线程使用）
         
         Args:
             wallet_data: (索引, 钱包信息) 元组
+            block_identifier: 查询的区块，默认最新区块
             
         Returns:
             (索引, 余额) 元组
         """
         index, wallet = wallet_data
-        balance = self.get_balance(wallet['address'])
-        return index, balance
+        
+        # 通过自适应并发控制器占用槽位，让延迟和错误反馈到并发数上
+        with self.scan_limiter.slot() as slot:
+            try:
+                balance_wei = self._fetch_balance_wei(wallet, block_identifier)
+            except Exception as e:
+                slot.fail(e)
+                self._report_balance_error(wallet['address'], e)
+                return index, None
+        
+        balance_ether = self.w3.from_wei(balance_wei, 'ether')
+        return index, Decimal(str(balance_ether))
     
-    def check_all_balances(self):
-        """批量查看所有钱包余额（使用多线程）"""
+    def check_all_balances(self, snapshot: Optional[bool] = None, block_number: Optional[int] = None):
+        """
+        批量查看所有钱包余额
+        
+        Args:
+            snapshot: 是否使用区块快照模式（所有余额固定在同一区块查询），默认使用 self.snapshot_mode
+            block_number: 快照区块高度，默认取扫描开始时的最新区块
+        """
         if not self.wallets:
             print(f"{Fore.YELLOW}⚠️  请先加载钱包CSV文件{Style.RESET_ALL}")
             return
@@ -434,26 +587,248 @@ class IrysChecker:
             print(f"{Fore.YELLOW}⚠️  离线模式，无法获取余额{Style.RESET_ALL}")
             return
         
+        if snapshot is None:
+            snapshot = self.snapshot_mode or block_number is not None
+        
         print(f"{Fore.CYAN}📊 正在查询钱包余额...{Style.RESET_ALL}")
-        self._check_balances_multithreaded()
-        self._display_balance_results()
+        if self._scan_balances(snapshot, block_number):
+            self._display_balance_results()
+    
+    def _scan_balances(self, snapshot: bool = False, block_number: Optional[int] = None,
+                       use_journal: bool = True) -> bool:
+        """
+        查询 self.wallets 中所有钱包的余额（不显示结果表格）
+        
+        Args:
+            snapshot: 是否固定在同一区块查询
+            block_number: 快照区块，None表示使用当前区块
+            use_journal: 是否记录任务日志（中断后可恢复）
+        
+        Returns:
+            是否完成查询
+        """
+        self.last_scan_stats = {}
+        self.last_scan_block = None
+        
+        self._journal = self._open_scan_journal(snapshot, block_number) if use_journal else None
+        try:
+            finished = self._scan_balances_with_journal(snapshot, block_number)
+        except BaseException:
+            # 中断或出错时保留日志，下次用相同输入运行时恢复
+            if self._journal is not None:
+                self._journal.close()
+                print(f"\n{Fore.YELLOW}💾 已完成的查询结果已记录，重新查询时将从中断处继续{Style.RESET_ALL}")
+            raise
+        finally:
+            journal, self._journal = self._journal, None
+        
+        if journal is not None:
+            if finished:
+                # 余额结果已写入缓存，查询日志完成后删除
+                journal.complete(remove=True)
+            else:
+                journal.close()
+        return finished
+    
+    def _open_scan_journal(self, snapshot: bool, block_number: Optional[int]) -> Optional[JobJournal]:
+        """打开余额查询日志，未完成的同一任务会被恢复"""
+        if not self.journal_enabled or not self.wallets:
+            return None
+        
+        mode = 'snapshot' if snapshot else 'latest'
+        fingerprint = job_fingerprint(self.wallets.address_digest(), mode, block_number)
+        params = {'mode': mode, 'block': block_number, 'wallets': len(self.wallets)}
+        try:
+            journal = JobJournal.open(self.journal_dir, 'scan', fingerprint, params)
+            if (journal.resumed and not snapshot and self.cache_ttl is not None
+                    and time.time() - journal.header.get('started_at', 0) > self.cache_ttl):
+                # 非快照查询的结果会过时，超过缓存有效期的日志重新开始
+                journal.close()
+                os.remove(journal.path)
+                journal = JobJournal.open(self.journal_dir, 'scan', fingerprint, params)
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️  无法打开任务日志，本次查询不可恢复: {str(e)}{Style.RESET_ALL}")
+            return None
+        
+        if journal.resumed:
+            started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(journal.header.get('started_at', 0)))
+            print(f"{Fore.CYAN}♻️  发现未完成的查询任务 (开始于 {started})，"
+                  f"已恢复 {len(journal.balances)} 个地址的结果{Style.RESET_ALL}")
+        return journal
+    
+    def _journal_balance(self, row: int):
+        """把一个钱包的查询结果写入当前任务日志"""
+        if self._journal is not None:
+            balance_wei = self.wallets.balance_wei(row)
+            if balance_wei is not None:
+                self._journal.record_balance(self.wallets.address_key(row), balance_wei)
+    
+    def _scan_balances_with_journal(self, snapshot: bool, block_number: Optional[int]) -> bool:
+        journal = self._journal
+        if snapshot and block_number is None and journal is not None:
+            # 恢复的快照任务继续使用原来的区块
+            block_number = journal.header.get('snapshot_block')
+        
+        if snapshot:
+            # 快照模式：扫描开始时确定一个区块，所有余额都在该区块查询
+            if block_number is None:
+                try:
+                    block_number = self._call_rpc(lambda w3: w3.eth.block_number)
+                except Exception as e:
+                    print(f"{Fore.RED}❌ 获取快照区块失败: {str(e)}{Style.RESET_ALL}")
+                    return False
+            self.last_scan_block = block_number
+            if journal is not None and journal.header.get('snapshot_block') != block_number:
+                journal.set_header(snapshot_block=block_number)
+            print(f"{Fore.CYAN}📌 快照模式: 所有余额固定在区块 {block_number} 查询{Style.RESET_ALL}")
+            indices = self._run_snapshot_scan(block_number)
+        else:
+            # 先从本地缓存填充，只查询缓存中不存在或已过期的地址
+            current_block = None
+            indices = list(range(len(self.wallets)))
+            if self.balance_cache is not None:
+                try:
+                    current_block = self._call_rpc(lambda w3: w3.eth.block_number)
+                    self.gas_oracle.update_block(current_block)
+                except Exception as e:
+                    print(f"{Fore.YELLOW}⚠️  获取当前区块失败，缓存仅按时间判断过期: {str(e)}{Style.RESET_ALL}")
+                indices = self._apply_balance_cache(current_block)
+            
+            self._run_balance_engine(indices, 'latest')
+            
+            if self.balance_cache is not None:
+                self._store_balance_cache(indices, current_block)
+        
+        # 记录每个钱包余额对应的区块（非快照模式下为None）
+        for wallet in self.wallets:
+            wallet['block_number'] = self.last_scan_block
+        
+        return True
+    
+    def _run_balance_engine(self, indices: List[int], block_identifier):
+        """按当前查询模式查询指定钱包的余额，重复地址只查询一次，已记录在任务日志中的地址不再查询"""
+        if not indices:
+            return
+        unique_indices = self.wallets.unique_rows(indices)
+        saved = len(indices) - len(unique_indices)
+        self.last_scan_stats['rpc_saved'] = saved
+        if saved:
+            print(f"{Fore.CYAN}🔁 {saved} 个重复地址共用查询结果，实际查询 {len(unique_indices)} 个地址{Style.RESET_ALL}")
+        
+        # 从任务日志恢复上次中断前已完成的结果
+        query_indices = unique_indices
+        if self._journal is not None and self._journal.balances:
+            query_indices = []
+            for i in unique_indices:
+                balance_wei = self._journal.balances.get(self.wallets.address_key(i))
+                if balance_wei is None:
+                    query_indices.append(i)
+                else:
+                    self.wallets.set_balance_wei(i, balance_wei)
+            self.last_scan_stats['journal_resumed'] = len(unique_indices) - len(query_indices)
+        
+        if query_indices:
+            if self.scan_mode == 'batch':
+                self._check_balances_batched(query_indices, block_identifier)
+            elif self.scan_mode == 'async':
+                self._check_balances_async(query_indices, block_identifier)
+            else:
+                self._check_balances_multithreaded(query_indices, block_identifier)
+        
+        self.wallets.fan_out_balances(unique_indices)
+    
+    def _run_snapshot_scan(self, block_number: int) -> List[int]:
+        """
+        在指定区块查询余额，优先使用 (地址, 区块) 快照缓存
+        
+        Returns:
+            通过RPC查询的钱包索引列表
+        """
+        indices = list(range(len(self.wallets)))
+        if self.balance_cache is not None:
+            self.balance_cache.reset_stats()
+            cached = self.balance_cache.get_snapshot_many((w.address_key for w in self.wallets), block_number)
+            indices = []
+            for i, wallet in enumerate(self.wallets):
+                balance_wei = cached.get(wallet.address_key)
+                if balance_wei is None:
+                    indices.append(i)
+                else:
+                    self.wallets.set_balance_wei(i, balance_wei)
+            self.last_scan_stats['cache_hits'] = self.balance_cache.hits
+            self.last_scan_stats['cache_misses'] = self.balance_cache.misses
+            print(f"{Fore.CYAN}🗄️  快照缓存命中: {self.balance_cache.hits}, 需要查询: {self.balance_cache.misses}{Style.RESET_ALL}")
+        
+        self._run_balance_engine(indices, block_number)
+        
+        if self.balance_cache is not None:
+            entries = [
+                (self.wallets.address_key(i), self.wallets.balance_wei(i))
+                for i in indices if self.wallets.balance_wei(i) is not None
+            ]
+            try:
+                self.balance_cache.put_snapshot_many(entries, block_number)
+            except Exception as e:
+                print(f"{Fore.YELLOW}⚠️  写入快照缓存失败: {str(e)}{Style.RESET_ALL}")
+        return indices
+    
+    def _apply_balance_cache(self, current_block: Optional[int]) -> List[int]:
+        """
+        用缓存中未过期的余额填充钱包
+        
+        Returns:
+            仍需通过RPC查询的钱包索引列表
+        """
+        # 有效期以 checker 上的当前设置为准（创建缓存后仍可修改）
+        self.balance_cache.ttl = self.cache_ttl
+        self.balance_cache.max_block_age = self.cache_max_block_age
+        self.balance_cache.reset_stats()
+        cached = self.balance_cache.get_many((wallet.address_key for wallet in self.wallets), current_block)
+        
+        pending = []
+        for i, wallet in enumerate(self.wallets):
+            entry = cached.get(wallet.address_key)
+            if entry is None:
+                pending.append(i)
+            else:
+                self.wallets.set_balance_wei(i, entry[0])
+        
+        self.last_scan_stats['cache_hits'] = self.balance_cache.hits
+        self.last_scan_stats['cache_misses'] = self.balance_cache.misses
+        print(f"{Fore.CYAN}🗄️  缓存命中: {self.balance_cache.hits}, 需要查询: {self.balance_cache.misses}{Style.RESET_ALL}")
+        return pending
+    
+    def _store_balance_cache(self, indices: List[int], block_number: Optional[int]):
+        """将本次查询成功的余额写入缓存"""
+        entries = []
+        for i in indices:
+            balance_wei = self.wallets.balance_wei(i)
+            if balance_wei is not None:
+                entries.append((self.wallets.address_key(i), balance_wei, block_number))
+        try:
+            self.balance_cache.put_many(entries)
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️  写入余额缓存失败: {str(e)}{Style.RESET_ALL}")
     
-    def _check_balances_multithreaded(self):
+    def _check_balances_multithreaded(self, indices: Optional[List[int]] = None, block_identifier='latest'):
         """多线程查询余额"""
-        wallet_count = len(self.wallets)
-        max_workers = 8
+        if indices is None:
+            indices = list(range(len(self.wallets)))
+        wallet_count = len(indices)
+        # 线程池按最大并发创建，实际在途请求数由自适应控制器决定
+        max_workers = self.scan_limiter.max_limit
         
-        print(f"{Fore.GREEN}⚡ 使用多线程加速查询 (线程数: {max_workers}){Style.RESET_ALL}")
+        print(f"{Fore.GREEN}⚡ 使用多线程加速查询 (自适应并发: {self.scan_limiter.limit}, 上限: {max_workers}){Style.RESET_ALL}")
         
         # 准备任务数据
-        wallet_tasks = [(i, wallet) for i, wallet in enumerate(self.wallets)]
+        wallet_tasks = [(i, self.wallets[i]) for i in indices]
         completed_count = 0
         
         # 使用线程池执行查询
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 提交所有任务
             future_to_index = {
-                executor.submit(self.get_balance_for_wallet, task): task[0] 
+                executor.submit(self.get_balance_for_wallet, task, block_identifier): task[0] 
                 for task in wallet_tasks
             }
             
@@ -463,12 +838,13 @@ class IrysChecker:
                 try:
                     wallet_index, balance = future.result()
                     self.wallets[wallet_index]['balance'] = balance
+                    self._journal_balance(wallet_index)
                     completed_count += 1
                     
                     # 显示进度
                     with self.balance_lock:
                         percentage = (completed_count / wallet_count) * 100
-                        print(f"\r查询进度: {completed_count}/{wallet_count} ({percentage:.1f}%) - {self.wallets[wallet_index]['address'][:10]}...", end='')
+                        print(f"\r查询进度: {completed_count}/{wallet_count} ({percentage:.1f}%) 并发: {self.scan_limiter.limit} - {self.wallets[wallet_index]['address'][:10]}...", end='')
                         
                 except Exception as e:
                     completed_count += 1
@@ -478,8 +854,164 @@ class IrysChecker:
         print()  # 换行
         print(f"{Fore.GREEN}✅ 余额查询完成！{Style.RESET_ALL}")
     
+    def _check_balances_batched(self, indices: Optional[List[int]] = None, block_identifier='latest'):
+        """使用JSON-RPC批量请求查询余额"""
+        from rpc_batch import RPCBatchClient
+        
+        if indices is None:
+            indices = list(range(len(self.wallets)))
+        wallet_count = len(indices)
+        max_workers = self.scan_limiter.max_limit
+        client = RPCBatchClient(self.rpc_url, batch_size=self.batch_size, limiter=self.scan_limiter, pool=self.rpc_pool,
+                                metrics=self.rpc_metrics)
+        
+        print(f"{Fore.GREEN}⚡ 使用JSON-RPC批量查询 (每批: {client.batch_size}, 自适应并发批次: {self.scan_limiter.limit}){Style.RESET_ALL}")
+        
+        # 按batch大小切分任务，每个任务是一组钱包索引
+        batches = [
+            indices[start:start + client.batch_size]
+            for start in range(0, wallet_count, client.batch_size)
+        ]
+        completed_count = 0
+        failed_count = 0
+        block_param = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+        
+        def fetch_batch(indices: List[int]) -> Tuple[List[int], list]:
+            calls = [
+                ('eth_getBalance', [self.wallets.checksum_address(i), block_param])
+                for i in indices
+            ]
+            return indices, client.call(calls)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch_batch, batch) for batch in batches]
+            
+            for future in as_completed(futures):
+                try:
+                    indices, results = future.result()
+                except Exception as e:
+                    with self.balance_lock:
+                        print(f"\r{Fore.RED}❌ 批量查询失败: {str(e)[:50]}...{Style.RESET_ALL}")
+                    continue
+                
+                for wallet_index, (ok, result) in zip(indices, results):
+                    if ok and result is not None:
+                        self.wallets.set_balance_wei(wallet_index, int(result, 16))
+                        self._journal_balance(wallet_index)
+                    else:
+                        self.wallets.set_balance_wei(wallet_index, None)
+                        failed_count += 1
+                completed_count += len(indices)
+                
+                # 显示进度
+                with self.balance_lock:
+                    percentage = (completed_count / wallet_count) * 100
+                    print(f"\r查询进度: {completed_count}/{wallet_count} ({percentage:.1f}%) 并发: {self.scan_limiter.limit}", end='')
+        
+        print()  # 换行
+        if failed_count > 0:
+            print(f"{Fore.YELLOW}⚠️  {failed_count} 个地址重试后仍查询失败{Style.RESET_ALL}")
+        print(f"{Fore.GREEN}✅ 余额查询完成！{Style.RESET_ALL}")
+    
+    def check_all_balances_async(self):
+        """批量查看所有钱包余额（使用asyncio单线程并发）"""
+        scan_mode = self.scan_mode
+        self.scan_mode = 'async'
+        try:
+            self.check_all_balances()
+        finally:
+            self.scan_mode = scan_mode
+    
+    def _check_balances_async(self, indices: Optional[List[int]] = None, block_identifier='latest'):
+        """异步查询余额"""
+        if indices is None:
+            indices = list(range(len(self.wallets)))
+        print(f"{Fore.GREEN}⚡ 使用asyncio并发查询 (最大在途请求: {self.async_concurrency}){Style.RESET_ALL}")
+        asyncio.run(self._fetch_balances_async(indices, block_identifier))
+        print()  # 换行
+        print(f"{Fore.GREEN}✅ 余额查询完成！{Style.RESET_ALL}")
+    
+    async def _fetch_balances_async(self, indices: List[int], block_identifier='latest'):
+        """在单个事件循环中并发获取钱包余额，使用信号量限制在途请求数"""
+        import aiohttp
+        from web3 import AsyncWeb3, AsyncHTTPProvider
+        
+        wallet_count = len(indices)
+        semaphore = asyncio.Semaphore(self.async_concurrency)
+        completed_count = 0
+        
+        # 默认连接池上限为100，需要自定义会话才能让更多请求同时在途
+        connector = aiohttp.TCPConnector(limit=self.async_concurrency)
+        timeout = aiohttp.ClientTimeout(total=15)
+        headers = {
+            'User-Agent': 'Irys-Checker/1.0',
+            'Content-Type': 'application/json'
+        }
+        
+        class SessionHTTPProvider(AsyncHTTPProvider):
+            """
+            只通过本次查询的会话发送请求
+            
+            web3 按线程和URL缓存会话，上一次查询的会话关闭后会被替换成默认会话（连接数100、无超时且不会关闭），
+            因此不使用 web3 的会话缓存
+            """
+            
+            async def make_request(self, method, params):
+                request_data = self.encode_rpc_request(method, params)
+                async with session.post(self.endpoint_uri, data=request_data, raise_for_status=True) as response:
+                    raw_response = await response.read()
+                return self.decode_rpc_response(raw_response)
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            # 每次查询为每个端点新建一个AsyncWeb3实例，共享同一个会话，查询结束时会话随之关闭
+            endpoints = self.rpc_pool.endpoints if self.rpc_pool else []
+            async_w3 = {}
+            for url in [e.url for e in endpoints] or [self.rpc_url]:
+                async_w3[url] = AsyncWeb3(SessionHTTPProvider(url))
+                async_w3[url].middleware_onion.inject(self.rpc_metrics.async_middleware(url), name='rpc_metrics',
+                                                      layer=0)
+            
+            async def get_balance_wei(checksum_address: str) -> int:
+                if self.rpc_pool is None:
+                    return await async_w3[self.rpc_url].eth.get_balance(checksum_address, block_identifier)
+                
+                endpoint = self.rpc_pool.pick()
+                start = time.monotonic()
+                try:
+                    balance_wei = await async_w3[endpoint.url].eth.get_balance(checksum_address, block_identifier)
+                except Exception as e:
+                    self.rpc_pool.report(endpoint, time.monotonic() - start, e)
+                    raise
+                self.rpc_pool.report(endpoint, time.monotonic() - start)
+                return balance_wei
+            
+            async def fetch(wallet_index: int):
+                nonlocal completed_count
+                address = self.wallets[wallet_index]['address']
+                async with semaphore:
+                    try:
+                        with stage('rpc'):
+                            balance_wei = await get_balance_wei(self.wallets.checksum_address(wallet_index))
+                        balance = Decimal(str(self.w3.from_wei(balance_wei, 'ether')))
+                    except Exception as e:
+                        print(f"\r{Fore.RED}❌ 获取余额失败 {address[:10]}...: {str(e)}{Style.RESET_ALL}")
+                        balance = None
+                
+                self.wallets[wallet_index]['balance'] = balance
+                self._journal_balance(wallet_index)
+                completed_count += 1
+                
+                # 显示进度
+                percentage = (completed_count / wallet_count) * 100
+                print(f"\r查询进度: {completed_count}/{wallet_count} ({percentage:.1f}%) - {address[:10]}...", end='')
+            
+            await asyncio.gather(*(fetch(i) for i in indices))
+    
+    @staged('render')
     def _display_balance_results(self):
         """显示余额查询结果"""
+        from tabulate import tabulate
+        
         # 计算总余额
         total_balance = Decimal('0')
         for wallet in self.wallets:
@@ -507,59 +1039,171 @@ class IrysChecker:
         print(tabulate(table_data, headers=headers, tablefmt='grid'))
         
         print(f"\n{Fore.GREEN}💰 总余额: {total_balance:.6f} {self.symbol}{Style.RESET_ALL}")
+        if self.last_scan_block is not None:
+            print(f"{Fore.CYAN}📌 快照区块: {self.last_scan_block}{Style.RESET_ALL}")
+        if 'cache_hits' in self.last_scan_stats:
+            print(f"{Fore.CYAN}🗄️  缓存命中: {self.last_scan_stats['cache_hits']}, "
+                  f"未命中: {self.last_scan_stats['cache_misses']}{Style.RESET_ALL}")
+        if self.last_scan_stats.get('journal_resumed'):
+            print(f"{Fore.CYAN}♻️  从任务日志恢复: {self.last_scan_stats['journal_resumed']} 个地址{Style.RESET_ALL}")
+        if self.wallets.duplicate_count:
+            print(f"{Fore.CYAN}🔁 重复钱包: {self.wallets.duplicate_count} 个 "
+                  f"(涉及 {self.wallets.duplicate_address_count} 个地址), "
+                  f"节省RPC查询: {self.last_scan_stats.get('rpc_saved', 0)} 次{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
     
     def estimate_gas_price(self) -> int:
-        """估算当前gas价格"""
-        if not self.w3 or not hasattr(self.w3.eth, 'gas_price'):
+        """估算当前gas价格（每单位gas最多支付的价格）"""
+        # hasattr 会读取 gas_price 属性并发起一次RPC，这里检查方法是否存在
+        if not self.w3 or not hasattr(self.w3.eth, 'fee_history'):
             # 离线模式，返回默认值
-            return Web3.to_wei(20, 'gwei')
-            
-        try:
-            gas_price = self.w3.eth.gas_price
-            return gas_price
-        except:
-            # 如果获取失败，返回一个默认值
-            return Web3.to_wei(20, 'gwei')
+            return self.gas_oracle.default_gas_price
+        
+        # 预言机获取失败时会返回默认值
+        return self.gas_oracle.max_gas_price()
     
-    def send_transaction(self, from_address: str, private_key: str, to_address: str, amount: Decimal) -> Optional[str]:
+    def estimate_fees(self) -> Dict[str, int]:
+        """获取交易费用字段（EIP-1559 或传统 gasPrice）"""
+        if not self.w3 or not hasattr(self.w3.eth, 'fee_history'):
+            return {'gasPrice': self.gas_oracle.default_gas_price}
+        return self.gas_oracle.get_fees()
+    
+    def send_transaction(self, from_address: Union[str, WalletRow], private_key: str,
+                         to_address: Union[str, WalletRow], amount: Decimal, on_signed: Optional[Callable] = None) -> Optional[str]:
         """发送交易"""
         if not self.w3 or not hasattr(self.w3.eth, 'send_raw_transaction'):
             print(f"{Fore.RED}❌ 离线模式，无法发送交易{Style.RESET_ALL}")
             return None
             
         try:
-            # 转换地址格式
-            from_checksum = self.w3.to_checksum_address(from_address)
-            to_checksum = self.w3.to_checksum_address(to_address)
-            
-            # 获取nonce
-            nonce = self.w3.eth.get_transaction_count(from_checksum)
-            
-            # 获取gas价格
-            gas_price = self.estimate_gas_price()
-            
+            return self._submit_transaction(from_address, private_key, to_address, amount, on_signed=on_signed)
+        except Exception as e:
+            print(f"{Fore.RED}❌ 发送交易失败: {str(e)}{Style.RESET_ALL}")
+            return None
+    
+    def _submit_transaction(self, from_address: Union[str, WalletRow], private_key: str,
+                            to_address: Union[str, WalletRow], amount: Decimal, fees: Optional[Dict[str, int]] = None, on_signed: Optional[Callable] = None) -> str:
+        """
+        构建、签名并发送交易，失败时抛出异常
+        
+        Args:
+            from_address: 发送方地址或钱包行视图
+            to_address: 接收方地址或钱包行视图
+            fees: 交易费用字段（estimate_fees 的返回值），None表示从预言机获取
+            on_signed: 签名后、发送前调用 on_signed(from_address, transaction, signed_txn)，用于先记录任务日志
+        
+        Returns:
+            交易哈希
+        """
+        # 转换地址格式
+        from_checksum = self._checksum(from_address)
+        to_checksum = self._checksum(to_address)
+        
+        # 获取nonce（本地分配，只在首次使用该地址时查询节点）
+        nonce = self.nonce_manager.next_nonce(from_checksum)
+        
+        # 获取交易费用
+        if fees is None:
+            fees = self.estimate_fees()
+        
+        for attempt in range(2):
             # 构建交易
             transaction = {
                 'to': to_checksum,
                 'value': self.w3.to_wei(amount, 'ether'),
                 'gas': 21000,  # 标准转账gas限制
-                'gasPrice': gas_price,
                 'nonce': nonce,
-                'chainId': self.chain_id
+                'chainId': self.chain_id,
+                **fees
             }
             
             # 签名交易
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key)
-            
-            # 发送交易
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            with stage('sign'):
+                signed_txn = self.w3.eth.account.sign_transaction(transaction, private_key)
+            if on_signed is not None:
+                on_signed(from_checksum, transaction, signed_txn)
             
-            return tx_hash.hex()
-            
-        except Exception as e:
-            print(f"{Fore.RED}❌ 发送交易失败: {str(e)}{Style.RESET_ALL}")
+            # 发送交易（受转账限速和并发控制器约束）
+            self.tx_rate_limiter.wait()
+            try:
+                with self.tx_limiter.slot() as slot:
+                    try:
+                        tx_hash = self._call_rpc(lambda w3: w3.eth.send_raw_transaction(signed_txn.rawTransaction))
+                    except Exception as e:
+                        slot.fail(e)
+                        raise
+                return tx_hash.hex()
+            except Exception as e:
+                nonce_error = classify_nonce_error(e)
+                if nonce_error == 'known':
+                    # 相同的交易已在交易池中，视为发送成功；该nonce确实被这笔交易使用，本地记录不需要调整
+                    return signed_txn.hash.hex()
+                if nonce_error == 'too_low' and attempt == 0:
+                    # nonce已被其他交易使用（例如在别处发送过），重新同步后再试一次
+                    nonce = self.nonce_manager.resync(from_checksum)
+                    continue
+                # 分配的nonce没有被这笔交易使用，下次重新从节点获取
+                self.nonce_manager.invalidate(from_checksum)
+                if nonce_error == 'underpriced':
+                    # 交易池中另一笔交易占用了该nonce（可能是同一笔转账的旧版本），换新nonce重发可能重复转账，不重试
+                    raise RuntimeError(f"nonce {nonce} 已被交易池中的另一笔交易占用，费用不足以替换: {str(e)}") from e
+                raise
+    
+    def verify_wallet_keys(self) -> Dict[int, str]:
+        """
+        校验所有钱包的私钥是否与地址对应（同一批钱包只校验一次，未开启校验时返回空字典）
+        
+        Returns:
+            {不匹配的行号: 私钥推导出的地址}
+        """
+        from key_check import KeyCheckCache, verify_wallet_keys
+        
+        if not self.verify_keys or not self.wallets:
+            return {}
+        key = (id(self.wallets), len(self.wallets))
+        if self._key_mismatches is not None and self._key_mismatches[:2] == key:
+            return self._key_mismatches[2]
+        
+        def progress(done, total):
+            print(f"\r校验进度: {done}/{total} ({done / total * 100:.1f}%)", end='')
+        
+        print(f"\n{Fore.CYAN}🔑 校验私钥与地址是否对应...{Style.RESET_ALL}")
+        start_time = time.time()
+        with stage('validate'):
+            mismatches, checked = verify_wallet_keys(self.wallets, KeyCheckCache(self.key_check_dir), progress=progress)
+        if checked:
+            print(f"\n已校验 {checked} 个钱包，耗时 {time.time() - start_time:.1f} 秒")
+        else:
+            print(f"{Fore.GREEN}💾 使用缓存的校验结果{Style.RESET_ALL}")
+        
+        if mismatches:
+            print(f"{Fore.RED}❌ 发现 {len(mismatches)} 个私钥与地址不匹配的钱包:{Style.RESET_ALL}")
+            for row, derived in list(mismatches.items())[:10]:
+                wallet = self.wallets[row]
+                print(f"   序号 {wallet['index']}: {wallet['address']} (私钥对应地址 {derived})")
+            if len(mismatches) > 10:
+                print(f"   ... 另有 {len(mismatches) - 10} 个")
+        else:
+            print(f"{Fore.GREEN}✅ 所有私钥与地址均对应{Style.RESET_ALL}")
+        
+        self._key_mismatches = key + (mismatches,)
+        return mismatches
+    
+    def sender_key_error(self, wallet) -> Optional[str]:
+        """
+        检查发送方钱包的私钥是否与地址对应（只推导这一个私钥）
+        
+        Returns:
+            不匹配时的错误信息，对应或未开启校验时返回None
+        """
+        from key_check import derive_addresses
+        
+        if not self.verify_keys:
             return None
+        derived = derive_addresses(bytes.fromhex(wallet['private_key'][2:]))
+        if derived == bytes.fromhex(wallet['address'][2:]):
+            return None
+        return f"发送方私钥与地址不匹配: {wallet['address']} (私钥对应地址 0x{derived.hex()})"
     
     def bulk_transfer_many_to_one(self):
         """多对一转账（归集）"""
@@ -580,51 +1224,176 @@ class IrysChecker:
         reserve_balance_input = input().strip()
         reserve_balance = Decimal('0.01') if not reserve_balance_input else Decimal(reserve_balance_input)
         
-        print(f"\n{Fore.CYAN}📤 开始归集转账...{Style.RESET_ALL}")
+        # 并发归集的钱包数（每个钱包是独立账户，nonce互不影响）
+        print(f"{Fore.CYAN}请输入同时归集的钱包数 [默认: {self.sweep_concurrency}，输入1为逐个归集]: {Style.RESET_ALL}", end='')
+        concurrency_input = input().strip()
+        try:
+            concurrency = int(concurrency_input) if concurrency_input else self.sweep_concurrency
+        except ValueError:
+            print(f"{Fore.RED}❌ 请输入数字{Style.RESET_ALL}")
+            return
         
-        success_count = 0
-        failed_count = 0
+        self._sweep_wallets(target_address, reserve_balance, max(1, concurrency))
+    
+    def _sweep_wallets(self, target_address: str, reserve_balance: Decimal, concurrency: int) -> List[Dict]:
+        """
+        并发归集所有钱包，显示实时状态和最终报告
         
-        for wallet in self.wallets:
-            # 获取当前余额
-            current_balance = self.get_balance(wallet['address'])
-            if current_balance is None:
-                print(f"{Fore.RED}❌ 无法获取余额: {wallet['address']}{Style.RESET_ALL}")
-                failed_count += 1
-                continue
-            
-            # 计算可转账金额
-            gas_price = self.estimate_gas_price()
-            gas_cost = Decimal(str(self.w3.from_wei(gas_price * 21000, 'ether')))
-            transfer_amount = current_balance - reserve_balance - gas_cost
-            
-            if transfer_amount <= 0:
-                print(f"{Fore.YELLOW}⚠️  余额不足，跳过: {wallet['address']} (余额: {current_balance:.6f}){Style.RESET_ALL}")
-                continue
+        Args:
+            target_address: 归集目标地址
+            reserve_balance: 每个钱包保留的余额
+            concurrency: 同时处理的钱包数
             
-            print(f"正在转账: {wallet['address'][:10]}... -> {target_address[:10]}... 金额: {transfer_amount:.6f} {self.symbol}")
+        Returns:
+            每个钱包的归集结果列表
+        """
+        # 重复地址只归集一次
+        rows = self.wallets.unique_rows(range(len(self.wallets)))
+        
+        tracker = self._create_receipt_tracker()
+        journal = self._open_transfer_journal(
+            'sweep', (self.wallets.address_digest(), target_address.lower(), reserve_balance),
+            {'target': target_address, 'reserve': str(reserve_balance)}
+        )
+        if journal is not None:
+            # 上次中断前已上链或仍在交易池中的钱包不再归集
+            finished = self._reconcile_journal(journal, tracker)
+            rows = [row for row in rows if self.wallets.address_key(row) not in finished]
+        
+        # 私钥与地址不匹配的钱包无法签名，直接记为失败
+        mismatches = self.verify_wallet_keys()
+        mismatched = [row for row in rows if row in mismatches]
+        rows = [row for row in rows if row not in mismatches]
+        
+        results = [{'address': self.wallets[row]['address'], 'status': '等待', 'balance': None,
+                    'amount': None, 'tx_hash': None, 'error': None} for row in rows]
+        failed_results = [{'address': self.wallets[row]['address'], 'status': '失败', 'balance': None,
+                           'amount': None, 'tx_hash': None, 'error': f"私钥与地址不匹配 (私钥对应地址 {mismatches[row]})"}
+                          for row in mismatched]
+        
+        print(f"\n{Fore.CYAN}📤 开始归集转账...{Style.RESET_ALL}")
+        print(f"钱包数量: {len(rows)}, 并发: {concurrency}"
+              + (f", 私钥不匹配跳过: {len(mismatched)}" if mismatched else "")
+              + (f", 发送速率上限: {self.tx_rate_limiter.rate} 笔/秒" if self.tx_rate_limiter.rate else ""))
+        
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = {
+                executor.submit(self._sweep_wallet, self.wallets[row], target_address, reserve_balance, result, journal): result
+                for row, result in zip(rows, results)
+            }
             
-            # 发送交易
-            tx_hash = self.send_transaction(
-                wallet['address'], 
-                wallet['private_key'], 
-                target_address, 
-                transfer_amount
+            done_count = 0
+            for future in as_completed(futures):
+                result = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    result['status'] = '失败'
+                    result['error'] = str(e)
+                done_count += 1
+                if result['status'] == '已提交':
+                    tracker.track(result['tx_hash'], result['submitted_at'])
+                
+                # 显示每个钱包的完成状态和整体进度
+                with self.balance_lock:
+                    address = result['address']
+                    if result['status'] == '已提交':
+                        print(f"\r{Fore.GREEN}📨 {address[:10]}... -> {target_address[:10]}... "
+                              f"{result['amount']:.6f} {self.symbol} 已提交: {result['tx_hash']}{Style.RESET_ALL}")
+                    elif result['status'] == '跳过':
+                        print(f"\r{Fore.YELLOW}⚠️  余额不足，跳过: {address} (余额: {result['balance']:.6f}){Style.RESET_ALL}")
+                    else:
+                        print(f"\r{Fore.RED}❌ {address[:10]}... 归集失败: {str(result['error'])[:80]}{Style.RESET_ALL}")
+                    
+                    in_flight = sum(1 for r in results if r['status'] in ('查询余额', '发送中'))
+                    print(f"归集进度: {done_count}/{len(results)} ({done_count / len(results) * 100:.1f}%) "
+                          f"进行中: {in_flight}", end='')
+        except KeyboardInterrupt:
+            # 取消尚未开始的钱包，等待正在发送的交易写入日志
+            executor.shutdown(wait=True, cancel_futures=True)
+            tracker.stop()
+            if journal is not None:
+                journal.close()
+                print(f"\n{Fore.YELLOW}💾 已发送的交易已记录，重新归集时将从中断处继续{Style.RESET_ALL}")
+            raise
+        executor.shutdown()
+        
+        print()  # 换行
+        results += failed_results
+        self._show_sweep_report(results, target_address, time.time() - start_time)
+        
+        receipts = self._report_confirmations(tracker)
+        for result in results:
+            if result['tx_hash'] in receipts:
+                result['receipt_status'] = receipts[result['tx_hash']]['status']
+        
+        if journal is not None:
+            self._finish_transfer_journal(journal, any(r['status'] == '失败' for r in results))
+        return results
+    
+    def _sweep_wallet(self, wallet, target_address: str, reserve_balance: Decimal, result: Dict,
+                      journal: Optional[JobJournal] = None):
+        """归集单个钱包：查询余额、计算可转金额并发送交易，状态写入 result"""
+        # 获取当前余额
+        result['status'] = '查询余额'
+        balance_wei = self._fetch_balance_wei(wallet)
+        current_balance = Decimal(str(self.w3.from_wei(balance_wei, 'ether')))
+        result['balance'] = current_balance
+        
+        # 计算可转账金额（按每单位gas最多支付的价格预留gas费用）
+        fees = self.estimate_fees()
+        gas_cost = Decimal(str(self.w3.from_wei(GasOracle.max_price_of(fees) * 21000, 'ether')))
+        transfer_amount = current_balance - reserve_balance - gas_cost
+        
+        if transfer_amount <= 0:
+            result['status'] = '跳过'
+            return
+        
+        # 发送交易
+        result['status'] = '发送中'
+        result['amount'] = transfer_amount
+        key = wallet.address_key if isinstance(wallet, WalletRow) else wallet['address'].lower()
+        try:
+            result['tx_hash'] = self._submit_transaction(
+                wallet,
+                wallet['private_key'],
+                target_address,
+                transfer_amount,
+                fees,
+                on_signed=self._journal_signed(journal, key)
             )
-            
-            if tx_hash:
-                print(f"{Fore.GREEN}✅ 交易成功: {tx_hash}{Style.RESET_ALL}")
-                print(f"   浏览器查看: {self.explorer}/tx/{tx_hash}")
-                success_count += 1
-            else:
-                failed_count += 1
-            
-            # 添加延迟避免过快发送
-            time.sleep(1)
+        except Exception:
+            if journal is not None and key in journal.transactions:
+                journal.record_transaction(key, 'failed')
+            raise
+        if journal is not None:
+            journal.record_transaction(key, 'sent', hash=result['tx_hash'])
+        result['submitted_at'] = time.time()
+        result['status'] = '已提交'
+    
+    @staged('render')
+    def _show_sweep_report(self, results: List[Dict], target_address: str, elapsed: float):
+        """显示归集最终报告"""
+        from tabulate import tabulate
+        
+        submitted = [r for r in results if r['status'] == '已提交']
+        skipped = [r for r in results if r['status'] == '跳过']
+        failed = [r for r in results if r['status'] == '失败']
+        total_amount = sum((r['amount'] for r in submitted), Decimal('0'))
+        
+        if failed:
+            print(f"\n{Fore.RED}❌ 归集失败的钱包:{Style.RESET_ALL}")
+            table_data = [[r['address'], str(r['error'])[:60]] for r in failed]
+            print(tabulate(table_data, headers=['钱包地址', '错误'], tablefmt='grid'))
         
         print(f"\n{Fore.CYAN}📊 归集完成统计:{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}✅ 成功: {success_count} 笔{Style.RESET_ALL}")
-        print(f"{Fore.RED}❌ 失败: {failed_count} 笔{Style.RESET_ALL}")
+        print(f"{Fore.GREEN}📨 已提交: {len(submitted)} 笔{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}⚠️  跳过: {len(skipped)} 个{Style.RESET_ALL}")
+        print(f"{Fore.RED}❌ 失败: {len(failed)} 笔{Style.RESET_ALL}")
+        print(f"💰 归集总额: {total_amount:.6f} {self.symbol} -> {target_address}")
+        print(f"⏱️  耗时: {elapsed:.1f} 秒")
     
     def bulk_transfer_one_to_many(self):
         """一对多转账"""
@@ -632,7 +1401,221 @@ class IrysChecker:
             print(f"{Fore.YELLOW}⚠️  请先加载钱包CSV文件{Style.RESET_ALL}")
             return
         
-        # 显示可选的发送方钱包
+        sender_wallet = self._select_sender_wallet()
+        if sender_wallet is None:
+            return
+        
+        # 获取转账金额
+        amount = self._input_transfer_amount()
+        if amount is None:
+            return
+        
+        self._disperse(sender_wallet, amount)
+    
+    def _disperse(self, sender_wallet, amount: Decimal) -> Dict:
+        """
+        从发送方向其余所有钱包各转账固定金额，显示进度和确认统计
+        
+        Args:
+            sender_wallet: 发送方钱包（包含 address / private_key）
+            amount: 单笔转账金额
+            
+        Returns:
+            {'submitted', 'failed', 'elapsed', 'results'}，results 为每个接收方的 {'to', 'tx_hash', 'status'}
+        """
+        # 排除发送方地址
+        receiver_wallets = [w for w in self.wallets if w['address'] != sender_wallet['address']]
+        
+        print(f"\n{Fore.CYAN}📤 开始一对多转账...{Style.RESET_ALL}")
+        print(f"发送方: {sender_wallet['address']}")
+        print(f"接收方数量: {len(receiver_wallets)}")
+        print(f"单笔金额: {amount} {self.symbol}")
+        print(f"最大同时在途: {self.tx_limiter.max_limit} 笔")
+        if self.tx_rate_limiter.rate:
+            print(f"发送速率上限: {self.tx_rate_limiter.rate} 笔/秒")
+        
+        success_count = 0
+        failed_count = 0
+        start_time = time.time()
+        tracker = self._create_receipt_tracker()
+        
+        # 接收方按位置编号，作为任务日志中的工作项
+        transfers = [(f"{i}:{receiver.address_key}", receiver) for i, receiver in enumerate(receiver_wallets)]
+        journal = self._open_transfer_journal(
+            'disperse', (self.wallets.address_digest(), sender_wallet['address'].lower(), amount),
+            {'sender': sender_wallet['address'], 'amount': str(amount)}
+        )
+        if journal is not None:
+            finished = self._reconcile_journal(journal, tracker)
+            transfers = [(key, receiver) for key, receiver in transfers if key not in finished]
+        
+        # 同一发送方的nonce在本地连续分配，交易不必逐笔等待节点回复：
+        # 多笔交易同时在途，在途数量由 tx_limiter 自适应控制，发送间隔由速率上限控制
+        def send(key, receiver):
+            return self.send_transaction(
+                sender_wallet,
+                sender_wallet['private_key'],
+                receiver,
+                amount,
+                on_signed=self._journal_signed(journal, key)
+            )
+        
+        results = [{'to': receiver['address'], 'tx_hash': None, 'status': '等待'} for _, receiver in transfers]
+        executor = ThreadPoolExecutor(max_workers=self.tx_limiter.max_limit)
+        try:
+            futures = {executor.submit(send, key, receiver): (key, result)
+                       for (key, receiver), result in zip(transfers, results)}
+            for future in as_completed(futures):
+                key, result = futures[future]
+                tx_hash = future.result()
+                
+                if journal is not None and key in journal.transactions:
+                    journal.record_transaction(key, 'sent' if tx_hash else 'failed', **({'hash': tx_hash} if tx_hash else {}))
+                
+                result['tx_hash'] = tx_hash
+                result['status'] = '已提交' if tx_hash else '失败'
+                if tx_hash:
+                    tracker.track(tx_hash)
+                    print(f"{Fore.GREEN}📨 {sender_wallet['address'][:10]}... -> {result['to'][:10]}... "
+                          f"{amount} {self.symbol} 已提交: {tx_hash}{Style.RESET_ALL}")
+                    print(f"   浏览器查看: {self.explorer}/tx/{tx_hash}")
+                    success_count += 1
+                else:
+                    failed_count += 1
+                print(f"转账进度: {success_count + failed_count}/{len(results)} 并发上限: {self.tx_limiter.limit}")
+        except KeyboardInterrupt:
+            # 取消尚未开始的转账，等待正在发送的交易写入日志
+            executor.shutdown(wait=True, cancel_futures=True)
+            tracker.stop()
+            if journal is not None:
+                journal.close()
+                print(f"\n{Fore.YELLOW}💾 已发送的交易已记录，重新转账时将从中断处继续{Style.RESET_ALL}")
+            raise
+        executor.shutdown()
+        
+        elapsed = time.time() - start_time
+        print(f"\n{Fore.CYAN}📊 一对多转账完成统计:{Style.RESET_ALL}")
+        print(f"{Fore.GREEN}📨 已提交: {success_count} 笔{Style.RESET_ALL}")
+        print(f"{Fore.RED}❌ 失败: {failed_count} 笔{Style.RESET_ALL}")
+        print(f"⏱️  耗时: {elapsed:.1f} 秒 ({len(transfers) / max(elapsed, 1e-9):.1f} 笔/秒)")
+        
+        receipts = self._report_confirmations(tracker)
+        for result in results:
+            if result['tx_hash'] in receipts:
+                result['receipt_status'] = receipts[result['tx_hash']]['status']
+        
+        if journal is not None:
+            self._finish_transfer_journal(journal, failed_count > 0)
+        return {'submitted': success_count, 'failed': failed_count, 'elapsed': elapsed, 'results': results}
+    
+    def _open_transfer_journal(self, kind: str, inputs: Tuple, params: Dict) -> Optional[JobJournal]:
+        """打开批量转账的任务日志，相同输入的未完成任务会被恢复"""
+        if not self.journal_enabled:
+            return None
+        try:
+            journal = JobJournal.open(self.journal_dir, kind, job_fingerprint(*inputs), params)
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️  无法打开任务日志，本次转账不可恢复: {str(e)}{Style.RESET_ALL}")
+            return None
+        if journal.resumed:
+            started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(journal.header.get('started_at', 0)))
+            print(f"{Fore.CYAN}♻️  发现未完成的转账任务 (开始于 {started})，"
+                  f"日志中有 {len(journal.transactions)} 笔交易记录{Style.RESET_ALL}")
+        return journal
+    
+    def _journal_signed(self, journal: Optional[JobJournal], key: str) -> Optional[Callable]:
+        """生成签名回调：发送前把交易（含原始交易）写入日志"""
+        if journal is None:
+            return None
+        
+        def on_signed(from_address: str, transaction: Dict, signed_txn):
+            journal.record_transaction(
+                key, 'signed',
+                **{'from': from_address},
+                to=transaction['to'],
+                value=str(transaction['value']),
+                nonce=transaction['nonce'],
+                hash=signed_txn.hash.hex(),
+                raw=signed_txn.rawTransaction.hex()
+            )
+        return on_signed
+    
+    def _finish_transfer_journal(self, journal: JobJournal, has_failures: bool):
+        """全部成功时删除日志（其中含已签名的原始交易）；有失败时保留日志，重新运行只处理未完成的部分"""
+        if has_failures:
+            journal.close()
+            print(f"{Fore.YELLOW}💾 失败的转账可用相同的输入重新运行，已完成的部分会被跳过{Style.RESET_ALL}")
+        else:
+            journal.complete(remove=True)
+    
+    def _reconcile_journal(self, journal: JobJournal, tracker: 'ReceiptTracker') -> set:
+        """
+        将日志中已签名/已发送的交易与链上状态核对；发送失败的工作项不核对，重新运行时重新处理
+        
+        Returns:
+            已完成（已上链或仍在交易池中）的工作项集合
+        """
+        finished = set()
+        if not journal.transactions:
+            return finished
+        
+        counts = {'mined': 0, 'pending': 0, 'lost': 0}
+        senders = set()
+        for key, entry in journal.transactions.items():
+            if entry['state'] == 'confirmed':
+                finished.add(key)
+                continue
+            if entry['state'] not in ('signed', 'sent') or not entry.get('hash') or not entry.get('raw'):
+                continue
+            
+            senders.add(entry['from'])
+            status = self._reconcile_transaction(entry)
+            counts[status] += 1
+            if status == 'mined':
+                journal.record_transaction(key, 'confirmed')
+                finished.add(key)
+            elif status == 'pending':
+                tracker.track(entry['hash'])
+                finished.add(key)
+        
+        # 恢复的交易可能已占用nonce，之后的发送重新从节点获取
+        for sender in senders:
+            self.nonce_manager.invalidate(sender)
+        
+        print(f"{Fore.CYAN}♻️  日志核对: 已上链 {counts['mined']} 笔, 交易池中 {counts['pending']} 笔, "
+              f"未上链需重新发送 {counts['lost']} 笔{Style.RESET_ALL}")
+        return finished
+    
+    def _reconcile_transaction(self, entry: Dict) -> str:
+        """
+        核对单笔日志交易
+        
+        Returns:
+            'mined'（已上链） / 'pending'（已重新广播或仍在交易池中） / 'lost'（未上链且nonce已被占用，需要重新发送）
+        """
+        from web3.exceptions import TransactionNotFound
+        
+        def has_receipt() -> bool:
+            try:
+                return self._call_rpc(lambda w3: w3.eth.get_transaction_receipt(entry['hash'])) is not None
+            except TransactionNotFound:
+                return False
+        
+        if has_receipt():
+            return 'mined'
+        
+        # 未查到回执：重新广播原始交易，相同交易已在交易池中时节点会返回 already known
+        try:
+            self._call_rpc(lambda w3: w3.eth.send_raw_transaction(entry['raw']))
+            return 'pending'
+        except Exception as e:
+            if classify_nonce_error(e) == 'known':
+                return 'pending'
+            # 广播期间可能刚好上链
+            return 'mined' if has_receipt() else 'lost'
+    
+    def _select_sender_wallet(self):
+        """显示钱包列表并让用户选择发送方，选择无效时返回None"""
         print(f"\n{Fore.CYAN}请选择发送方钱包:{Style.RESET_ALL}")
         for i, wallet in enumerate(self.wallets):
             balance = self.get_balance(wallet['address'])
@@ -643,55 +1626,300 @@ class IrysChecker:
             choice = int(input(f"{Fore.CYAN}请输入选择 (1-{len(self.wallets)}): {Style.RESET_ALL}")) - 1
             if choice < 0 or choice >= len(self.wallets):
                 print(f"{Fore.RED}❌ 选择无效{Style.RESET_ALL}")
-                return
+                return None
         except ValueError:
             print(f"{Fore.RED}❌ 请输入数字{Style.RESET_ALL}")
-            return
-        
-        sender_wallet = self.wallets[choice]
+            return None
         
-        # 获取转账金额
+        error = self.sender_key_error(self.wallets[choice])
+        if error:
+            print(f"{Fore.RED}❌ {error}{Style.RESET_ALL}")
+            return None
+        return self.wallets[choice]
+    
+    def _input_transfer_amount(self) -> Optional[Decimal]:
+        """输入每个地址的转账金额，格式不正确时返回None"""
         print(f"{Fore.CYAN}请输入每个地址的转账金额 ({self.symbol}): {Style.RESET_ALL}", end='')
         try:
-            amount = Decimal(input().strip())
+            return Decimal(input().strip())
         except:
             print(f"{Fore.RED}❌ 金额格式不正确{Style.RESET_ALL}")
-            return
+            return None
+    
+    def presign_one_to_many(self, sender_wallet, receivers: List[str], amount: Decimal, output_path: str) -> int:
+        """
+        为一对多转账预先签名所有交易并写入文件，签名在进程池中并行进行
         
-        # 排除发送方地址
-        receiver_wallets = [w for w in self.wallets if w['address'] != sender_wallet['address']]
+        Args:
+            sender_wallet: 发送方钱包
+            receivers: 接收地址（或钱包行视图）列表
+            amount: 单笔金额
+            output_path: 签名交易文件路径（会被覆盖）
+            
+        Returns:
+            签名的交易数
+        """
+        from presign import presign_transfers
         
-        print(f"\n{Fore.CYAN}📤 开始一对多转账...{Style.RESET_ALL}")
-        print(f"发送方: {sender_wallet['address']}")
-        print(f"接收方数量: {len(receiver_wallets)}")
-        print(f"单笔金额: {amount} {self.symbol}")
+        from_checksum = self._checksum(sender_wallet)
         
-        success_count = 0
-        failed_count = 0
+        # nonce从节点的 pending nonce 开始连续分配；费用在签名时固定，maxFeePerGas 已预留基础费用上涨空间
+        first_nonce = self.nonce_manager.fetch_nonce(from_checksum)
+        fees = self.estimate_fees()
+        value = self.w3.to_wei(amount, 'ether')
+        transfers = [
+            {
+                'from': from_checksum,
+                'private_key': sender_wallet['private_key'],
+                'to': self._checksum(receiver),
+                'value': value,
+                'nonce': first_nonce + i,
+                'gas': 21000,
+                'chain_id': self.chain_id,
+                'fees': fees
+            }
+            for i, receiver in enumerate(receivers)
+        ]
+        
+        print(f"{Fore.CYAN}✍️  正在签名 {len(transfers)} 笔交易 (进程数: {os.cpu_count()}, 起始nonce: {first_nonce})...{Style.RESET_ALL}")
+        start_time = time.time()
+        with stage('sign'):
+            count = presign_transfers(transfers, output_path)
+        elapsed = time.time() - start_time
+        print(f"{Fore.GREEN}✅ 已签名 {count} 笔交易，耗时 {elapsed:.1f} 秒 "
+              f"({count / max(elapsed, 1e-9):.0f} 笔/秒){Style.RESET_ALL}")
+        print(f"{Fore.GREEN}📄 签名交易已写入: {output_path}{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}⚠️  文件中的交易广播后即生效，请妥善保管{Style.RESET_ALL}")
+        return count
+    
+    def broadcast_signed_file(self, path: str) -> Dict[str, int]:
+        """
+        按文件顺序批量广播预签名交易，并等待上链确认
         
-        for receiver in receiver_wallets:
-            print(f"正在转账: {sender_wallet['address'][:10]}... -> {receiver['address'][:10]}... 金额: {amount} {self.symbol}")
+        Args:
+            path: presign_one_to_many 写入的签名交易文件
             
-            tx_hash = self.send_transaction(
-                sender_wallet['address'], 
-                sender_wallet['private_key'], 
-                receiver['address'], 
-                amount
-            )
+        Returns:
+            {'submitted': 已提交数, 'failed': 失败数}
+        """
+        from presign import read_signed_transactions
+        from rpc_batch import RPCBatchClient
+        
+        client = RPCBatchClient(self.rpc_url, batch_size=self.batch_size, max_retries=1,
+                                limiter=self.tx_limiter, pool=self.rpc_pool, metrics=self.rpc_metrics)
+        tracker = self._create_receipt_tracker()
+        submitted = 0
+        failed = 0
+        senders = set()
+        start_time = time.time()
+        
+        print(f"\n{Fore.CYAN}📡 开始广播签名交易: {path}{Style.RESET_ALL}")
+        
+        # 按窗口读取，每个窗口内按顺序分批提交，同一发送方的nonce保持递增
+        signed = read_signed_transactions(path)
+        window = self.batch_size * 10
+        while True:
+            items = list(itertools.islice(signed, window))
+            if not items:
+                break
             
-            if tx_hash:
-                print(f"{Fore.GREEN}✅ 交易成功: {tx_hash}{Style.RESET_ALL}")
-                print(f"   浏览器查看: {self.explorer}/tx/{tx_hash}")
-                success_count += 1
-            else:
-                failed_count += 1
+            responses = client.call([('eth_sendRawTransaction', [item['raw']]) for item in items])
+            for item, (ok, result) in zip(items, responses):
+                senders.add(item['from'])
+                if ok or classify_nonce_error(result) == 'known':
+                    tracker.track(result if ok and result else item['hash'])
+                    submitted += 1
+                else:
+                    failed += 1
+                    if failed <= 10:
+                        print(f"\r{Fore.RED}❌ 广播失败 (nonce {item['nonce']} -> {item['to'][:10]}...): {result}{Style.RESET_ALL}")
+                    elif failed == 11:
+                        print(f"\r{Fore.RED}❌ 更多失败不再逐条显示...{Style.RESET_ALL}")
             
-            # 添加延迟
-            time.sleep(1)
+            elapsed = time.time() - start_time
+            print(f"\r广播进度: 已提交 {submitted}, 失败 {failed} ({(submitted + failed) / max(elapsed, 1e-9):.0f} 笔/秒)", end='')
         
-        print(f"\n{Fore.CYAN}📊 一对多转账完成统计:{Style.RESET_ALL}")
-        print(f"{Fore.GREEN}✅ 成功: {success_count} 笔{Style.RESET_ALL}")
-        print(f"{Fore.RED}❌ 失败: {failed_count} 笔{Style.RESET_ALL}")
+        print()  # 换行
+        # 发送方的nonce已在本工具之外分配，之后的转账重新从节点获取
+        for sender in senders:
+            self.nonce_manager.invalidate(sender)
+        
+        elapsed = time.time() - start_time
+        print(f"\n{Fore.CYAN}📊 广播完成统计:{Style.RESET_ALL}")
+        print(f"{Fore.GREEN}📨 已提交: {submitted} 笔{Style.RESET_ALL}")
+        print(f"{Fore.RED}❌ 失败: {failed} 笔{Style.RESET_ALL}")
+        print(f"⏱️  耗时: {elapsed:.1f} 秒")
+        
+        self._report_confirmations(tracker)
+        return {'submitted': submitted, 'failed': failed}
+    
+    def _run_presign(self):
+        """交互式预签名一对多转账"""
+        if not self.wallets:
+            print(f"{Fore.YELLOW}⚠️  请先加载钱包CSV文件{Style.RESET_ALL}")
+            return
+        
+        sender_wallet = self._select_sender_wallet()
+        if sender_wallet is None:
+            return
+        amount = self._input_transfer_amount()
+        if amount is None:
+            return
+        
+        print(f"{Fore.CYAN}请输入签名交易输出文件 [默认: signed_transactions.jsonl]: {Style.RESET_ALL}", end='')
+        output_path = input().strip() or 'signed_transactions.jsonl'
+        
+        receivers = [w for w in self.wallets if w['address'] != sender_wallet['address']]
+        try:
+            self.presign_one_to_many(sender_wallet, receivers, amount, output_path)
+        except Exception as e:
+            print(f"{Fore.RED}❌ 预签名失败: {str(e)}{Style.RESET_ALL}")
+    
+    def _run_broadcast(self):
+        """交互式广播签名交易文件"""
+        print(f"\n{Fore.CYAN}请输入签名交易文件 [默认: signed_transactions.jsonl]: {Style.RESET_ALL}", end='')
+        path = input().strip() or 'signed_transactions.jsonl'
+        if not os.path.exists(path):
+            print(f"{Fore.RED}❌ 文件不存在: {path}{Style.RESET_ALL}")
+            return
+        self.broadcast_signed_file(path)
+    
+    def _create_receipt_tracker(self) -> 'ReceiptTracker':
+        """创建在后台批量查询交易回执的跟踪器"""
+        from rpc_batch import RPCBatchClient
+        from receipt_tracker import ReceiptTracker
+        
+        client = RPCBatchClient(self.rpc_url, batch_size=self.batch_size, pool=self.rpc_pool, metrics=self.rpc_metrics)
+        return ReceiptTracker(client, drop_timeout=self.receipt_timeout)
+    
+    def _report_confirmations(self, tracker: 'ReceiptTracker') -> Dict[str, Dict]:
+        """
+        等待已提交的交易上链并显示确认统计（按 Ctrl+C 可跳过等待）
+        
+        Returns:
+            每笔交易的确认结果 {交易哈希: {'status', 'block_number', 'latency'}}
+        """
+        if tracker.pending_count:
+            print(f"\n{Fore.CYAN}⏳ 等待 {tracker.pending_count} 笔交易上链确认 "
+                  f"(最长 {self.receipt_timeout} 秒，按 Ctrl+C 跳过)...{Style.RESET_ALL}")
+            try:
+                tracker.wait()
+            except KeyboardInterrupt:
+                print(f"\n{Fore.YELLOW}⚠️  已跳过等待，剩余交易未确认{Style.RESET_ALL}")
+        tracker.stop()
+        
+        report = tracker.report()
+        if not any(report[key] for key in ('mined', 'reverted', 'dropped', 'pending')):
+            return {}
+        
+        print(f"\n{Fore.CYAN}⛓️  交易确认统计:{Style.RESET_ALL}")
+        print(f"{Fore.GREEN}✅ 上链成功: {report['mined']} 笔{Style.RESET_ALL}")
+        print(f"{Fore.RED}↩️  上链但执行失败: {report['reverted']} 笔{Style.RESET_ALL}")
+        print(f"{Fore.RED}🗑️  未上链（已丢弃）: {report['dropped']} 笔{Style.RESET_ALL}")
+        if report['pending']:
+            print(f"{Fore.YELLOW}⏳ 未确认: {report['pending']} 笔{Style.RESET_ALL}")
+        if report['latency_p50'] is not None:
+            print(f"⏱️  上链耗时: p50 {report['latency_p50']:.1f}s, "
+                  f"p90 {report['latency_p90']:.1f}s, p99 {report['latency_p99']:.1f}s")
+        return tracker.results()
+    
+    def stream_scan_and_export(self, file_path: str, output_path: str, min_balance: Decimal = Decimal('0'),
+                               chunksize: int = 50000, snapshot: bool = False) -> bool:
+        """
+        流式处理超大钱包CSV：分块读取校验，每块直接查询余额并追加导出，
+        内存占用只与块大小有关，与文件总行数无关
+        
+        Args:
+            file_path: 输入CSV文件路径
+            output_path: 输出CSV文件路径（会被覆盖）
+            min_balance: 导出的最小余额阈值
+            chunksize: 每块行数
+            snapshot: 是否所有块固定在同一区块查询
+            
+        Returns:
+            是否成功
+        """
+        if not os.path.exists(file_path):
+            print(f"{Fore.RED}❌ CSV文件不存在: {file_path}{Style.RESET_ALL}")
+            return False
+        
+        if not self.w3 or not hasattr(self.w3.eth, 'get_balance'):
+            print(f"{Fore.YELLOW}⚠️  离线模式，无法获取余额{Style.RESET_ALL}")
+            return False
+        
+        # 所有块共用一个快照区块，保证结果一致
+        block_number = None
+        if snapshot:
+            try:
+                block_number = self._call_rpc(lambda w3: w3.eth.block_number)
+            except Exception as e:
+                print(f"{Fore.RED}❌ 获取快照区块失败: {str(e)}{Style.RESET_ALL}")
+                return False
+            print(f"{Fore.CYAN}📌 快照模式: 所有余额固定在区块 {block_number} 查询{Style.RESET_ALL}")
+        
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        
+        saved_wallets = self.wallets
+        total_rows = 0
+        invalid_count = 0
+        zero_balance_count = 0
+        failed_count = 0
+        
+        from csv_filter import CSVExportWriter
+        from wallet_loader import iter_wallet_chunks
+        
+        # 所有块写入同一个导出文件，符合条件的钱包逐个写入，不在内存中收集
+        writer = CSVExportWriter(output_path, include_block=snapshot)
+        completed = False
+        try:
+            for chunk_no, (wallets, issues) in enumerate(iter_wallet_chunks(file_path, chunksize), 1):
+                total_rows += len(wallets) + len(issues)
+                invalid_count += len(issues)
+                for message in issues:
+                    print(f"{Fore.YELLOW}⚠️  {message}{Style.RESET_ALL}")
+                
+                if not wallets:
+                    continue
+                
+                print(f"\n{Fore.CYAN}📦 第 {chunk_no} 块: {len(wallets)} 个有效钱包 (累计读取 {total_rows} 行){Style.RESET_ALL}")
+                
+                # 查询引擎直接作用于当前块
+                self.wallets = wallets
+                wallets.set_source_file(os.path.basename(file_path))
+                # 流式扫描按块覆盖导出文件，不使用任务日志
+                if not self._scan_balances(snapshot, block_number, use_journal=False):
+                    return False
+                
+                with stage('export'):
+                    for wallet in wallets:
+                        balance = wallet['balance']
+                        if balance is None:
+                            failed_count += 1
+                        elif balance <= min_balance:
+                            zero_balance_count += 1
+                        else:
+                            writer.write(wallet)
+            completed = True
+        except Exception as e:
+            print(f"{Fore.RED}❌ 流式处理CSV文件时出错: {str(e)}{Style.RESET_ALL}")
+            return False
+        finally:
+            writer.close()
+            self.wallets = saved_wallets
+            # 中途失败或中断时不留下只有部分结果的导出文件
+            if not completed and writer.discard():
+                print(f"{Fore.YELLOW}🗑️  已删除未完成的导出文件: {output_path}{Style.RESET_ALL}")
+        exported_count = writer.count
+        
+        self.csv_filter.show_filter_summary(total_rows - invalid_count, exported_count, zero_balance_count, failed_count)
+        if invalid_count > 0:
+            print(f"{Fore.YELLOW}⚠️  跳过 {invalid_count} 个无效行{Style.RESET_ALL}")
+        if exported_count > 0:
+            print(f"{Fore.GREEN}✅ 共导出 {exported_count} 个钱包到 {output_path}{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.YELLOW}⚠️  没有找到余额大于 {min_balance} {self.symbol} 的钱包{Style.RESET_ALL}")
+        return exported_count > 0
     
     def filter_wallets_and_export(self):
         """过滤有余额的钱包并导出为新的CSV文件"""
@@ -728,6 +1956,37 @@ class IrysChecker:
         else:
             print(f"\n{Fore.YELLOW}⚠️  钱包过滤流程未完成{Style.RESET_ALL}")
     
+    def _run_stream_scan(self):
+        """交互式收集流式扫描参数"""
+        print(f"\n{Fore.CYAN}请输入CSV文件路径: {Style.RESET_ALL}", end='')
+        file_path = input().strip()
+        if not file_path:
+            return
+        
+        print(f"{Fore.CYAN}请输入最小余额阈值 ({self.symbol}) [默认: 0]: {Style.RESET_ALL}", end='')
+        min_balance_input = input().strip()
+        try:
+            min_balance = Decimal('0') if not min_balance_input else Decimal(min_balance_input)
+        except:
+            print(f"{Fore.RED}❌ 余额格式不正确，使用默认值 0{Style.RESET_ALL}")
+            min_balance = Decimal('0')
+        
+        print(f"{Fore.CYAN}请输入输出文件路径 [默认: 自动生成]: {Style.RESET_ALL}", end='')
+        output_path = input().strip() or self.csv_filter.generate_output_filename()
+        
+        print(f"{Fore.CYAN}请输入每块行数 [默认: 50000]: {Style.RESET_ALL}", end='')
+        chunksize_input = input().strip()
+        try:
+            chunksize = int(chunksize_input) if chunksize_input else 50000
+        except ValueError:
+            print(f"{Fore.RED}❌ 行数格式不正确，使用默认值 50000{Style.RESET_ALL}")
+            chunksize = 50000
+        
+        print(f"{Fore.CYAN}是否固定在同一区块查询（快照模式）？(y/n) [默认: n]: {Style.RESET_ALL}", end='')
+        snapshot = input().strip().lower() in ['y', 'yes', '是']
+        
+        self.stream_scan_and_export(file_path, output_path, min_balance, chunksize, snapshot)
+    
     def show_menu(self):
         """显示主菜单"""
         menu_options = [
@@ -737,6 +1996,9 @@ class IrysChecker:
             "🔍 过滤有余额钱包并导出CSV",
             "📤 多对一转账（归集）",
             "📤 一对多转账",
+            "🌊 流式扫描大文件并导出（低内存）",
+            "✍️  预签名一对多转账（多进程签名）",
+            "📡 广播预签名交易文件",
             "ℹ️  显示网络信息",
             "❌ 退出程序"
         ]
@@ -787,6 +2049,8 @@ class IrysChecker:
     
     def show_network_info(self):
         """显示网络信息"""
+        from tabulate import tabulate
+        
         print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}🔗 Irys Network Testnet 网络信息{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
@@ -802,68 +2066,131 @@ class IrysChecker:
         else:
             try:
                 latest_block = self.w3.eth.block_number
-                gas_price = self.w3.eth.gas_price
+                self.gas_oracle.update_block(latest_block)
+                fees = self.gas_oracle.get_fees()
                 print(f"{Fore.GREEN}最新区块: {Style.RESET_ALL}{latest_block}")
-                print(f"{Fore.GREEN}当前Gas价格: {Style.RESET_ALL}{self.w3.from_wei(gas_price, 'gwei'):.2f} Gwei")
+                if 'maxFeePerGas' in fees:
+                    print(f"{Fore.GREEN}当前Gas费用: {Style.RESET_ALL}"
+                          f"最高 {self.w3.from_wei(fees['maxFeePerGas'], 'gwei'):.2f} Gwei, "
+                          f"小费 {self.w3.from_wei(fees['maxPriorityFeePerGas'], 'gwei'):.2f} Gwei (EIP-1559)")
+                else:
+                    print(f"{Fore.GREEN}当前Gas价格: {Style.RESET_ALL}{self.w3.from_wei(fees['gasPrice'], 'gwei'):.2f} Gwei")
                 print(f"{Fore.GREEN}连接状态: {Style.RESET_ALL}✅ 已连接")
             except Exception as e:
                 print(f"{Fore.RED}网络状态: {Style.RESET_ALL}❌ 连接异常 ({str(e)})")
         
+        # 显示端点池状态
+        if self.rpc_pool:
+            table_data = []
+            for endpoint in self.rpc_pool.endpoints:
+                latency_str = f"{endpoint.latency * 1000:.0f}ms" if endpoint.latency is not None else "-"
+                status_str = "✅ 可用" if endpoint.healthy else f"❌ 已剔除 ({endpoint.last_error})"
+                table_data.append([endpoint.url, endpoint.block_number, latency_str, status_str])
+            print(f"\n{Fore.CYAN}RPC端点池:{Style.RESET_ALL}")
+            print(tabulate(table_data, headers=['端点', '区块高度', '延迟', '状态'], tablefmt='grid'))
+        
         print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
         input("\n按回车返回主菜单...")
     
+    def start_metrics_server(self, port: int, host: str = '127.0.0.1'):
+        """
+        启动 Prometheus 指标端点
+
+        Args:
+            port: 监听端口，0表示自动分配
+            host: 监听地址，默认只监听本机
+        """
+        self.metrics_server = self.rpc_metrics.start_http_server(port, host)
+        host, port = self.metrics_server.server_address[:2]
+        print(f"{Fore.CYAN}📈 RPC指标: http://{host}:{port}/metrics{Style.RESET_ALL}")
+    
+    def show_rpc_summary(self, since=None):
+        """
+        显示RPC调用汇总（按端点和方法）
+        
+        Args:
+            since: RPCMetrics.snapshot() 的结果，只统计该快照之后的调用；默认统计全部
+        """
+        rows = self.rpc_metrics.summary(since)
+        if not rows:
+            return
+        from tabulate import tabulate
+        
+        def ms(seconds):
+            return '-' if seconds is None else f"{seconds * 1000:.0f}"
+        
+        table_data = []
+        for row in rows:
+            errors = ', '.join(f"{kind}:{count}" for kind, count in sorted(row['errors'].items())) or '0'
+            table_data.append([row['endpoint'], row['method'], row['calls'], row['requests'], errors,
+                               ms(row['avg']), ms(row['p50']), ms(row['p90']), ms(row['p99'])])
+        print(f"\n{Fore.CYAN}📈 RPC调用统计:{Style.RESET_ALL}")
+        print(tabulate(table_data, headers=['端点', '方法', '调用数', 'HTTP请求', '错误', '平均(ms)',
+                                            'p50(ms)', 'p90(ms)', 'p99(ms)'], tablefmt='grid'))
+    
     def run(self):
         """运行主程序"""
         try:
             while True:
                 choice = self.show_menu()
                 
-                if choice == 0:  # 加载单个CSV文件
-                    print(f"\n{Fore.CYAN}请输入CSV文件路径 (例: wallets_example.csv): {Style.RESET_ALL}", end='')
-                    file_path = input().strip()
-                    if file_path:
-                        if self.load_wallets_from_csv(file_path):
-                            # 更新加载文件信息
-                            self.loaded_files = [{
-                                'path': file_path,
-                                'name': os.path.basename(file_path),
-                                'count': len(self.wallets)
-                            }]
-                    input("按回车继续...")
+                if choice == 9:  # 显示网络信息
+                    self.show_network_info()
+                    continue
+                
+                if choice == 10:  # 退出
+                    print(f"\n{Fore.GREEN}👋 感谢使用！{Style.RESET_ALL}")
+                    break
                 
-                elif choice == 1:  # 批量加载目录中的CSV文件
-                    print(f"\n{Fore.CYAN}请输入目录路径: {Style.RESET_ALL}", end='')
-                    dir_path = input().strip()
-                    if dir_path:
-                        csv_files = self.scan_directory_for_csv(dir_path)
-                        if csv_files:
-                            selected_files = self.select_csv_files(csv_files)
-                            if selected_files:
-                                self.load_multiple_csv_files(selected_files)
-                    input("按回车继续...")
+                metrics_before = self.rpc_metrics.snapshot()
+                with self.profiler.profile(self.MENU_ACTIONS.get(choice)):
+                    if choice == 0:  # 加载单个CSV文件
+                        print(f"\n{Fore.CYAN}请输入CSV文件路径 (例: wallets_example.csv): {Style.RESET_ALL}", end='')
+                        file_path = input().strip()
+                        if file_path:
+                            if self.load_wallets_from_csv(file_path):
+                                # 更新加载文件信息
+                                self.loaded_files = [{
+                                    'path': file_path,
+                                    'name': os.path.basename(file_path),
+                                    'count': len(self.wallets)
+                                }]
                 
-                elif choice == 2:  # 查看余额
-                    self.check_all_balances()
-                    input("按回车继续...")
+                    elif choice == 1:  # 批量加载目录中的CSV文件
+                        print(f"\n{Fore.CYAN}请输入目录路径: {Style.RESET_ALL}", end='')
+                        dir_path = input().strip()
+                        if dir_path:
+                            csv_files = self.scan_directory_for_csv(dir_path)
+                            if csv_files:
+                                selected_files = self.select_csv_files(csv_files)
+                                if selected_files:
+                                    self.load_multiple_csv_files(selected_files)
                 
-                elif choice == 3:  # 过滤有余额钱包并导出CSV
-                    self.filter_wallets_and_export()
-                    input("按回车继续...")
+                    elif choice == 2:  # 查看余额
+                        print(f"\n{Fore.CYAN}是否固定在同一区块查询（快照模式）？(y/n) [默认: n]: {Style.RESET_ALL}", end='')
+                        snapshot = input().strip().lower() in ['y', 'yes', '是']
+                        self.check_all_balances(snapshot=snapshot)
                 
-                elif choice == 4:  # 多对一转账
-                    self.bulk_transfer_many_to_one()
-                    input("按回车继续...")
+                    elif choice == 3:  # 过滤有余额钱包并导出CSV
+                        self.filter_wallets_and_export()
                 
-                elif choice == 5:  # 一对多转账
-                    self.bulk_transfer_one_to_many()
-                    input("按回车继续...")
+                    elif choice == 4:  # 多对一转账
+                        self.bulk_transfer_many_to_one()
                 
-                elif choice == 6:  # 显示网络信息
-                    self.show_network_info()
+                    elif choice == 5:  # 一对多转账
+                        self.bulk_transfer_one_to_many()
                 
-                elif choice == 7:  # 退出
-                    print(f"\n{Fore.GREEN}👋 感谢使用！{Style.RESET_ALL}")
-                    break
+                    elif choice == 6:  # 流式扫描大文件并导出
+                        self._run_stream_scan()
+                
+                    elif choice == 7:  # 预签名一对多转账
+                        self._run_presign()
+                
+                    elif choice == 8:  # 广播预签名交易文件
+                        self._run_broadcast()
+                
+                self.show_rpc_summary(metrics_before)
+                input("按回车继续...")
                 
         except KeyboardInterrupt:
             print(f"\n\n{Fore.YELLOW}程序被用户中断{Style.RESET_ALL}")
@@ -875,6 +2202,13 @@ def main():
     print(f"{Fore.CYAN}正在初始化 Irys Network Testnet 钱包管理工具...{Style.RESET_ALL}")
     
     checker = IrysChecker()
+    # 设置 IRYS_METRICS_PORT 后在本机该端口提供 Prometheus 指标（/metrics）
+    metrics_port = os.environ.get('IRYS_METRICS_PORT')
+    if metrics_port:
+        checker.start_metrics_server(int(metrics_port))
+    # 设置 IRYS_PROFILE=1 后对每个菜单操作做性能分析，结果写入 .irys_cache/profiles
+    if os.environ.get('IRYS_PROFILE', '').lower() in ('1', 'true', 'yes'):
+        checker.profiler.enabled = True
     checker.run()
 
 if __name__ == "__main__":
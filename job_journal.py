@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可恢复的任务日志
+功能：以追加方式记录余额查询结果和已签名/已发送的交易（nonce、哈希、原始交易），
+程序中断后用相同的输入重新运行时从日志恢复，跳过已完成的工作
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+
+
+def job_fingerprint(*parts) -> str:
+    """根据任务的输入计算指纹，相同输入的任务对应同一个日志文件"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray)):
+            digest.update(bytes(part))
+        else:
+            digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+class JobJournal:
+    def __init__(self, path: str, kind: str, params: Optional[Dict] = None, flush_every: int = 1000):
+        """
+        打开任务日志；文件存在且任务未完成时加载已有记录（恢复），否则重新开始
+
+        Args:
+            path: 日志文件路径
+            kind: 任务类型（scan / sweep / disperse）
+            params: 任务参数，写入日志头部
+            flush_every: 余额记录每累计多少条写入一次磁盘
+        """
+        self.path = path
+        self.kind = kind
+        self.flush_every = flush_every
+        self.header: Dict = {}
+        self.balances: Dict[str, int] = {}  # 小写地址 -> 余额wei
+        self.transactions: Dict[str, Dict] = {}  # 工作项 -> 最新的交易记录
+        self.resumed = False
+
+        self._buffer = []
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        if os.path.exists(path) and self._load():
+            self.resumed = True
+            self._file = open(path, 'a', encoding='utf-8')
+            if not self._ends_with_newline():
+                # 中断时写了一半的最后一行先换行结束，之后追加的记录不会接在它后面
+                self._file.write('\n')
+        else:
+            self.header = {'type': 'job', 'kind': kind, 'params': params or {}, 'started_at': time.time()}
+            self._file = open(path, 'w', encoding='utf-8')
+            self._write(self.header, sync=True)
+
+    @classmethod
+    def open(cls, directory: str, kind: str, fingerprint: str, params: Optional[Dict] = None) -> 'JobJournal':
+        """按任务类型和输入指纹打开日志"""
+        return cls(os.path.join(directory, f"{kind}-{fingerprint}.jsonl"), kind, params)
+
+    def _load(self) -> bool:
+        """读取已有日志，返回是否为可恢复的未完成任务"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 中断时最后一行可能只写了一半
+                    continue
+                record_type = record.get('type')
+                if record_type == 'job':
+                    self.header = record
+                elif record_type == 'balance':
+                    self.balances[record['address']] = int(record['wei'])
+                elif record_type == 'tx':
+                    self.transactions[record['key']] = record
+                elif record_type == 'done':
+                    return False
+        return self.header.get('kind') == self.kind
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _write(self, record: Dict, sync: bool = False):
+        self._buffer.append(json.dumps(record) + '\n')
+        if sync or len(self._buffer) >= self.flush_every:
+            self._flush(sync)
+
+    def _flush(self, sync: bool = False):
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._buffer = []
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def set_header(self, **fields):
+        """在日志头部之后追加任务信息（例如快照区块），恢复时合并到 header"""
+        with self._lock:
+            self.header.update(fields)
+            self._write({'type': 'job', **self.header}, sync=True)
+
+    def record_balance(self, address: str, balance_wei: int):
+        """记录一个地址的余额查询结果"""
+        key = address.lower()
+        with self._lock:
+            self.balances[key] = balance_wei
+            self._write({'type': 'balance', 'address': key, 'wei': str(balance_wei)})
+
+    def record_transaction(self, key: str, state: str, **fields):
+        """
+        记录工作项的交易状态，立即写入磁盘（发送前必须先落盘，避免重复发送）
+
+        Args:
+            key: 工作项标识（例如发送方地址或接收方序号）
+            state: signed / sent / failed / skipped / confirmed
+            fields: from/to/nonce/hash/raw 等交易信息
+        """
+        with self._lock:
+            record = dict(self.transactions.get(key, {}))
+            record.update(fields)
+            record.update({'type': 'tx', 'key': key, 'state': state})
+            self.transactions[key] = record
+            self._write(record, sync=True)
+
+    def flush(self):
+        with self._lock:
+            self._flush(sync=True)
+
+    def complete(self, remove: bool = False):
+        """
+        标记任务完成，之后用相同输入运行时会重新开始
+
+        Args:
+            remove: 是否删除日志文件（不需要保留记录时）
+        """
+        with self._lock:
+            self._write({'type': 'done', 'finished_at': time.time()}, sync=True)
+            self._file.close()
+            if remove:
+                os.remove(self.path)
+
+    def close(self):
+        """关闭日志但不标记完成（下次可恢复）"""
+        with self._lock:
+            if not self._file.closed:
+                self._flush(sync=True)
+                self._file.close()
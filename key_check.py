@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+私钥与地址一致性校验
+功能：在进程池中由每个私钥推导地址，与CSV中的地址比对，找出不匹配的行；
+结果按钱包数据指纹（每个来源文件的地址和私钥）缓存，同一文件只需校验一次
+
+推导地址需要一次椭圆曲线乘法；安装 coincurve 后 eth_keys 会自动改用 libsecp256k1，速度约快百倍
+"""
+
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from wallet_store import ADDRESS_SIZE, KEY_SIZE, WalletStore
+
+
+def derive_addresses(private_keys: bytes) -> bytes:
+    """
+    由私钥推导地址（在子进程中运行）
+
+    Args:
+        private_keys: 私钥拼接成的二进制（每个32字节）
+
+    Returns:
+        推导出的地址拼接成的二进制（每个20字节）；无效私钥对应20个0字节
+    """
+    from eth_keys import keys
+
+    addresses = bytearray()
+    for start in range(0, len(private_keys), KEY_SIZE):
+        try:
+            private_key = keys.PrivateKey(private_keys[start:start + KEY_SIZE])
+            addresses += private_key.public_key.to_canonical_address()
+        except Exception:
+            # 私钥超出曲线阶等情况，不会与任何地址匹配
+            addresses += bytes(ADDRESS_SIZE)
+    return bytes(addresses)
+
+
+def _verify_chunk(addresses: bytes, private_keys: bytes) -> List[Tuple[int, bytes]]:
+    """校验一段钱包，返回不匹配的 (段内行号, 推导出的地址)"""
+    derived = derive_addresses(private_keys)
+    mismatches = []
+    for i, start in enumerate(range(0, len(addresses), ADDRESS_SIZE)):
+        expected = addresses[start:start + ADDRESS_SIZE]
+        actual = derived[start:start + ADDRESS_SIZE]
+        if expected != actual:
+            mismatches.append((i, actual))
+    return mismatches
+
+
+def find_key_mismatches(addresses: bytes, private_keys: bytes, workers: Optional[int] = None,
+                        chunk_size: int = 2000, progress: Optional[Callable[[int, int], None]] = None
+                        ) -> List[Tuple[int, bytes]]:
+    """
+    并行校验私钥与地址是否对应
+
+    Args:
+        addresses: 地址拼接成的二进制
+        private_keys: 私钥拼接成的二进制（与地址一一对应）
+        workers: 进程数，默认为CPU核数
+        chunk_size: 每个子任务校验的钱包数
+        progress: 进度回调 progress(已完成数, 总数)
+
+    Returns:
+        按行号排序的 (行号, 推导出的地址) 列表
+    """
+    total = len(addresses) // ADDRESS_SIZE
+    chunks = [
+        (start, addresses[start * ADDRESS_SIZE:(start + chunk_size) * ADDRESS_SIZE],
+         private_keys[start * KEY_SIZE:(start + chunk_size) * KEY_SIZE])
+        for start in range(0, total, chunk_size)
+    ]
+    mismatches = []
+    done = 0
+
+    if len(chunks) <= 1:
+        # 钱包较少时直接校验，省去启动进程池的开销
+        for start, chunk_addresses, chunk_keys in chunks:
+            mismatches += [(start + i, actual) for i, actual in _verify_chunk(chunk_addresses, chunk_keys)]
+            done += len(chunk_addresses) // ADDRESS_SIZE
+        if progress is not None:
+            progress(done, total)
+        return mismatches
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(_verify_chunk, chunk_addresses, chunk_keys): (start, len(chunk_addresses))
+                   for start, chunk_addresses, chunk_keys in chunks}
+        for future in as_completed(futures):
+            start, size = futures[future]
+            mismatches += [(start + i, actual) for i, actual in future.result()]
+            done += size // ADDRESS_SIZE
+            if progress is not None:
+                progress(done, total)
+    return sorted(mismatches)
+
+
+class KeyCheckCache:
+    """按钱包数据指纹缓存校验结果，每个指纹一个JSON文件"""
+
+    def __init__(self, directory: str = os.path.join('.irys_cache', 'keys')):
+        self.directory = directory
+
+    @staticmethod
+    def fingerprint(addresses: bytes, private_keys: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(addresses)
+        digest.update(private_keys)
+        return digest.hexdigest()
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint[:32]}.json")
+
+    def get(self, fingerprint: str) -> Optional[List[Tuple[int, bytes]]]:
+        """读取缓存的不匹配列表，没有缓存时返回None"""
+        try:
+            with open(self._path(fingerprint), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('fingerprint') != fingerprint:
+            return None
+        return [(row, bytes.fromhex(derived)) for row, derived in data['mismatches']]
+
+    def put(self, fingerprint: str, count: int, mismatches: List[Tuple[int, bytes]]):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(fingerprint)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fingerprint': fingerprint,
+                'count': count,
+                'mismatches': [[row, derived.hex()] for row, derived in mismatches]
+            }, f)
+        os.replace(tmp_path, path)
+
+
+def verify_wallet_keys(wallets: WalletStore, cache: Optional[KeyCheckCache] = None, workers: Optional[int] = None,
+                       progress: Optional[Callable[[int, int], None]] = None) -> Tuple[Dict[int, str], int]:
+    """
+    校验存储中所有钱包的私钥与地址是否对应，每个来源文件分别按指纹缓存
+
+    Args:
+        wallets: 钱包存储
+        cache: 结果缓存，None表示不缓存
+        workers: 进程数，默认为CPU核数
+        progress: 进度回调 progress(已完成数, 需要校验的总数)
+
+    Returns:
+        ({不匹配的行号: 私钥推导出的地址}, 实际校验的钱包数（不含命中缓存的）)
+    """
+    mismatches: Dict[int, str] = {}
+    pending = []
+    for start, end in wallets.source_ranges():
+        addresses, private_keys = wallets.column_bytes(start, end)
+        fingerprint = KeyCheckCache.fingerprint(addresses, private_keys)
+        cached = cache.get(fingerprint) if cache is not None else None
+        if cached is None:
+            pending.append((start, end, fingerprint, addresses, private_keys))
+        else:
+            mismatches.update({start + row: '0x' + derived.hex() for row, derived in cached})
+
+    if not pending:
+        return mismatches, 0
+
+    # 所有未缓存的文件合并后一起分块，进程池只启动一次
+    addresses = b''.join(item[3] for item in pending)
+    private_keys = b''.join(item[4] for item in pending)
+    found = find_key_mismatches(addresses, private_keys, workers=workers, progress=progress)
+
+    offset = 0
+    for start, end, fingerprint, _, _ in pending:
+        count = end - start
+        file_mismatches = [(row - offset, derived) for row, derived in found if offset <= row < offset + count]
+        if cache is not None:
+            cache.put(fingerprint, count, file_mismatches)
+        mismatches.update({start + row: '0x' + derived.hex() for row, derived in file_mismatches})
+        offset += count
+    return mismatches, len(addresses) // ADDRESS_SIZE
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地nonce管理
+功能：每个发送地址只从节点获取一次 pending nonce，之后在本地递增分配；
+节点返回 nonce too low 时重新同步（already known 说明nonce已被同一笔交易使用，不需要调整；
+replacement transaction underpriced 说明交易池中另一笔交易占用了该nonce，重新同步无济于事，按发送失败处理）
+"""
+
+import threading
+from typing import Callable, Dict, Optional
+
+
+# 节点返回的nonce相关错误信息（geth及其衍生节点）
+NONCE_TOO_LOW_MESSAGES = ('nonce too low',)
+ALREADY_KNOWN_MESSAGES = ('already known', 'known transaction')
+UNDERPRICED_MESSAGES = ('replacement transaction underpriced', 'replacement fee too low')
+
+
+def classify_nonce_error(error: BaseException) -> Optional[str]:
+    """
+    识别发送交易时的nonce错误
+
+    Args:
+        error: 发送交易时抛出的异常
+
+    Returns:
+        'too_low'（nonce已被已上链的交易使用） / 'known'（相同交易已在交易池中） /
+        'underpriced'（交易池中另一笔交易占用了该nonce，费用不足以替换） / None（与nonce无关）
+    """
+    message = str(error).lower()
+    if any(text in message for text in ALREADY_KNOWN_MESSAGES):
+        return 'known'
+    if any(text in message for text in UNDERPRICED_MESSAGES):
+        return 'underpriced'
+    if any(text in message for text in NONCE_TOO_LOW_MESSAGES):
+        return 'too_low'
+    return None
+
+
+class NonceManager:
+    def __init__(self, fetch_nonce: Callable[[str], int]):
+        """
+        Args:
+            fetch_nonce: 从节点获取地址 pending nonce 的函数
+        """
+        self.fetch_nonce = fetch_nonce
+        self._next: Dict[str, int] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def next_nonce(self, address: str) -> int:
+        """
+        分配下一个nonce，首次使用时从节点获取
+
+        Args:
+            address: 发送地址
+        """
+        key = address.lower()
+        with self._lock_for(key):
+            nonce = self._next.get(key)
+            if nonce is None:
+                nonce = self.fetch_nonce(address)
+            self._next[key] = nonce + 1
+            return nonce
+
+    def resync(self, address: str) -> int:
+        """
+        重新从节点获取 pending nonce 并分配
+
+        Args:
+            address: 发送地址
+
+        Returns:
+            重新同步后分配的nonce
+        """
+        key = address.lower()
+        with self._lock_for(key):
+            nonce = self.fetch_nonce(address)
+            # 其他线程可能已经分配到更大的nonce，不能回退
+            nonce = max(nonce, self._next.get(key, 0))
+            self._next[key] = nonce + 1
+            return nonce
+
+    def invalidate(self, address: str):
+        """丢弃本地记录（已分配的nonce未被使用时），下次分配时重新获取"""
+        key = address.lower()
+        with self._lock_for(key):
+            self._next.pop(key, None)
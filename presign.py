@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线预签名
+功能：在进程池中并行构建并签名整份转账计划，把原始交易按行写入JSON文件，
+之后由单独的广播步骤读取文件提交，签名的CPU开销不再占用发送流程
+"""
+
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+
+def sign_transfer_chunk(transfers: List[Dict]) -> List[Dict]:
+    """
+    签名一组转账（在子进程中运行）
+
+    Args:
+        transfers: 转账列表，每项包含 from/private_key/to/value/nonce/gas/chain_id/fees
+
+    Returns:
+        签名结果列表，每项包含 from/to/nonce/value/hash/raw
+    """
+    from eth_account import Account
+
+    signed = []
+    for transfer in transfers:
+        transaction = {
+            'to': transfer['to'],
+            'value': transfer['value'],
+            'gas': transfer['gas'],
+            'nonce': transfer['nonce'],
+            'chainId': transfer['chain_id'],
+            **transfer['fees']
+        }
+        signed_txn = Account.sign_transaction(transaction, transfer['private_key'])
+        signed.append({
+            'from': transfer['from'],
+            'to': transfer['to'],
+            'nonce': transfer['nonce'],
+            'value': str(transfer['value']),
+            'hash': signed_txn.hash.hex(),
+            'raw': signed_txn.rawTransaction.hex()
+        })
+    return signed
+
+
+def presign_transfers(transfers: List[Dict], output_path: str, workers: Optional[int] = None,
+                      chunk_size: int = 500) -> int:
+    """
+    并行签名整份转账计划并写入文件（按计划顺序，每行一个JSON对象）
+
+    Args:
+        transfers: sign_transfer_chunk 使用的转账列表
+        output_path: 输出文件路径（会被覆盖）
+        workers: 进程数，默认为CPU核数
+        chunk_size: 每个子任务签名的交易数
+
+    Returns:
+        写入的交易数
+    """
+    chunks = [transfers[start:start + chunk_size] for start in range(0, len(transfers), chunk_size)]
+    count = 0
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        if len(chunks) <= 1:
+            # 交易较少时直接签名，省去启动进程池的开销
+            results = map(sign_transfer_chunk, chunks)
+            for signed_chunk in results:
+                count += _write_signed(f, signed_chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+                for signed_chunk in executor.map(sign_transfer_chunk, chunks):
+                    count += _write_signed(f, signed_chunk)
+    return count
+
+
+def _write_signed(f, signed_chunk: List[Dict]) -> int:
+    for item in signed_chunk:
+        f.write(json.dumps(item) + '\n')
+    return len(signed_chunk)
+
+
+def read_signed_transactions(path: str) -> Iterator[Dict]:
+    """
+    逐行读取预签名交易文件
+
+    Args:
+        path: presign_transfers 写入的文件路径
+
+    Yields:
+        签名结果字典（from/to/nonce/value/hash/raw）
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
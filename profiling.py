@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+操作级性能分析
+功能：可选地对每个操作（加载、查询、过滤、归集、分发等）运行 cProfile（包括操作期间启动的线程），
+并统计各阶段（parse / validate / rpc / sign / render / export）的实际耗时，
+每次操作生成 .prof 文件和热点函数报告，不需要改代码即可定位性能回退
+
+未开启分析时 stage() 只返回一个空的上下文管理器，对正常运行几乎没有开销
+"""
+
+import os
+import io
+import time
+import pstats
+import cProfile
+import threading
+import functools
+import contextlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from colorama import Fore, Style
+
+STAGES = ('parse', 'validate', 'rpc', 'sign', 'render', 'export')
+
+_NULL_STAGE = contextlib.nullcontext()
+_active_timer: Optional['StageTimer'] = None
+
+
+class StageTimer:
+    """
+    阶段计时器，线程安全
+
+    同一阶段在多个线程中同时进行时（例如并发RPC），墙钟时间按区间的并集计算，
+    另外累计各线程的耗时总和和调用次数
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = {}
+        self._since: Dict[str, float] = {}
+        self.wall: Dict[str, float] = {}
+        self.total: Dict[str, float] = {}
+        self.count: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        with self._lock:
+            if not self._active.get(name):
+                self._since[name] = start
+            self._active[name] = self._active.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._active[name] -= 1
+                self.total[name] = self.total.get(name, 0.0) + end - start
+                self.count[name] = self.count.get(name, 0) + 1
+                if not self._active[name]:
+                    self.wall[name] = self.wall.get(name, 0.0) + end - self._since[name]
+
+
+def stage(name: str):
+    """
+    标记一个阶段（with stage('rpc'): ...），未开启分析时不计时
+
+    Args:
+        name: 阶段名，见 STAGES
+    """
+    timer = _active_timer
+    if timer is None:
+        return _NULL_STAGE
+    return timer.stage(name)
+
+
+def staged(name: str):
+    """把整个函数标记为一个阶段的装饰器"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ActionProfiler:
+    def __init__(self, output_dir: str = os.path.join('.irys_cache', 'profiles'), enabled: bool = False,
+                 top: int = 20):
+        """
+        Args:
+            output_dir: 分析结果目录，每次操作生成 <时间>_<操作>.prof 和 .txt 报告
+            enabled: 是否开启分析
+            top: 报告中列出的热点函数数
+        """
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.top = top
+
+    @contextlib.contextmanager
+    def profile(self, action: Optional[str]):
+        """
+        分析一次操作；未开启或 action 为None时直接运行
+
+        Args:
+            action: 操作名，用于文件名和报告标题
+        """
+        global _active_timer
+
+        if not self.enabled or action is None:
+            yield
+            return
+
+        timer = StageTimer()
+        profilers: List[cProfile.Profile] = []
+        lock = threading.Lock()
+
+        def start_thread_profiler(frame, event, arg):
+            # 新线程的第一个事件时为该线程启动独立的 cProfile（cProfile 只分析启用它的线程）
+            profiler = cProfile.Profile()
+            profiler.enable()
+            with lock:
+                profilers.append(profiler)
+
+        main_profiler = cProfile.Profile()
+        previous_timer = _active_timer
+        _active_timer = timer
+        threading.setprofile(start_thread_profiler)
+        start = time.perf_counter()
+        main_profiler.enable()
+        try:
+            yield
+        finally:
+            main_profiler.disable()
+            elapsed = time.perf_counter() - start
+            threading.setprofile(None)
+            _active_timer = previous_timer
+            with lock:
+                thread_profilers = list(profilers)
+            self._report(action, elapsed, timer, main_profiler, thread_profilers)
+
+    def _report(self, action: str, elapsed: float, timer: StageTimer, main_profiler: cProfile.Profile,
+                thread_profilers: List[cProfile.Profile]):
+        """合并各线程的分析结果，写入 .prof 文件和文本报告并打印摘要"""
+        stats = pstats.Stats(main_profiler)
+        for profiler in thread_profilers:
+            try:
+                stats.add(profiler)
+            except TypeError:
+                # 线程中没有记录到任何调用
+                pass
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{action}")
+        stats.dump_stats(base + '.prof')
+
+        lines = [f"操作: {action}  总耗时: {elapsed:.3f}s  分析的线程数: {1 + len(thread_profilers)}", '',
+                 f"{'阶段':<10}{'墙钟(s)':>10}{'占比':>8}{'线程累计(s)':>14}{'次数':>10}"]
+        for name in list(STAGES) + sorted(set(timer.wall) - set(STAGES)):
+            if name not in timer.wall:
+                continue
+            wall = timer.wall[name]
+            share = wall / elapsed * 100 if elapsed > 0 else 0
+            lines.append(f"{name:<10}{wall:>10.3f}{share:>7.1f}%{timer.total[name]:>14.3f}{timer.count[name]:>10}")
+
+        hot = io.StringIO()
+        stats.stream = hot
+        stats.sort_stats('tottime').print_stats(self.top)
+        report = '\n'.join(lines) + '\n\n' + hot.getvalue()
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(report)
+
+        print(f"\n{Fore.CYAN}⏱️  性能分析: {action} 总耗时 {elapsed:.2f}s{Style.RESET_ALL}")
+        for line in lines[2:]:
+            print(f"   {line}")
+        print(f"{Fore.CYAN}   热点函数 (按自身耗时):{Style.RESET_ALL}")
+        for func, (cc, nc, tottime, cumtime, callers) in self._top_functions(stats):
+            filename, lineno, name = func
+            location = f"{os.path.basename(filename)}:{lineno}({name})" if lineno else name
+            print(f"   {tottime:8.3f}s  {cumtime:8.3f}s  {nc:>9}  {location}")
+        print(f"{Fore.GREEN}📄 分析结果: {base}.prof / {base}.txt{Style.RESET_ALL}")
+
+    def _top_functions(self, stats: pstats.Stats, limit: int = 10):
+        items = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return items[:min(limit, self.top)]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+交易确认跟踪
+功能：收集已提交的交易哈希，在后台线程中用 JSON-RPC batch 批量查询 eth_getTransactionReceipt，
+无新回执时逐步拉长轮询间隔；统计上链成功/回滚/丢弃数量和上链耗时分位数
+"""
+
+import time
+import threading
+from typing import Dict, List, Optional
+
+from rpc_batch import RPCBatchClient
+
+
+class ReceiptTracker:
+    def __init__(self, client: RPCBatchClient, poll_interval: float = 2, max_interval: float = 15,
+                 drop_timeout: float = 120):
+        """
+        Args:
+            client: 批量RPC客户端
+            poll_interval: 初始轮询间隔（秒）
+            max_interval: 最大轮询间隔（秒）
+            drop_timeout: 提交后超过该时间仍查不到回执则视为丢弃（秒）
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.drop_timeout = drop_timeout
+
+        self._pending: Dict[str, float] = {}  # 交易哈希 -> 提交时间
+        self._results: Dict[str, Dict] = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='receipt-tracker', daemon=True)
+        self._thread.start()
+
+    def track(self, tx_hash: str, submitted_at: Optional[float] = None):
+        """
+        登记一笔已提交的交易，不会阻塞发送流程
+
+        Args:
+            tx_hash: 交易哈希
+            submitted_at: 提交时间，默认为当前时间
+        """
+        with self._condition:
+            self._pending[tx_hash] = submitted_at if submitted_at is not None else time.time()
+            self._condition.notify_all()
+
+    @property
+    def pending_count(self) -> int:
+        """尚未确认的交易数"""
+        with self._condition:
+            return len(self._pending)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有已登记的交易确认或判定为丢弃
+
+        Args:
+            timeout: 最长等待时间（秒），None表示一直等待
+
+        Returns:
+            是否全部完成
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def stop(self):
+        """停止后台轮询"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def results(self) -> Dict[str, Dict]:
+        """每笔交易的确认结果 {交易哈希: {'status', 'block_number', 'latency'}}"""
+        with self._condition:
+            return dict(self._results)
+
+    def report(self) -> Dict:
+        """
+        汇总确认结果
+
+        Returns:
+            {'mined', 'reverted', 'dropped', 'pending', 'latency_p50', 'latency_p90', 'latency_p99'}
+        """
+        with self._condition:
+            results = list(self._results.values())
+            pending = len(self._pending)
+
+        latencies = sorted(r['latency'] for r in results if r['status'] in ('mined', 'reverted'))
+        summary = {
+            'mined': sum(1 for r in results if r['status'] == 'mined'),
+            'reverted': sum(1 for r in results if r['status'] == 'reverted'),
+            'dropped': sum(1 for r in results if r['status'] == 'dropped'),
+            'pending': pending
+        }
+        for percentile in (50, 90, 99):
+            summary[f'latency_p{percentile}'] = self._percentile(latencies, percentile)
+        return summary
+
+    @staticmethod
+    def _percentile(ordered: List[float], percentile: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    def _run(self):
+        interval = self.poll_interval
+        while True:
+            with self._condition:
+                # 没有待确认交易时休眠，直到有新交易登记
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                # 登记新交易也会唤醒等待，按截止时间睡满一个轮询间隔
+                deadline = time.monotonic() + interval
+                while not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._stopped:
+                    return
+                pending = dict(self._pending)
+
+            try:
+                resolved = self._poll(pending)
+            except Exception:
+                resolved = 0
+
+            # 有新回执时恢复初始间隔，否则逐步拉长，减少对节点的压力
+            interval = self.poll_interval if resolved else min(self.max_interval, interval * 1.5)
+
+    def _poll(self, pending: Dict[str, float]) -> int:
+        """查询一轮回执，返回本轮确定结果的交易数"""
+        hashes = list(pending)
+        responses = self.client.call([('eth_getTransactionReceipt', [tx_hash]) for tx_hash in hashes])
+        now = time.time()
+        resolved = {}
+
+        for tx_hash, (ok, receipt) in zip(hashes, responses):
+            if ok and receipt:
+                status = int(receipt.get('status') or '0x1', 16)
+                resolved[tx_hash] = {
+                    'status': 'mined' if status == 1 else 'reverted',
+                    'block_number': int(receipt['blockNumber'], 16) if receipt.get('blockNumber') else None,
+                    'latency': now - pending[tx_hash]
+                }
+            elif now - pending[tx_hash] > self.drop_timeout:
+                resolved[tx_hash] = {'status': 'dropped', 'block_number': None, 'latency': None}
+
+        with self._condition:
+            for tx_hash, result in resolved.items():
+                self._pending.pop(tx_hash, None)
+                self._results[tx_hash] = result
+            self._condition.notify_all()
+        return len(resolved)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON-RPC 批量请求工具
+功能：将多个RPC调用打包为一个JSON-RPC batch请求发送，失败时自动拆分重试
+"""
+
+import time
+import itertools
+import threading
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+import requests
+
+from concurrency import AdaptiveLimiter
+from profiling import stage
+from rpc_pool import RPCPool
+
+if TYPE_CHECKING:
+    from rpc_metrics import RPCMetrics
+
+
+class RPCBatchError(Exception):
+    """批量请求整体失败（HTTP错误、节点拒绝batch等）"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class RPCBatchClient:
+    def __init__(self, rpc_url: str, batch_size: int = 100, max_retries: int = 2, timeout: int = 15,
+                 limiter: Optional[AdaptiveLimiter] = None, pool: Optional[RPCPool] = None,
+                 metrics: Optional['RPCMetrics'] = None):
+        """
+        Args:
+            rpc_url: RPC节点地址（提供pool时仅作为备用）
+            batch_size: 单个batch包含的最大调用数
+            max_retries: 单个调用失败后的最大重试次数
+            timeout: HTTP请求超时（秒）
+            limiter: 可选的自适应并发控制器，用于限制同时在途的HTTP请求
+            pool: 可选的RPC端点池，每个batch按延迟加权选择端点
+            metrics: 可选的RPC指标记录器
+        """
+        self.rpc_url = rpc_url
+        self.metrics = metrics
+        self.limiter = limiter
+        self.pool = pool
+        self.batch_size = max(1, int(batch_size))
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.headers = {
+            'User-Agent': 'Irys-Checker/1.0',
+            'Content-Type': 'application/json'
+        }
+
+        # requests.Session 不是线程安全的，每个线程使用独立的会话
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def _next_id(self) -> int:
+        with self._id_lock:
+            return next(self._ids)
+
+    def _post(self, payload: List[dict]) -> List[dict]:
+        """发送一个batch请求，返回响应列表（节点拒绝时抛出RPCBatchError）"""
+        if self.limiter is None:
+            return self._post_once(payload)
+
+        with self.limiter.slot():
+            return self._post_once(payload)
+
+    def _post_once(self, payload: List[dict]) -> List[dict]:
+        if self.pool is None:
+            with stage('rpc'):
+                return self._post_to(self.rpc_url, payload)
+
+        endpoint = self.pool.pick()
+        start = time.monotonic()
+        try:
+            with stage('rpc'):
+                data = self._post_to(endpoint.url, payload)
+        except RPCBatchError as e:
+            self.pool.report(endpoint, time.monotonic() - start, e)
+            raise
+        self.pool.report(endpoint, time.monotonic() - start)
+        return data
+
+    def _post_to(self, url: str, payload: List[dict]) -> List[dict]:
+        if self.metrics is None:
+            return self._send(url, payload)
+
+        methods = {call['method'] for call in payload}
+        method = methods.pop() if len(methods) == 1 else 'batch'
+        start = time.monotonic()
+        try:
+            data = self._send(url, payload)
+        except RPCBatchError as e:
+            self.metrics.record_exception(url, method, time.monotonic() - start, e, calls=len(payload))
+            raise
+        errors = sum(1 for item in data if not isinstance(item, dict) or item.get('error') is not None)
+        self.metrics.record(url, method, time.monotonic() - start, calls=len(payload), errors=errors,
+                            error_kind='rpc')
+        return data
+
+    def _send(self, url: str, payload: List[dict]) -> List[dict]:
+        try:
+            response = self._session().post(url, json=payload, headers=self.headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise RPCBatchError(f"请求失败: {e}") from e
+
+        if response.status_code != 200:
+            raise RPCBatchError(f"HTTP {response.status_code}", status=response.status_code)
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise RPCBatchError("响应不是有效的JSON") from e
+
+        # 不支持batch的节点通常返回单个错误对象
+        if not isinstance(data, list):
+            message = data.get('error', {}).get('message', data) if isinstance(data, dict) else data
+            raise RPCBatchError(f"节点拒绝batch请求: {message}")
+
+        return data
+
+    def _call_chunk(self, calls: List[Tuple[str, list]]) -> List[Tuple[bool, Any]]:
+        """
+        执行一个batch，整体失败时对半拆分递归重试
+
+        Returns:
+            与calls一一对应的 (是否成功, 结果或错误信息) 列表
+        """
+        payload = []
+        for method, params in calls:
+            payload.append({'jsonrpc': '2.0', 'id': self._next_id(), 'method': method, 'params': params})
+
+        try:
+            responses = self._post(payload)
+        except RPCBatchError as e:
+            if len(calls) == 1:
+                return [(False, str(e))]
+            middle = len(calls) // 2
+            return self._call_chunk(calls[:middle]) + self._call_chunk(calls[middle:])
+
+        by_id = {item.get('id'): item for item in responses if isinstance(item, dict)}
+        results = []
+        for request in payload:
+            item = by_id.get(request['id'])
+            if item is None:
+                results.append((False, "响应中缺少该请求"))
+            elif item.get('error') is not None:
+                error = item['error']
+                results.append((False, error.get('message', str(error)) if isinstance(error, dict) else str(error)))
+            else:
+                results.append((True, item.get('result')))
+        return results
+
+    def call(self, calls: List[Tuple[str, list]]) -> List[Tuple[bool, Any]]:
+        """
+        批量执行RPC调用
+
+        Args:
+            calls: (方法名, 参数列表) 的列表
+
+        Returns:
+            与calls一一对应的 (是否成功, 结果或错误信息) 列表
+        """
+        results: List[Optional[Tuple[bool, Any]]] = [None] * len(calls)
+        pending = list(range(len(calls)))
+
+        for attempt in range(self.max_retries + 1):
+            if not pending:
+                break
+
+            failed = []
+            for start in range(0, len(pending), self.batch_size):
+                chunk = pending[start:start + self.batch_size]
+                chunk_results = self._call_chunk([calls[i] for i in chunk])
+                for i, result in zip(chunk, chunk_results):
+                    results[i] = result
+                    if not result[0]:
+                        failed.append(i)
+
+            # 只重试部分失败的调用
+            pending = failed
+
+        return results
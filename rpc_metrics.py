@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RPC调用指标
+功能：按端点和方法记录 JSON-RPC 调用次数、错误数（按类型）和请求耗时直方图；
+可通过 web3 中间件或批量请求客户端接入，支持导出 Prometheus 文本格式（可选的本地HTTP端点）
+以及按时间段汇总（每个操作结束时显示）
+"""
+
+import time
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from concurrency import classify_error
+
+# 请求耗时直方图的桶上界（秒），与 Prometheus 客户端的默认值相同
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Series:
+    """单个 (端点, 方法) 的累计数据"""
+
+    __slots__ = ('calls', 'errors', 'buckets', 'latency_sum', 'requests')
+
+    def __init__(self):
+        self.calls = 0  # RPC调用数（batch中的每个调用都计数）
+        self.errors: Dict[str, int] = {}  # 错误类型 -> 数量
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # 最后一个为 +Inf
+        self.latency_sum = 0.0
+        self.requests = 0  # HTTP请求数（一个batch计一次）
+
+    def copy(self) -> '_Series':
+        series = _Series()
+        series.calls = self.calls
+        series.errors = dict(self.errors)
+        series.buckets = list(self.buckets)
+        series.latency_sum = self.latency_sum
+        series.requests = self.requests
+        return series
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value)) if value != int(value) else f"{value:.1f}"
+
+
+class RPCMetrics:
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, method: str, latency: float, calls: int = 1, errors: int = 0,
+               error_kind: Optional[str] = None):
+        """
+        记录一次HTTP请求
+
+        Args:
+            endpoint: 端点URL
+            method: RPC方法名（batch中方法不同时为 'batch'）
+            latency: 请求耗时（秒）
+            calls: 请求中包含的RPC调用数
+            errors: 失败的调用数
+            error_kind: 错误类型（timeout / throttle / server / error / rpc）
+        """
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, latency)
+        with self._lock:
+            series = self._series.get((endpoint, method))
+            if series is None:
+                series = self._series[(endpoint, method)] = _Series()
+            series.calls += calls
+            series.requests += 1
+            series.latency_sum += latency
+            series.buckets[bucket] += 1
+            if errors:
+                kind = error_kind or 'error'
+                series.errors[kind] = series.errors.get(kind, 0) + errors
+
+    def record_exception(self, endpoint: str, method: str, latency: float, error: BaseException, calls: int = 1):
+        """记录一次整体失败的请求（所有调用都计为错误）"""
+        self.record(endpoint, method, latency, calls, calls, classify_error(error))
+
+    def snapshot(self) -> Dict[Tuple[str, str], _Series]:
+        """当前累计数据的副本，用于计算一段时间内的增量"""
+        with self._lock:
+            return {key: series.copy() for key, series in self._series.items()}
+
+    def summary(self, since: Optional[Dict[Tuple[str, str], _Series]] = None) -> List[Dict]:
+        """
+        汇总指标（可只统计 since 快照之后的增量）
+
+        Returns:
+            每个 (端点, 方法) 一项：endpoint / method / calls / errors / requests / avg / p50 / p90 / p99
+        """
+        since = since or {}
+        rows = []
+        for (endpoint, method), series in sorted(self.snapshot().items()):
+            base = since.get((endpoint, method))
+            if base is not None:
+                series.calls -= base.calls
+                series.requests -= base.requests
+                series.latency_sum -= base.latency_sum
+                series.buckets = [a - b for a, b in zip(series.buckets, base.buckets)]
+                series.errors = {kind: count - base.errors.get(kind, 0) for kind, count in series.errors.items()}
+            if series.requests <= 0:
+                continue
+            rows.append({
+                'endpoint': endpoint,
+                'method': method,
+                'calls': series.calls,
+                'errors': {kind: count for kind, count in series.errors.items() if count},
+                'requests': series.requests,
+                'avg': series.latency_sum / series.requests,
+                'p50': self._quantile(series.buckets, 0.5),
+                'p90': self._quantile(series.buckets, 0.9),
+                'p99': self._quantile(series.buckets, 0.99)
+            })
+        return rows
+
+    @staticmethod
+    def _quantile(buckets: List[int], q: float) -> Optional[float]:
+        """按直方图桶线性插值估算分位数（与 Prometheus 的 histogram_quantile 相同）"""
+        total = sum(buckets)
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(buckets):
+            if cumulative + count >= rank and count:
+                if i == len(LATENCY_BUCKETS):
+                    # 落在 +Inf 桶时只能返回最大的有限上界
+                    return LATENCY_BUCKETS[-1]
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return LATENCY_BUCKETS[-1]
+
+    def render_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式"""
+        snapshot = sorted(self.snapshot().items())
+        lines = [
+            '# HELP irys_rpc_calls_total JSON-RPC 调用次数（batch 中的每个调用分别计数）',
+            '# TYPE irys_rpc_calls_total counter'
+        ]
+        for (endpoint, method), series in snapshot:
+            labels = f'endpoint="{_escape_label(endpoint)}",method="{_escape_label(method)}"'
+            lines.append(f'irys_rpc_calls_total{{{labels}}} {series.calls}')
+
+        lines += [
+            '# HELP irys_rpc_errors_total 失败的 JSON-RPC 调用次数（按错误类型）',
+            '# TYPE irys_rpc_errors_total counter'
+        ]
+        for (endpoint, method), series in snapshot:
+            labels = f'endpoint="{_escape_label(endpoint)}",method="{_escape_label(method)}"'
+            for kind, count in sorted(series.errors.items()):
+                lines.append(f'irys_rpc_errors_total{{{labels},kind="{kind}"}} {count}')
+
+        lines += [
+            '# HELP irys_rpc_request_duration_seconds JSON-RPC HTTP 请求耗时（一个 batch 计一次）',
+            '# TYPE irys_rpc_request_duration_seconds histogram'
+        ]
+        for (endpoint, method), series in snapshot:
+            labels = f'endpoint="{_escape_label(endpoint)}",method="{_escape_label(method)}"'
+            cumulative = 0
+            for upper, count in zip(LATENCY_BUCKETS + (None,), series.buckets):
+                cumulative += count
+                le = '+Inf' if upper is None else _format_float(upper)
+                lines.append(f'irys_rpc_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'irys_rpc_request_duration_seconds_sum{{{labels}}} {series.latency_sum:.6f}')
+            lines.append(f'irys_rpc_request_duration_seconds_count{{{labels}}} {series.requests}')
+        return '\n'.join(lines) + '\n'
+
+    def middleware(self, endpoint: str):
+        """
+        生成记录指标的 web3 中间件
+
+        Args:
+            endpoint: 该 Web3 实例连接的端点URL
+        """
+        metrics = self
+
+        def metrics_middleware(make_request, w3):
+            def middleware(method, params):
+                start = time.monotonic()
+                try:
+                    response = make_request(method, params)
+                except Exception as e:
+                    metrics.record_exception(endpoint, method, time.monotonic() - start, e)
+                    raise
+                failed = isinstance(response, dict) and response.get('error') is not None
+                metrics.record(endpoint, method, time.monotonic() - start, errors=int(failed), error_kind='rpc')
+                return response
+            return middleware
+
+        return metrics_middleware
+
+    def async_middleware(self, endpoint: str):
+        """生成记录指标的 AsyncWeb3 中间件"""
+        metrics = self
+
+        async def metrics_middleware(make_request, w3):
+            async def middleware(method, params):
+                start = time.monotonic()
+                try:
+                    response = await make_request(method, params)
+                except Exception as e:
+                    metrics.record_exception(endpoint, method, time.monotonic() - start, e)
+                    raise
+                failed = isinstance(response, dict) and response.get('error') is not None
+                metrics.record(endpoint, method, time.monotonic() - start, errors=int(failed), error_kind='rpc')
+                return response
+            return middleware
+
+        return metrics_middleware
+
+    def start_http_server(self, port: int, host: str = '127.0.0.1'):
+        """
+        在后台线程中启动 Prometheus 抓取端点（GET /metrics）
+
+        Args:
+            port: 监听端口，0表示自动分配
+            host: 监听地址，默认只监听本机
+
+        Returns:
+            HTTP服务对象（server_address 为实际监听地址，shutdown() 停止服务）
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                data = metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='rpc-metrics', daemon=True).start()
+        return server
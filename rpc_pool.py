@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RPC端点池
+功能：对多个RPC端点进行健康检查（区块高度落后、chain_id、延迟），
+按延迟加权分配请求，自动剔除故障端点并在冷却后重新接入
+"""
+
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional
+
+import requests
+from web3 import Web3
+from web3.middleware import geth_poa_middleware
+
+from concurrency import classify_error
+
+if TYPE_CHECKING:
+    from rpc_metrics import RPCMetrics
+
+
+class RPCEndpoint:
+    def __init__(self, url: str, w3: Web3):
+        self.url = url
+        self.w3 = w3
+        self.healthy = False
+        self.latency: Optional[float] = None  # 延迟的指数移动平均（秒）
+        self.block_number: Optional[int] = None
+        self.chain_id: Optional[int] = None
+        self.failures = 0  # 连续失败次数
+        self.ejected_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def record_latency(self, latency: float, alpha: float = 0.2):
+        """更新延迟的指数移动平均"""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = alpha * latency + (1 - alpha) * self.latency
+
+
+class RPCPool:
+    def __init__(self, urls: List[str], chain_id: int, request_kwargs: Optional[dict] = None,
+                 max_block_lag: int = 5, failure_threshold: int = 3, cooldown: float = 30,
+                 recheck_interval: float = 60, metrics: Optional['RPCMetrics'] = None):
+        """
+        Args:
+            urls: RPC端点列表
+            chain_id: 期望的链ID
+            request_kwargs: 传给HTTPProvider的请求参数
+            max_block_lag: 允许落后最高区块的最大区块数
+            failure_threshold: 连续失败多少次后剔除端点
+            cooldown: 剔除后多久重新检查（秒）
+            recheck_interval: 定期全量健康检查的间隔（秒）
+            metrics: 可选的RPC指标记录器，每个端点的 Web3 实例都会记录调用指标
+        """
+        self.chain_id = chain_id
+        self.request_kwargs = request_kwargs or {}
+        self.max_block_lag = max_block_lag
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.recheck_interval = recheck_interval
+        self.metrics = metrics
+
+        self.endpoints = [RPCEndpoint(url, self._make_web3(url)) for url in urls]
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._checking = False
+
+    def _make_web3(self, url: str) -> Web3:
+        provider = Web3.HTTPProvider(url, request_kwargs=self.request_kwargs)
+        w3 = Web3(provider)
+        # 添加PoA中间件（如果需要）
+        w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        if self.metrics is not None:
+            # 放在最内层，计时只包含HTTP请求本身
+            w3.middleware_onion.inject(self.metrics.middleware(url), name='rpc_metrics', layer=0)
+        return w3
+
+    @staticmethod
+    def _timed_block_number(endpoint: RPCEndpoint):
+        start = time.monotonic()
+        block_number = endpoint.w3.eth.block_number
+        return block_number, time.monotonic() - start
+
+    def _probe(self, endpoint: RPCEndpoint, block_future, chain_future):
+        """汇总单个端点的区块高度、chain_id和延迟探测结果"""
+        try:
+            block_number, latency = block_future.result()
+            chain_id = chain_future.result()
+        except Exception as e:
+            with self._lock:
+                endpoint.block_number = None
+                endpoint.last_error = str(e)
+            return
+
+        # 后台检查与 pick() / report() 并发，端点状态只在锁内修改
+        with self._lock:
+            endpoint.record_latency(latency)
+            endpoint.block_number = block_number
+            endpoint.chain_id = chain_id
+            endpoint.last_error = None
+
+    def health_check(self, endpoints: Optional[List[RPCEndpoint]] = None) -> List[RPCEndpoint]:
+        """
+        并发检查端点健康状态
+
+        Args:
+            endpoints: 要检查的端点，默认检查全部
+
+        Returns:
+            健康的端点列表
+        """
+        endpoints = endpoints if endpoints is not None else self.endpoints
+        # 每个端点的区块高度和chain_id同时查询，检查耗时约为一次往返
+        with ThreadPoolExecutor(max_workers=max(1, 2 * len(endpoints))) as executor:
+            probes = [
+                (endpoint,
+                 executor.submit(self._timed_block_number, endpoint),
+                 executor.submit(lambda w3: w3.eth.chain_id, endpoint.w3))
+                for endpoint in endpoints
+            ]
+            for endpoint, block_future, chain_future in probes:
+                self._probe(endpoint, block_future, chain_future)
+
+        with self._lock:
+            heights = [e.block_number for e in self.endpoints if e.block_number is not None]
+            best_height = max(heights) if heights else None
+
+            for endpoint in endpoints:
+                if endpoint.block_number is None:
+                    self._eject(endpoint)
+                elif endpoint.chain_id != self.chain_id:
+                    endpoint.last_error = f"Chain ID不匹配: 期望 {self.chain_id}, 实际 {endpoint.chain_id}"
+                    self._eject(endpoint)
+                elif best_height - endpoint.block_number > self.max_block_lag:
+                    endpoint.last_error = f"区块落后 {best_height - endpoint.block_number} 个"
+                    self._eject(endpoint)
+                else:
+                    endpoint.healthy = True
+                    endpoint.failures = 0
+
+            self._last_check = time.monotonic()
+            return [e for e in self.endpoints if e.healthy]
+
+    def _eject(self, endpoint: RPCEndpoint):
+        endpoint.healthy = False
+        endpoint.ejected_until = time.monotonic() + self.cooldown
+
+    def _background_check(self, endpoints: Optional[List[RPCEndpoint]] = None):
+        """在后台线程中执行健康检查，同一时间只运行一个"""
+        with self._lock:
+            if self._checking:
+                return
+            self._checking = True
+
+        def run():
+            try:
+                self.health_check(endpoints)
+            finally:
+                with self._lock:
+                    self._checking = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def healthy_endpoints(self) -> List[RPCEndpoint]:
+        with self._lock:
+            return [e for e in self.endpoints if e.healthy]
+
+    def primary(self) -> Optional[RPCEndpoint]:
+        """延迟最低的健康端点"""
+        healthy = self.healthy_endpoints()
+        if not healthy:
+            return None
+        return min(healthy, key=lambda e: e.latency if e.latency is not None else float('inf'))
+
+    def pick(self) -> RPCEndpoint:
+        """按延迟倒数加权随机选择一个健康端点"""
+        now = time.monotonic()
+        with self._lock:
+            recover = [e for e in self.endpoints if not e.healthy and e.ejected_until <= now]
+            recheck = now - self._last_check > self.recheck_interval
+            healthy = [e for e in self.endpoints if e.healthy]
+            if healthy:
+                weights = [1 / max(e.latency or 0.001, 0.001) for e in healthy]
+            else:
+                # 没有健康端点时退而求其次，使用最早结束冷却的端点
+                fallback = min(self.endpoints, key=lambda e: e.ejected_until)
+
+        # 冷却结束的端点和定期全量检查都放到后台，不阻塞请求
+        if recover:
+            self._background_check(recover)
+        elif recheck:
+            self._background_check()
+
+        if not healthy:
+            return fallback
+        return random.choices(healthy, weights=weights)[0]
+
+    def report(self, endpoint: RPCEndpoint, latency: float, error: Optional[BaseException] = None):
+        """
+        上报一次请求结果
+
+        Args:
+            endpoint: 处理请求的端点
+            latency: 请求耗时（秒）
+            error: 请求异常，成功时为None
+        """
+        with self._lock:
+            if error is None:
+                endpoint.record_latency(latency)
+                endpoint.failures = 0
+                return
+
+            # 业务错误（如nonce过低）不算端点故障
+            connection_error = isinstance(error, requests.ConnectionError) or \
+                isinstance(error.__cause__, requests.ConnectionError)
+            if classify_error(error) == 'error' and not connection_error:
+                return
+
+            endpoint.failures += 1
+            endpoint.last_error = str(error)
+            if endpoint.healthy and endpoint.failures >= self.failure_threshold:
+                self._eject(endpoint)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""测试共用的 fixture：本地模拟节点和连接到它的 IrysChecker"""
+
+import pytest
+
+from benchmarks.mock_rpc import MockRPCServer
+from irys_checker import IrysChecker
+
+
+@pytest.fixture
+def mock_node():
+    server = MockRPCServer().start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+@pytest.fixture
+def checker(mock_node, tmp_path, monkeypatch):
+    """连接到模拟节点的非交互 checker，缓存和任务日志写在临时目录"""
+    monkeypatch.chdir(tmp_path)
+    return IrysChecker(rpc_urls=[mock_node.url], interactive=False)
+
+
+def write_wallet_csv(path, count: int, start: int = 1) -> list:
+    """写入 count 个私钥与地址对应的钱包，返回 (地址, 私钥) 列表"""
+    from eth_account import Account
+
+    wallets = []
+    for i in range(start, start + count):
+        private_key = '0x' + format(i, '064x')
+        wallets.append((Account.from_key(private_key).address, private_key))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('index,address,privateKey\n')
+        for i, (address, private_key) in enumerate(wallets, start):
+            f.write(f'{i},{address},{private_key}\n')
+    return wallets
+
+
+@pytest.fixture
+def wallet_csv(tmp_path):
+    path = tmp_path / 'wallets.csv'
+    write_wallet_csv(path, 5)
+    return str(path)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+余额缓存：按时间和区块判断过期，checker 上修改的有效期在下一次查询时生效
+"""
+
+import os
+
+import pytest
+
+import balance_cache
+from balance_cache import BalanceCache
+
+ADDRESS = '0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(balance_cache.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = BalanceCache(str(tmp_path / 'balances.sqlite3'), ttl=60)
+    yield cache
+    cache.close()
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put_many([(ADDRESS, 123, 100)])
+
+    clock[0] += 60
+    assert cache.get_many([ADDRESS]) == {ADDRESS.lower(): (123, 100)}
+    clock[0] += 1
+    assert cache.get_many([ADDRESS]) == {}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.ttl = None
+    assert cache.get_many([ADDRESS.lower()]) == {ADDRESS.lower(): (123, 100)}
+
+
+def test_entries_expire_by_block_age(cache, clock):
+    cache.ttl = None
+    cache.max_block_age = 5
+    cache.put_many([(ADDRESS, 123, 100)])
+
+    assert ADDRESS.lower() in cache.get_many([ADDRESS], current_block=105)
+    assert cache.get_many([ADDRESS], current_block=106) == {}
+    # 不知道当前区块时无法判断，按过期处理
+    assert cache.get_many([ADDRESS]) == {}
+
+
+def test_checker_policy_applies_to_existing_cache(checker, wallet_csv):
+    assert checker.load_wallets_from_csv(wallet_csv)
+
+    checker.check_all_balances()
+    assert checker.last_scan_stats['cache_misses'] == 5
+    checker.check_all_balances()
+    assert checker.last_scan_stats['cache_hits'] == 5
+
+    # 缓存已经创建，修改有效期后下一次查询立即按新设置判断
+    checker.cache_ttl = 0
+    checker.check_all_balances()
+    assert checker.last_scan_stats['cache_hits'] == 0
+
+
+def test_disabled_cache(checker, wallet_csv):
+    assert checker.load_wallets_from_csv(wallet_csv)
+    checker.balance_cache = None
+
+    checker.check_all_balances()
+    assert checker.balance_cache is None
+    assert 'cache_hits' not in checker.last_scan_stats
+    assert not os.path.exists(checker.cache_path)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行退出码：成功、部分失败、参数错误、连接失败和未预期的错误互不混淆，错误以JSON输出到 stdout
+"""
+
+import json
+import socket
+
+import pytest
+
+import cli
+from benchmarks.mock_rpc import MockRPCServer
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def run(capsys, *argv):
+    code = cli.main(list(argv))
+    lines = capsys.readouterr().out.strip().splitlines()
+    return code, json.loads(lines[-1]) if lines else None
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_scan_ok(capsys, mock_node, wallet_csv):
+    code, output = run(capsys, 'scan', wallet_csv, '--rpc', mock_node.url, '--output', 'balances.json')
+    assert code == cli.EXIT_OK
+    assert output['exit_code'] == cli.EXIT_OK
+    assert output['output'] == 'balances.json'
+
+
+def test_scan_partial(capsys, wallet_csv):
+    server = MockRPCServer(error_rate=1.0).start()
+    try:
+        code, output = run(capsys, 'scan', wallet_csv, '--rpc', server.url, '--mode', 'thread', '--no-cache',
+                           '--output', 'balances.json')
+    finally:
+        server.stop()
+    assert code == cli.EXIT_PARTIAL
+    assert output['exit_code'] == cli.EXIT_PARTIAL
+
+
+@pytest.mark.parametrize('argv', [
+    ['scan', 'missing.csv'],
+    ['sweep', '{csv}', '--to', '0x' + '11' * 20],
+    ['scan', '{csv}', '--cache-ttl', '-1'],
+])
+def test_usage_errors(capsys, mock_node, wallet_csv, argv):
+    argv = [arg.format(csv=wallet_csv) for arg in argv] + ['--rpc', mock_node.url]
+    code, output = run(capsys, *argv)
+    assert code == cli.EXIT_USAGE
+    assert output['exit_code'] == cli.EXIT_USAGE
+    assert output['error']
+
+
+def test_connection_error(capsys, wallet_csv):
+    code, output = run(capsys, 'scan', wallet_csv, '--rpc', f'http://127.0.0.1:{unused_port()}')
+    assert code == cli.EXIT_CONNECTION
+    assert output['exit_code'] == cli.EXIT_CONNECTION
+
+
+def test_unexpected_error(capsys, mock_node, wallet_csv, monkeypatch):
+    def broken(checker, args, stdout):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(cli.COMMANDS, 'scan', broken)
+    code, output = run(capsys, 'scan', wallet_csv, '--rpc', mock_node.url)
+    assert code == cli.EXIT_ERROR
+    assert output == {'error': 'RuntimeError: boom', 'exit_code': cli.EXIT_ERROR}
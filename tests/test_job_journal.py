@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务日志：中断后恢复已完成的结果，转账日志只核对已签名/已发送的交易，完成后删除
+"""
+
+import os
+import time
+import types
+
+from web3.exceptions import TransactionNotFound
+
+from job_journal import JobJournal
+
+
+def test_resume_after_interruption(tmp_path):
+    journal = JobJournal.open(str(tmp_path), 'scan', 'abc', {'mode': 'latest'})
+    journal.record_balance('0xABC', 5)
+    journal.record_transaction('k', 'signed', hash='0x1', raw='0x2')
+    journal.record_transaction('k', 'sent')
+    journal.close()
+    # 中断时最后一行可能只写了一半
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "bal')
+
+    resumed = JobJournal.open(str(tmp_path), 'scan', 'abc')
+    assert resumed.resumed
+    assert resumed.header['params'] == {'mode': 'latest'}
+    assert resumed.balances == {'0xabc': 5}
+    assert resumed.transactions['k']['state'] == 'sent'
+    assert resumed.transactions['k']['raw'] == '0x2'
+    resumed.complete()
+
+    # 已完成的任务重新开始
+    assert not JobJournal.open(str(tmp_path), 'scan', 'abc').resumed
+
+
+def test_stale_latest_scan_journal_is_not_resumed(checker, wallet_csv):
+    assert checker.load_wallets_from_csv(wallet_csv)
+    journal = checker._open_scan_journal(False, None)
+    journal.record_balance(checker.wallets[0].address_key, 1)
+    journal.close()
+
+    resumed = checker._open_scan_journal(False, None)
+    assert resumed.resumed
+    resumed.close()
+
+    # 超过缓存有效期的非快照日志作废，快照日志不受影响
+    checker.cache_ttl = 60
+    with open(resumed.path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "job", "kind": "scan", "started_at": %f}\n' % (time.time() - 61))
+    fresh = checker._open_scan_journal(False, None)
+    assert not fresh.resumed
+    assert fresh.balances == {}
+    fresh.close()
+
+
+class ReconcileNode:
+    """mined 的交易有回执；重新广播时 pool 中的交易返回 already known，其他返回 nonce too low"""
+
+    def __init__(self, mined, in_pool):
+        self.mined = set(mined)
+        self.in_pool = set(in_pool)
+        self.broadcasts = []
+        self.eth = types.SimpleNamespace(get_transaction_receipt=self.get_transaction_receipt,
+                                         send_raw_transaction=self.send_raw_transaction)
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.mined:
+            raise TransactionNotFound(tx_hash)
+        return {'transactionHash': tx_hash, 'status': 1}
+
+    def send_raw_transaction(self, raw):
+        self.broadcasts.append(raw)
+        if raw in self.in_pool:
+            raise ValueError({'code': -32000, 'message': 'already known'})
+        raise ValueError({'code': -32000, 'message': 'nonce too low'})
+
+
+def test_reconcile_only_signed_and_sent(checker, tmp_path):
+    journal = JobJournal.open(str(tmp_path), 'sweep', 'abc')
+    entries = {
+        'done': ('confirmed', 'h0'),
+        'mined': ('signed', 'h1'),
+        'pooled': ('sent', 'h2'),
+        'lost': ('sent', 'h3'),
+        'failed': ('failed', 'h4'),
+    }
+    for key, (state, tx_hash) in entries.items():
+        journal.record_transaction(key, state, **{'from': '0x' + '11' * 20}, hash=tx_hash, raw='raw-' + tx_hash)
+
+    node = ReconcileNode(mined={'h1', 'h4'}, in_pool={'raw-h2', 'raw-h4'})
+    checker._call_rpc = lambda func: func(node)
+    tracked = []
+    tracker = types.SimpleNamespace(track=tracked.append)
+
+    finished = checker._reconcile_journal(journal, tracker)
+
+    assert finished == {'done', 'mined', 'pooled'}
+    assert tracked == ['h2']
+    assert sorted(node.broadcasts) == ['raw-h2', 'raw-h3']
+    assert journal.transactions['mined']['state'] == 'confirmed'
+    # 失败的工作项既不核对也不重新广播，重新运行时重新处理
+    assert journal.transactions['failed']['state'] == 'failed'
+    journal.close()
+
+
+def test_transfer_journal_removed_on_completion(checker, tmp_path):
+    journal = JobJournal.open(str(tmp_path), 'disperse', 'abc')
+    journal.record_transaction('0', 'sent', hash='h', raw='raw')
+    checker._finish_transfer_journal(journal, has_failures=True)
+    assert os.path.exists(journal.path)
+
+    journal = JobJournal.open(str(tmp_path), 'disperse', 'abc')
+    assert journal.resumed
+    checker._finish_transfer_journal(journal, has_failures=False)
+    assert not os.path.exists(journal.path)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地nonce分配：already known 后下一笔交易使用紧接着的nonce；underpriced 不重新同步、不重试
+"""
+
+import types
+from decimal import Decimal
+
+import pytest
+
+from concurrency import RateLimiter
+from nonce_manager import classify_nonce_error
+
+SENDER_KEY = '0x' + '11' * 32
+RECEIVER = '0x000000000000000000000000000000000000dEaD'
+FEES = {'maxFeePerGas': 2 * 10 ** 9, 'maxPriorityFeePerGas': 10 ** 9}
+
+
+class FakeNode:
+    """记录每个地址的 pending nonce；第一笔交易被接受但回复丢失，重发时返回 already known"""
+
+    def __init__(self):
+        self.pending = 0
+        self.signed_nonces = []
+        self.sends = 0
+        self.eth = types.SimpleNamespace(get_transaction_count=self.get_transaction_count,
+                                         send_raw_transaction=self.send_raw_transaction)
+
+    def get_transaction_count(self, address, block_identifier):
+        return self.pending
+
+    def send_raw_transaction(self, raw):
+        self.sends += 1
+        nonce = self.signed_nonces[-1]
+        if nonce != self.pending:
+            raise ValueError({'code': -32000, 'message': f'nonce gap: got {nonce}, pending {self.pending}'})
+        self.pending += 1
+        if self.sends == 1:
+            raise ValueError({'code': -32000, 'message': 'already known'})
+        return bytes.fromhex('ab' * 32)
+
+
+def test_already_known_keeps_next_nonce(checker):
+    checker.tx_rate_limiter = RateLimiter(rate=None)
+    node = FakeNode()
+    checker._call_rpc = lambda func: func(node)
+
+    def on_signed(from_address, transaction, signed_txn):
+        node.signed_nonces.append(transaction['nonce'])
+
+    sender = checker.w3.eth.account.from_key(SENDER_KEY).address
+    for _ in range(3):
+        checker._submit_transaction(sender, SENDER_KEY, RECEIVER, Decimal('0.001'), FEES, on_signed=on_signed)
+
+    assert node.signed_nonces == [0, 1, 2]
+    assert node.pending == 3
+
+
+def test_classify_nonce_error():
+    assert classify_nonce_error(ValueError({'message': 'already known'})) == 'known'
+    assert classify_nonce_error(ValueError({'message': 'nonce too low'})) == 'too_low'
+    assert classify_nonce_error(ValueError({'message': 'replacement transaction underpriced'})) == 'underpriced'
+    assert classify_nonce_error(ValueError({'message': 'insufficient funds for gas * price + value'})) is None
+
+
+def test_underpriced_is_not_retried(checker):
+    checker.tx_rate_limiter = RateLimiter(rate=None)
+    fetches = []
+    sends = []
+
+    def get_transaction_count(address, block_identifier):
+        fetches.append(address)
+        return 5
+
+    def send_raw_transaction(raw):
+        sends.append(raw)
+        raise ValueError({'code': -32000, 'message': 'replacement transaction underpriced'})
+
+    node = types.SimpleNamespace(eth=types.SimpleNamespace(get_transaction_count=get_transaction_count,
+                                                           send_raw_transaction=send_raw_transaction))
+    checker._call_rpc = lambda func: func(node)
+
+    sender = checker.w3.eth.account.from_key(SENDER_KEY).address
+    with pytest.raises(RuntimeError, match='nonce 5'):
+        checker._submit_transaction(sender, SENDER_KEY, RECEIVER, Decimal('0.001'), FEES)
+
+    # 不重新同步、不换nonce重发；本地记录作废，下一笔交易重新从节点获取
+    assert len(sends) == 1
+    assert len(fetches) == 1
+    assert checker.nonce_manager.next_nonce(sender) == 5
+    assert len(fetches) == 2
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON-RPC 批量请求：batch 整体失败时对半拆分，单个调用失败时只重试失败的部分
+"""
+
+from rpc_batch import RPCBatchClient, RPCBatchError
+
+
+class ScriptedClient(RPCBatchClient):
+    """不发送HTTP请求，由 respond(payload) 生成节点的响应"""
+
+    def __init__(self, respond, **kwargs):
+        super().__init__('http://127.0.0.1:0', **kwargs)
+        self.respond = respond
+        self.batches = []
+
+    def _send(self, url, payload):
+        self.batches.append([call['params'][0] for call in payload])
+        return self.respond(payload)
+
+
+def echo(call):
+    return {'jsonrpc': '2.0', 'id': call['id'], 'result': call['params'][0]}
+
+
+def test_rejected_batch_is_bisected():
+    def respond(payload):
+        if len(payload) > 2:
+            raise RPCBatchError('HTTP 413', status=413)
+        return [echo(call) for call in reversed(payload)]
+
+    client = ScriptedClient(respond, batch_size=8)
+    results = client.call([('eth_getBalance', [i]) for i in range(8)])
+
+    # 结果按请求顺序返回，与响应中的顺序无关
+    assert results == [(True, i) for i in range(8)]
+    assert client.batches == [list(range(8)), [0, 1, 2, 3], [0, 1], [2, 3], [4, 5, 6, 7], [4, 5], [6, 7]]
+
+
+def test_single_call_failure_is_reported():
+    def respond(payload):
+        raise RPCBatchError('HTTP 500', status=500)
+
+    client = ScriptedClient(respond, batch_size=4, max_retries=0)
+    assert client.call([('eth_getBalance', [0]), ('eth_getBalance', [1])]) == [(False, 'HTTP 500'), (False, 'HTTP 500')]
+
+
+def test_only_failed_calls_are_retried():
+    failures = {1: 1, 3: 5}  # 参数 -> 剩余失败次数
+
+    def respond(payload):
+        responses = []
+        for call in payload:
+            value = call['params'][0]
+            if failures.get(value, 0) > 0:
+                failures[value] -= 1
+                responses.append({'jsonrpc': '2.0', 'id': call['id'], 'error': {'code': -32000, 'message': 'busy'}})
+            elif value == 2 and len(client.batches) == 1:
+                # 第一次请求中缺少该调用的响应
+                continue
+            else:
+                responses.append(echo(call))
+        return responses
+
+    client = ScriptedClient(respond, batch_size=10, max_retries=2)
+    results = client.call([('eth_getBalance', [i]) for i in range(5)])
+
+    assert results == [(True, 0), (True, 1), (True, 2), (False, 'busy'), (True, 4)]
+    assert client.batches == [[0, 1, 2, 3, 4], [1, 2, 3], [3]]
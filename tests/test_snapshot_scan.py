@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+区块快照查询：所有余额在同一区块查询，结果按 (地址, 区块) 缓存且不会过期
+"""
+
+from benchmarks.mock_rpc import balance_of
+
+
+def record_balance_blocks(node, monkeypatch) -> list:
+    """记录模拟节点收到的每个 eth_getBalance 调用的区块参数"""
+    blocks = []
+    handle_call = node.handle_call
+
+    def recording(call):
+        if call.get('method') == 'eth_getBalance':
+            blocks.append(call['params'][1])
+        return handle_call(call)
+
+    monkeypatch.setattr(node, 'handle_call', recording)
+    return blocks
+
+
+def test_snapshot_pins_every_balance_to_one_block(checker, mock_node, wallet_csv, monkeypatch):
+    assert checker.load_wallets_from_csv(wallet_csv)
+    blocks = record_balance_blocks(mock_node, monkeypatch)
+
+    checker.check_all_balances(snapshot=True)
+
+    assert checker.last_scan_block == 1000
+    assert blocks == [hex(1000)] * 5
+    for wallet in checker.wallets:
+        assert wallet['block_number'] == 1000
+        assert checker.wallets.balance_wei(wallet.row) == balance_of(wallet['address'])
+
+
+def test_snapshot_results_do_not_expire(checker, mock_node, wallet_csv, monkeypatch):
+    assert checker.load_wallets_from_csv(wallet_csv)
+    checker.check_all_balances(snapshot=True)
+
+    # 链继续出块、时间有效期为0，固定区块的结果仍然直接使用缓存
+    mock_node.block_number += 50
+    checker.cache_ttl = 0
+    blocks = record_balance_blocks(mock_node, monkeypatch)
+    checker.check_all_balances(block_number=1000)
+
+    assert blocks == []
+    assert checker.last_scan_stats['cache_hits'] == 5
+    assert checker.last_scan_block == 1000
+
+    checker.check_all_balances(snapshot=True)
+    assert checker.last_scan_block == 1050
+    assert blocks == [hex(1050)] * 5
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+钱包CSV的向量化校验：无效行提示的内容和行号与逐行校验时一致
+"""
+
+import pandas as pd
+
+from wallet_loader import find_column_mapping, iter_wallet_chunks, validate_wallet_frame
+
+KEY = '0x' + '11' * 32
+CHECKSUM = '0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed'
+BAD_CHECKSUM = '0x5AAeb6053F3E94C9b9A09f33669435E7Ef1BeAed'
+LOWER = CHECKSUM.lower()
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['序号', '地址', '私钥'])
+
+
+def test_find_column_mapping():
+    assert find_column_mapping(['序号', '地址', '私钥']) == ({'index': '序号', 'address': '地址', 'privateKey': '私钥'}, None)
+    assert find_column_mapping(['id', 'address'])[1] == 'privateKey'
+
+
+def test_issue_messages():
+    df = frame([
+        [1, CHECKSUM, KEY],
+        [2, '', KEY],
+        ['abc', LOWER, KEY],
+        [4, '0x' + 'g' * 40, KEY],
+        [5, '0x1234', KEY],
+        [6, LOWER, '0x1234'],
+        [7.0, LOWER.upper().replace('0X', '0x'), KEY],
+    ])
+    mapping, _ = find_column_mapping(df.columns)
+    wallets, issues = validate_wallet_frame(df, mapping, row_offset=10)
+
+    assert issues == [
+        "跳过空行 12",
+        "处理行13时出错: could not convert string to float: 'abc'",
+        f"地址格式不正确 (行14): 0x{'g' * 40}",
+        "地址格式不正确 (行15): 0x1234",
+        "私钥格式可能不正确 (行16): 0x1234...",
+    ]
+    assert [wallet['index'] for wallet in wallets] == [1, 7]
+    assert wallets[0]['private_key'] == KEY
+
+
+def test_lenient_address_check():
+    df = frame([[1, BAD_CHECKSUM, KEY], [2, LOWER[2:], KEY]])
+    mapping, _ = find_column_mapping(df.columns)
+    wallets, issues = validate_wallet_frame(df, mapping, strict_address=False)
+
+    # 只检查0x前缀和40位十六进制
+    assert len(wallets) == 1
+    assert issues == [f"地址格式可能不正确 (行2): {LOWER[2:]}"]
+
+
+def test_chunk_row_numbers_continue_across_chunks(tmp_path):
+    path = tmp_path / 'wallets.csv'
+    lines = ['index,address,privateKey']
+    for i in range(1, 8):
+        lines.append(f"{i},{LOWER if i != 6 else '0xbad'},{KEY}")
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    chunks = list(iter_wallet_chunks(str(path), chunksize=3))
+
+    assert [len(wallets) for wallets, _ in chunks] == [3, 2, 1]
+    assert [issues for _, issues in chunks] == [[], ["地址格式不正确 (行6): 0xbad"], []]
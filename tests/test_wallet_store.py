@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式钱包存储：按行访问与钱包字典用法相同，字段写入后原样读出
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from wallet_store import WalletStore
+
+KEY = '0x' + '11' * 32
+ADDRESS = '0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed'
+
+
+def wallet(index, address=ADDRESS, **fields):
+    return {'index': index, 'address': address, 'private_key': KEY, **fields}
+
+
+def test_round_trip():
+    store = WalletStore.from_wallets([
+        wallet(1, balance=Decimal('1.5'), source_file='a.csv'),
+        wallet(2, address=ADDRESS.lower(), note='extra'),
+    ])
+
+    first, second = store
+    assert dict(first) == {'index': 1, 'address': ADDRESS, 'private_key': KEY, 'balance': Decimal('1.5'),
+                           'source_file': 'a.csv', 'block_number': None}
+    assert second['balance'] is None
+    assert second['note'] == 'extra'
+    with pytest.raises(KeyError):
+        second['source_file']
+
+
+def test_balances_keep_full_precision():
+    store = WalletStore.from_wallets([wallet(1), wallet(2)])
+    huge = 2 ** 130 + 7
+
+    store.set_balance_wei(0, 123456789012345678)
+    store.set_balance_wei(1, huge)
+    assert store[0]['balance'] == Decimal('0.123456789012345678')
+    assert store.balance_wei(1) == huge
+
+    store[1]['balance'] = None
+    assert store.balance_wei(1) is None
+
+
+def test_extend_remaps_sources():
+    first = WalletStore.from_wallets([wallet(1, source_file='a.csv')])
+    second = WalletStore.from_wallets([wallet(2, source_file='b.csv'), wallet(3, source_file='a.csv')])
+
+    first.extend(second)
+    assert [w['source_file'] for w in first] == ['a.csv', 'b.csv', 'a.csv']
+    assert [w['index'] for w in first[1:]] == [2, 3]
+    assert first[-1]['index'] == 3
+
+
+def test_duplicate_addresses_are_queried_once():
+    other = '0x' + 'ab' * 20
+    store = WalletStore.from_wallets([wallet(1), wallet(2, address=other), wallet(3, address=ADDRESS.lower()),
+                                      wallet(4, address=other), wallet(5, address=ADDRESS.upper().replace('0X', '0x'))])
+
+    assert store.duplicate_count == 3
+    assert store.duplicate_address_count == 2
+    rows = store.unique_rows(range(len(store)))
+    assert rows == [0, 1]
+
+    store.set_balance_wei(0, 10)
+    store.set_balance_wei(1, 20)
+    store.fan_out_balances(rows)
+    assert [store.balance_wei(row) for row in range(len(store))] == [10, 20, 10, 20, 10]
+
+
+def test_address_index_follows_changes():
+    store = WalletStore.from_wallets([wallet(1), wallet(2, address='0x' + 'ab' * 20)])
+    assert store.duplicate_count == 0
+
+    store[1]['address'] = ADDRESS.lower()
+    assert store.unique_rows([1, 0]) == [0]
+    store.append(wallet(3, address='0x' + 'cd' * 20))
+    assert store.duplicate_count == 1
+
+
+def test_checksum_masks_match_eip55():
+    from eth_utils import to_checksum_address
+    from wallet_store import normalize_address
+
+    addresses = ['0x' + format(i * 0x9e3779b97f4a7c15, '040x')[-40:] for i in range(1, 50)]
+    store = WalletStore.from_wallets([wallet(i, address=address) for i, address in enumerate(addresses)])
+
+    for row, address in enumerate(addresses):
+        expected = to_checksum_address(address)
+        assert store[row]['address'] == expected
+        assert store[row].checksum_address == expected
+        assert store[row].address_key == address
+        assert normalize_address(address.upper().replace('0X', '0x')) == expected
+
+
+def test_address_change_updates_mask():
+    store = WalletStore.from_wallets([wallet(1, address='0x' + 'ab' * 20)])
+    store[0]['address'] = ADDRESS.lower()
+    assert store[0]['address'] == ADDRESS
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+钱包CSV解析与校验
+功能：识别列名映射，按列向量化校验地址/私钥格式，生成列式钱包存储和无效行报告
+"""
+
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from web3 import Web3
+
+from profiling import stage
+from wallet_store import WalletStore
+
+
+# 必要的列（支持不同的列名格式）
+POSSIBLE_COLUMNS = {
+    'index': ['index', 'id', 'no', 'num', '序号', '编号'],
+    'address': ['address', 'addr', 'wallet', 'publickey', 'public_key', '地址', '钱包地址'],
+    'privateKey': ['privateKey', 'private_key', 'privkey', 'key', 'secret', '私钥']
+}
+
+# 与 eth_utils.is_hex_address 相同的格式：可选0x/0X前缀 + 40位十六进制
+HEX_ADDRESS_PATTERN = r'(?:0[xX])?[0-9a-fA-F]{40}'
+# 私钥：0x前缀 + 64位十六进制
+PRIVATE_KEY_PATTERN = r'0x[0-9a-fA-F]{64}'
+
+
+def find_column_mapping(columns) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    根据列名识别 index/address/privateKey 列
+
+    Args:
+        columns: DataFrame的列名
+
+    Returns:
+        (列映射, 缺失的必要列名)，全部找到时缺失项为None
+    """
+    column_mapping = {}
+    for required, possible in POSSIBLE_COLUMNS.items():
+        lowered = [p.lower() for p in possible]
+        for col in columns:
+            if str(col).lower().strip() in lowered:
+                column_mapping[required] = col
+                break
+        else:
+            return column_mapping, required
+    return column_mapping, None
+
+
+def detect_encoding(file_path: str, sample_size: int = 1024 * 1024) -> str:
+    """
+    根据文件开头的样本判断编码（依次尝试 utf-8、gbk，最后退回 latin-1）
+
+    Args:
+        file_path: 文件路径
+        sample_size: 读取的样本字节数
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    for encoding in ('utf-8', 'gbk'):
+        try:
+            sample.decode(encoding)
+            return encoding
+        except UnicodeDecodeError as e:
+            # 样本末尾可能截断了一个多字节字符
+            if e.start >= len(sample) - 4:
+                return encoding
+    return 'latin-1'
+
+
+def _address_body(addresses: pd.Series) -> pd.Series:
+    """去掉0x/0X前缀后的地址部分"""
+    prefixed = addresses.str.startswith('0x') | addresses.str.startswith('0X')
+    return addresses.str.slice(2).where(prefixed, addresses)
+
+
+def _strict_address_mask(addresses: pd.Series, body: pd.Series) -> pd.Series:
+    """向量化实现 Web3.is_address：先用正则筛出十六进制地址格式"""
+    valid = addresses.str.fullmatch(HEX_ADDRESS_PATTERN).fillna(False).astype(bool)
+
+    # 大小写混合的地址是否校验checksum取决于 eth_utils 版本，这部分逐个交给 Web3.is_address 判断
+    mixed_case = valid & (body != body.str.lower()) & (body != body.str.upper())
+    if mixed_case.any():
+        valid.loc[mixed_case] = addresses[mixed_case].map(Web3.is_address)
+    return valid
+
+
+def validate_wallet_frame(df: pd.DataFrame, column_mapping: Dict[str, str], strict_address: bool = True,
+                          row_offset: int = 0) -> Tuple[WalletStore, List[str]]:
+    """
+    按列向量化校验钱包数据
+
+    Args:
+        df: 原始DataFrame
+        column_mapping: find_column_mapping 返回的列映射
+        strict_address: 是否按 Web3.is_address 严格校验地址（否则只检查0x前缀和40位十六进制）
+        row_offset: 行号偏移（分块读取时使用）
+
+    Returns:
+        (有效钱包存储, 按行号排序的无效行提示列表)
+    """
+    index_raw = df[column_mapping['index']]
+    addresses = df[column_mapping['address']].astype(str).str.strip()
+    private_keys = df[column_mapping['privateKey']].astype(str).str.strip()
+
+    # 空值：序号缺失，或地址/私钥为空字符串或'nan'
+    empty = (
+        index_raw.isna().to_numpy()
+        | addresses.isin(['', 'nan']).to_numpy()
+        | private_keys.isin(['', 'nan']).to_numpy()
+    )
+
+    # 批量转换序号，等价于逐行 int(float(value))
+    if pd.api.types.is_numeric_dtype(index_raw):
+        index_float = index_raw.astype(float).to_numpy()
+    else:
+        index_float = pd.to_numeric(index_raw.astype(str).str.strip(), errors='coerce').to_numpy(dtype=float)
+    index_error = ~empty & ~np.isfinite(index_float)
+
+    address_body = _address_body(addresses)
+    if strict_address:
+        address_ok = _strict_address_mask(addresses, address_body).to_numpy()
+    else:
+        address_ok = addresses.str.fullmatch(r'0x[0-9a-fA-F]{40}').fillna(False).to_numpy(dtype=bool)
+    # 私钥以二进制存储，必须是合法的十六进制
+    key_ok = private_keys.str.fullmatch(PRIVATE_KEY_PATTERN).fillna(False).to_numpy(dtype=bool)
+
+    bad_address = ~empty & ~index_error & ~address_ok
+    valid = ~empty & ~index_error & address_ok & key_ok
+
+    # 无效行报告（只遍历无效行），与逐行校验时的提示一致
+    issues = []
+    row_numbers = np.arange(len(df)) + row_offset + 1
+    for pos in np.flatnonzero(~valid):
+        row = row_numbers[pos]
+        if empty[pos]:
+            issues.append(f"跳过空行 {row}")
+        elif index_error[pos]:
+            try:
+                int(float(index_raw.iat[pos]))
+                message = f"无效序号: {index_raw.iat[pos]}"
+            except Exception as e:
+                message = str(e)
+            issues.append(f"处理行{row}时出错: {message}")
+        elif bad_address[pos]:
+            if strict_address:
+                issues.append(f"地址格式不正确 (行{row}): {addresses.iat[pos]}")
+            else:
+                issues.append(f"地址格式可能不正确 (行{row}): {addresses.iat[pos]}")
+        else:
+            issues.append(f"私钥格式可能不正确 (行{row}): {private_keys.iat[pos][:10]}...")
+
+    # 整列拼接后一次性转成二进制，避免逐行创建字典
+    address_hex = ''.join(address_body[valid])
+    key_hex = ''.join(private_keys[valid].str.slice(2))
+    wallets = WalletStore.from_columns(
+        np.trunc(index_float[valid]).astype(np.int64).tolist(),
+        bytes.fromhex(address_hex),
+        bytes.fromhex(key_hex)
+    )
+    return wallets, issues
+
+
+def iter_wallet_chunks(file_path: str, chunksize: int = 50000, strict_address: bool = True
+                       ) -> Iterator[Tuple[WalletStore, List[str]]]:
+    """
+    分块读取并校验钱包CSV，内存占用只与块大小有关
+
+    Args:
+        file_path: CSV文件路径
+        chunksize: 每块行数
+        strict_address: 是否严格校验地址
+
+    Yields:
+        每块的 (有效钱包存储, 按行号排序的无效行提示列表)；每块是独立的 WalletStore（存储行号从0开始），
+        提示中的行号是文件中的行号
+
+    Raises:
+        ValueError: 缺少必要的列，或文件中有无法按检测到的编码解码的内容
+    """
+    encoding = detect_encoding(file_path)
+    column_mapping = None
+    row_offset = 0
+
+    reader = pd.read_csv(file_path, encoding=encoding, chunksize=chunksize)
+    while True:
+        with stage('parse'):
+            try:
+                df = next(reader, None)
+            except UnicodeDecodeError as e:
+                # 编码只按文件开头的样本判断，后面的内容可能无法按该编码解码
+                raise ValueError(f"{file_path} 第 {row_offset + 1} 行之后的内容无法按 {encoding} 解码 "
+                                 f"(字节 0x{e.object[e.start:e.start + 1].hex()}): {e.reason}") from e
+        if df is None:
+            break
+        if column_mapping is None:
+            column_mapping, missing = find_column_mapping(df.columns)
+            if missing:
+                raise ValueError(f"未找到必要的列: {missing}，可能的列名: {POSSIBLE_COLUMNS[missing]}")
+
+        # 分块读取时 DataFrame 的行索引是连续的，行号需要加上偏移
+        with stage('validate'):
+            chunk = validate_wallet_frame(df.reset_index(drop=True), column_mapping, strict_address, row_offset)
+        yield chunk
+        row_offset += len(df)
+
+
+def read_wallet_csv(file_path: str) -> pd.DataFrame:
+    """读取CSV文件，支持不同的编码格式"""
+    try:
+        return pd.read_csv(file_path, encoding='utf-8')
+    except UnicodeDecodeError:
+        try:
+            return pd.read_csv(file_path, encoding='gbk')
+        except UnicodeDecodeError:
+            return pd.read_csv(file_path, encoding='latin-1')
+
+
+def load_wallet_file(file_path: str, strict_address: bool = True) -> Dict:
+    """
+    解析并校验单个钱包CSV文件，不打印任何信息（可在子进程中运行）
+
+    Args:
+        file_path: CSV文件路径
+        strict_address: 是否严格校验地址
+
+    Returns:
+        加载结果字典:
+            path: 文件路径
+            exists: 文件是否存在
+            row_count: CSV行数（读取失败时为None）
+            columns: CSV列名
+            column_mapping: 列映射
+            missing: 缺失的必要列名
+            wallets: 有效钱包存储 WalletStore（未完成校验时为None）
+            issues: 无效行提示列表
+            error: 出错信息
+    """
+    result = {
+        'path': file_path,
+        'exists': os.path.exists(file_path),
+        'row_count': None,
+        'columns': [],
+        'column_mapping': {},
+        'missing': None,
+        'wallets': None,
+        'issues': [],
+        'error': None
+    }
+    if not result['exists']:
+        return result
+
+    try:
+        with stage('parse'):
+            df = read_wallet_csv(file_path)
+        result['row_count'] = len(df)
+        result['columns'] = list(df.columns)
+        if df.empty:
+            return result
+
+        result['column_mapping'], result['missing'] = find_column_mapping(df.columns)
+        if result['missing']:
+            return result
+
+        with stage('validate'):
+            result['wallets'], result['issues'] = validate_wallet_frame(df, result['column_mapping'], strict_address)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
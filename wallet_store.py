@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的列式钱包存储
+功能：地址/私钥以二进制、余额以整数wei、来源文件以编号按列存放，
+通过行视图保持与原钱包字典相同的访问方式（wallet['address']、wallet.get('balance') 等）；
+地址去重索引记录重复地址所在的行，同一地址只需查询一次，结果再分发到所有重复行；
+加载时为每个地址计算一次 EIP-55 checksum（每行5字节的大小写掩码），RPC调用和签名时不再重复计算keccak
+"""
+
+import sys
+import hashlib
+import functools
+from array import array
+from collections.abc import MutableMapping
+from decimal import Decimal, localcontext
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+ADDRESS_SIZE = 20
+KEY_SIZE = 32
+CASE_MASK_SIZE = 5  # 40个十六进制字符各1位，置位表示该字符在checksum地址中为大写
+_UINT64 = 1 << 64
+_MAX_WEI = 1 << 128  # 超过该值的余额放到稀疏字典中
+_WEI_PER_ETHER = Decimal(10 ** 18)
+
+# 列式存储直接支持的字段，其余字段存放在稀疏的附加字典中
+CORE_FIELDS = ('index', 'address', 'private_key', 'balance', 'source_file', 'block_number')
+
+
+def _wei_to_ether(balance_wei: int) -> Decimal:
+    """与 Web3.from_wei(balance_wei, 'ether') 结果相同（不导入 web3，加载存储模块不拖慢启动）"""
+    if balance_wei == 0:
+        return Decimal(0)
+    with localcontext() as ctx:
+        ctx.prec = 999
+        return Decimal(balance_wei) / _WEI_PER_ETHER
+
+
+def _ether_to_wei(value) -> int:
+    """与 Web3.to_wei(value, 'ether') 结果相同（不导入 web3）"""
+    with localcontext() as ctx:
+        ctx.prec = 999
+        return int(Decimal(str(value) if isinstance(value, float) else value) * _WEI_PER_ETHER)
+
+
+# 掩码的每个字节展开为8个字符的异或值：小写字母与 0x20 异或即为大写
+_CASE_XOR = [bytes(0x20 if mask >> (7 - bit) & 1 else 0 for bit in range(8)) for mask in range(256)]
+
+
+def checksum_case_masks(addresses: bytes) -> bytes:
+    """
+    批量计算 EIP-55 checksum 的大小写掩码
+
+    Args:
+        addresses: 所有地址拼接成的二进制（每个20字节）
+
+    Returns:
+        每个地址 CASE_MASK_SIZE 字节的掩码拼接成的二进制
+    """
+    import numpy as np
+    from eth_hash.auto import keccak
+
+    count = len(addresses) // ADDRESS_SIZE
+    if not count:
+        return b''
+    hex_ascii = addresses.hex().encode('ascii')
+    width = 2 * ADDRESS_SIZE
+    # keccak 只能逐个计算，其余步骤按整列向量化
+    digests = b''.join([keccak(hex_ascii[start:start + width]) for start in range(0, len(hex_ascii), width)])
+
+    chars = np.frombuffer(hex_ascii, dtype=np.uint8).reshape(count, width)
+    digest = np.frombuffer(digests, dtype=np.uint8).reshape(count, 32)[:, :ADDRESS_SIZE]
+    # 地址第i个字符对应哈希的第i个半字节，半字节 >= 8 的字母大写
+    nibbles = np.empty((count, width), dtype=np.uint8)
+    nibbles[:, 0::2] = digest >> 4
+    nibbles[:, 1::2] = digest & 0x0f
+    upper = (chars >= ord('a')) & (nibbles >= 8)
+    return np.packbits(upper, axis=1).tobytes()
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_address(address: str) -> str:
+    """
+    转换为 checksum 地址（有界缓存，适合归集目标等反复使用的地址）
+
+    Args:
+        address: 十六进制地址（大小写不限）
+
+    Returns:
+        EIP-55 checksum 地址
+    """
+    data = _hex_to_bytes(address.strip(), ADDRESS_SIZE)
+    return _apply_case_mask(data, checksum_case_masks(data))
+
+
+def _apply_case_mask(address: bytes, mask: bytes) -> str:
+    hex_ascii = address.hex().encode('ascii')
+    case_xor = b''.join([_CASE_XOR[byte] for byte in mask])
+    checksum = int.from_bytes(hex_ascii, 'big') ^ int.from_bytes(case_xor, 'big')
+    return '0x' + checksum.to_bytes(2 * ADDRESS_SIZE, 'big').decode('ascii')
+
+
+def _hex_to_bytes(value: str, size: int) -> bytes:
+    body = value[2:] if value[:2] in ('0x', '0X') else value
+    data = bytes.fromhex(body)
+    if len(data) != size:
+        raise ValueError(f"长度应为 {size} 字节: {value}")
+    return data
+
+
+class WalletRow(MutableMapping):
+    """单个钱包的行视图，读写都直接作用于所属的 WalletStore"""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: 'WalletStore', row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key):
+        return self._store._get_field(self._row, key)
+
+    def __setitem__(self, key, value):
+        self._store._set_field(self._row, key, value)
+
+    def __delitem__(self, key):
+        self._store._del_field(self._row, key)
+
+    def __iter__(self):
+        return iter(self._store._row_keys(self._row))
+
+    def __len__(self):
+        return len(self._store._row_keys(self._row))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    @property
+    def checksum_address(self) -> str:
+        """加载时计算好的 checksum 地址"""
+        return self._store.checksum_address(self._row)
+
+    @property
+    def address_key(self) -> str:
+        """小写地址，用作去重、缓存和任务日志的键"""
+        return self._store.address_key(self._row)
+
+    @property
+    def row(self) -> int:
+        """在存储中的行号"""
+        return self._row
+
+
+class WalletStore:
+    def __init__(self):
+        self._index = array('q')
+        self._addresses = bytearray()
+        self._case_masks = bytearray()  # 每行 CASE_MASK_SIZE 字节的 checksum 大小写掩码
+        self._keys = bytearray()
+        self._balance_lo = array('Q')
+        self._balance_hi = array('Q')
+        self._has_balance = bytearray()
+        self._block_numbers = array('q')  # -1 表示未记录
+        self._source_ids = array('i')  # -1 表示未记录
+        self._sources: List[str] = []
+        self._source_lookup: Dict[str, int] = {}
+        self._big_balances: Dict[int, int] = {}
+        self._extras: Dict[int, Dict] = {}
+
+        # 地址去重索引：只记录重复地址，地址全部唯一时不占额外内存
+        self._duplicate_of: Dict[int, int] = {}  # 重复行 -> 该地址首次出现的行
+        self._duplicate_groups: Dict[int, List[int]] = {}  # 首次出现的行 -> 该地址的所有行
+        self._address_index_valid = False
+
+    @classmethod
+    def from_wallets(cls, wallets: Iterable) -> 'WalletStore':
+        """从钱包字典（或行视图）列表创建存储"""
+        store = cls()
+        store.extend(wallets)
+        return store
+
+    @classmethod
+    def from_columns(cls, indexes: Iterable[int], addresses: bytes, private_keys: bytes) -> 'WalletStore':
+        """
+        从已经拼接好的列数据批量创建存储
+
+        Args:
+            indexes: 序号列表
+            addresses: 所有地址拼接成的二进制（每个20字节）
+            private_keys: 所有私钥拼接成的二进制（每个32字节）
+        """
+        store = cls()
+        store._index = array('q', indexes)
+        count = len(store._index)
+        if len(addresses) != count * ADDRESS_SIZE or len(private_keys) != count * KEY_SIZE:
+            raise ValueError("列长度不一致")
+        store._addresses = bytearray(addresses)
+        store._case_masks = bytearray(checksum_case_masks(addresses))
+        store._keys = bytearray(private_keys)
+        store._balance_lo = array('Q', bytes(8 * count))
+        store._balance_hi = array('Q', bytes(8 * count))
+        store._has_balance = bytearray(count)
+        store._block_numbers = array('q', [-1]) * count
+        store._source_ids = array('i', [-1]) * count
+        store.build_address_index()
+        return store
+
+    # ---- 容器接口 ----
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[WalletRow]:
+        for row in range(len(self._index)):
+            yield WalletRow(self, row)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [WalletRow(self, row) for row in range(len(self._index))[item]]
+        if item < 0:
+            item += len(self._index)
+        if not 0 <= item < len(self._index):
+            raise IndexError("钱包索引超出范围")
+        return WalletRow(self, item)
+
+    def append(self, wallet):
+        """追加一个钱包（字典或行视图）"""
+        row = len(self._index)
+        self._index.append(int(wallet['index']))
+        address = _hex_to_bytes(wallet['address'], ADDRESS_SIZE)
+        self._addresses += address
+        self._case_masks += checksum_case_masks(address)
+        self._keys += _hex_to_bytes(wallet['private_key'], KEY_SIZE)
+        self._balance_lo.append(0)
+        self._balance_hi.append(0)
+        self._has_balance.append(0)
+        self._block_numbers.append(-1)
+        self._source_ids.append(-1)
+        self._address_index_valid = False
+
+        for key, value in wallet.items():
+            if key not in ('index', 'address', 'private_key'):
+                self._set_field(row, key, value)
+
+    def extend(self, wallets: Iterable):
+        """追加多个钱包；另一个 WalletStore 直接按列拼接"""
+        if not isinstance(wallets, WalletStore):
+            for wallet in wallets:
+                self.append(wallet)
+            return
+
+        offset = len(self._index)
+        self._address_index_valid = False
+        self._index.extend(wallets._index)
+        self._addresses += wallets._addresses
+        self._case_masks += wallets._case_masks
+        self._keys += wallets._keys
+        self._balance_lo.extend(wallets._balance_lo)
+        self._balance_hi.extend(wallets._balance_hi)
+        self._has_balance += wallets._has_balance
+        self._block_numbers.extend(wallets._block_numbers)
+
+        # 来源文件编号需要映射到本存储的编号
+        id_map = {old: self._intern_source(name) for old, name in enumerate(wallets._sources)}
+        self._source_ids.extend(id_map[i] if i >= 0 else -1 for i in wallets._source_ids)
+
+        for row, value in wallets._big_balances.items():
+            self._big_balances[row + offset] = value
+        for row, extras in wallets._extras.items():
+            self._extras[row + offset] = dict(extras)
+
+    def set_source_file(self, name: str):
+        """将所有钱包的来源文件设为同一个值"""
+        source_id = self._intern_source(name)
+        self._source_ids = array('i', [source_id]) * len(self._index)
+
+    # ---- 地址去重索引 ----
+
+    def build_address_index(self):
+        """按20字节地址建立哈希索引，找出所有重复地址所在的行"""
+        first_rows: Dict[bytes, int] = {}
+        self._duplicate_of = {}
+        self._duplicate_groups = {}
+        addresses = bytes(self._addresses)
+        for row in range(len(self._index)):
+            start = row * ADDRESS_SIZE
+            first = first_rows.setdefault(addresses[start:start + ADDRESS_SIZE], row)
+            if first != row:
+                self._duplicate_of[row] = first
+                self._duplicate_groups.setdefault(first, [first]).append(row)
+        self._address_index_valid = True
+
+    def _ensure_address_index(self):
+        if not self._address_index_valid:
+            self.build_address_index()
+
+    @property
+    def duplicate_count(self) -> int:
+        """重复出现的钱包行数（不含每个地址首次出现的行）"""
+        self._ensure_address_index()
+        return len(self._duplicate_of)
+
+    @property
+    def duplicate_address_count(self) -> int:
+        """出现不止一次的地址数"""
+        self._ensure_address_index()
+        return len(self._duplicate_groups)
+
+    def unique_rows(self, rows: Iterable[int]) -> List[int]:
+        """
+        将行号列表按地址去重，每个地址只保留首次出现的行
+
+        Args:
+            rows: 行号列表
+
+        Returns:
+            去重后的行号列表（保持原顺序）
+        """
+        self._ensure_address_index()
+        if not self._duplicate_of:
+            return list(rows)
+        seen = set()
+        unique = []
+        for row in rows:
+            first = self._duplicate_of.get(row, row)
+            if first not in seen:
+                seen.add(first)
+                unique.append(first)
+        return unique
+
+    def fan_out_balances(self, rows: Iterable[int]):
+        """
+        将 unique_rows 返回的行的余额复制到同地址的其他行
+
+        Args:
+            rows: unique_rows 返回的行号列表
+        """
+        self._ensure_address_index()
+        if not self._duplicate_groups:
+            return
+        for first in rows:
+            group = self._duplicate_groups.get(first)
+            if group:
+                balance_wei = self.balance_wei(first)
+                for row in group:
+                    if row != first:
+                        self.set_balance_wei(row, balance_wei)
+
+    def address_digest(self) -> bytes:
+        """所有地址按顺序计算的SHA-256摘要，用于识别同一批钱包"""
+        return hashlib.sha256(self._addresses).digest()
+
+    def source_ranges(self) -> List[Tuple[int, int]]:
+        """来源文件相同的连续行区间 [(起始行, 结束行)]，用于按文件处理"""
+        ranges = []
+        start = 0
+        for row in range(1, len(self._source_ids) + 1):
+            if row == len(self._source_ids) or self._source_ids[row] != self._source_ids[start]:
+                ranges.append((start, row))
+                start = row
+        return ranges
+
+    def has_block_numbers(self) -> bool:
+        """是否有钱包记录了余额对应的区块高度"""
+        return bool(self._block_numbers) and max(self._block_numbers) >= 0
+
+    def column_bytes(self, start: int, end: int) -> Tuple[bytes, bytes]:
+        """[start, end) 行的地址和私钥二进制（分别按行拼接）"""
+        return (bytes(self._addresses[start * ADDRESS_SIZE:end * ADDRESS_SIZE]),
+                bytes(self._keys[start * KEY_SIZE:end * KEY_SIZE]))
+
+    def memory_usage(self) -> int:
+        """存储占用的字节数（近似值）"""
+        total = sys.getsizeof(self)
+        for column in (self._index, self._addresses, self._case_masks, self._keys, self._balance_lo, self._balance_hi,
+                       self._has_balance, self._block_numbers, self._source_ids):
+            total += sys.getsizeof(column)
+        total += sys.getsizeof(self._sources) + sum(sys.getsizeof(name) for name in self._sources)
+        total += sys.getsizeof(self._source_lookup)
+        total += sys.getsizeof(self._big_balances) + sys.getsizeof(self._extras)
+        total += sys.getsizeof(self._duplicate_of) + sys.getsizeof(self._duplicate_groups)
+        for group in self._duplicate_groups.values():
+            total += sys.getsizeof(group)
+        for extras in self._extras.values():
+            total += sys.getsizeof(extras)
+        return total
+
+    # ---- 字段读写 ----
+
+    def _intern_source(self, name: str) -> int:
+        source_id = self._source_lookup.get(name)
+        if source_id is None:
+            source_id = len(self._sources)
+            self._sources.append(name)
+            self._source_lookup[name] = source_id
+        return source_id
+
+    def address_bytes(self, row: int) -> bytes:
+        """指定行地址的20字节二进制"""
+        start = row * ADDRESS_SIZE
+        return bytes(self._addresses[start:start + ADDRESS_SIZE])
+
+    def address_key(self, row: int) -> str:
+        """指定行的小写地址，用作去重、缓存和任务日志的键（与显示的地址大小写无关）"""
+        return '0x' + self.address_bytes(row).hex()
+
+    def checksum_address(self, row: int) -> str:
+        """指定行的 checksum 地址（由加载时计算的大小写掩码还原，不再计算keccak）"""
+        start = row * CASE_MASK_SIZE
+        return _apply_case_mask(self.address_bytes(row), self._case_masks[start:start + CASE_MASK_SIZE])
+
+    def balance_wei(self, row: int) -> Optional[int]:
+        """指定行的余额（wei），未查询或查询失败时为None"""
+        if not self._has_balance[row]:
+            return None
+        if row in self._big_balances:
+            return self._big_balances[row]
+        return (self._balance_hi[row] << 64) | self._balance_lo[row]
+
+    def set_balance_wei(self, row: int, value: Optional[int]):
+        """设置指定行的余额（wei），None表示查询失败"""
+        self._big_balances.pop(row, None)
+        if value is None:
+            self._has_balance[row] = 0
+            self._balance_lo[row] = 0
+            self._balance_hi[row] = 0
+            return
+        if value >= _MAX_WEI:
+            self._big_balances[row] = value
+        else:
+            self._balance_hi[row], self._balance_lo[row] = divmod(value, _UINT64)
+        self._has_balance[row] = 1
+
+    def _get_field(self, row: int, key):
+        if key == 'index':
+            return self._index[row]
+        if key == 'address':
+            return self.checksum_address(row)
+        if key == 'private_key':
+            start = row * KEY_SIZE
+            return '0x' + self._keys[start:start + KEY_SIZE].hex()
+        if key == 'balance':
+            balance_wei = self.balance_wei(row)
+            return None if balance_wei is None else Decimal(str(_wei_to_ether(balance_wei)))
+        if key == 'block_number':
+            block_number = self._block_numbers[row]
+            return None if block_number < 0 else block_number
+        if key == 'source_file':
+            source_id = self._source_ids[row]
+            if source_id < 0:
+                raise KeyError(key)
+            return self._sources[source_id]
+        return self._extras.get(row, {})[key]
+
+    def _set_field(self, row: int, key, value):
+        if key == 'index':
+            self._index[row] = int(value)
+        elif key == 'address':
+            address = _hex_to_bytes(value, ADDRESS_SIZE)
+            start = row * ADDRESS_SIZE
+            self._addresses[start:start + ADDRESS_SIZE] = address
+            start = row * CASE_MASK_SIZE
+            self._case_masks[start:start + CASE_MASK_SIZE] = checksum_case_masks(address)
+            self._address_index_valid = False
+        elif key == 'private_key':
+            start = row * KEY_SIZE
+            self._keys[start:start + KEY_SIZE] = _hex_to_bytes(value, KEY_SIZE)
+        elif key == 'balance':
+            self.set_balance_wei(row, None if value is None else _ether_to_wei(value))
+        elif key == 'block_number':
+            self._block_numbers[row] = -1 if value is None else int(value)
+        elif key == 'source_file':
+            self._source_ids[row] = -1 if value is None else self._intern_source(value)
+        else:
+            self._extras.setdefault(row, {})[key] = value
+
+    def _del_field(self, row: int, key):
+        if key in ('source_file', 'block_number'):
+            self._set_field(row, key, None)
+        elif key in CORE_FIELDS:
+            raise KeyError(f"不能删除字段: {key}")
+        else:
+            del self._extras.get(row, {})[key]
+
+    def _row_keys(self, row: int) -> List[str]:
+        keys = ['index', 'address', 'private_key', 'balance']
+        if self._source_ids[row] >= 0:
+            keys.append('source_file')
+        keys.append('block_number')
+        keys.extend(self._extras.get(row, {}))
+        return keys